@@ -1,29 +1,34 @@
 import os
-import json
 from bs4 import BeautifulSoup
 from datetime import datetime
 import logging
-import sys
 import time
 import random
 from playwright.sync_api import sync_playwright
 import requests
 
+from gamecollect.archive import ArchiveWriter
+from gamecollect.extractors import parse_1000webgames
+from gamecollect.head_meta import REQUIRED_FIELDS, fetch_head, format_head_stats, head_game_data, record_head_stats
+from gamecollect.logs import set_page, setup_logging as setup_structured_logging
+from gamecollect.storage import upsert_game
+from gamecollect.urls import canonicalize
+
 # 获取脚本的绝对路径
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 
-# 设置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('1000webgames_scraper.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# 全文解析会从链接中得到分类和标签，头部两者都有时才跳过全文解析
+HEAD_REQUIRED_FIELDS = REQUIRED_FIELDS + ('tags',)
+
+
+def setup_logging():
+    """配置日志（只在直接运行时调用；被 gamecollect.crawl 导入时不改动全局日志配置）"""
+    setup_structured_logging('1000webgames')
+
+
 class WebGameScraper:
     def __init__(self):
         # 创建存储目录
@@ -70,6 +75,11 @@ class WebGameScraper:
         
         # 基础URL
         self.base_url = 'https://1000webgames.com'
+        self.archive = ArchiveWriter('1000webgames')
+        # 头部结构化数据请求使用普通HTTP会话
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+        self.head_stats = {}
         
     def get_proxy(self):
         """获取代理服务器"""
@@ -88,6 +98,8 @@ class WebGameScraper:
     def __del__(self):
         """清理资源"""
         try:
+            if hasattr(self, 'archive'):
+                self.archive.close()
             if hasattr(self, 'context'):
                 self.context.close()
             if hasattr(self, 'browser'):
@@ -197,126 +209,30 @@ class WebGameScraper:
                     pass
 
     def parse_game_page(self, url):
-        """解析游戏页面"""
+        """获取游戏页面，写入原始存档后解析"""
+        # 第一层：只读取页面头部的 JSON-LD / OpenGraph，字段足够时不再启动浏览器渲染
+        head = fetch_head(self.session, url, required=HEAD_REQUIRED_FIELDS)
+        record_head_stats(self.head_stats, '1000webgames', head)
+        if head and head.sufficient:
+            self.archive.write(url, head.html, kind='head')
+            game_data = head_game_data(url, head.fields)
+            logger.info(f"Parsed game from page head: {game_data['title']}")
+            return game_data
+        
         content = self.get_page_content(url)
         if not content:
             return None
-            
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # 保存解析后的HTML结构用于调试
-        debug_path = os.path.join(PROJECT_ROOT, f'debug_parsed_{datetime.now().strftime("%Y%m%d_%H%M%S")}.txt')
-        with open(debug_path, 'w', encoding='utf-8') as f:
-            f.write(soup.prettify())
-        logger.info(f"Saved parsed HTML to {debug_path}")
         
-        # 提取游戏信息
-        game_data = {
-            'url': url,
-            'title': '',
-            'description': '',
-            'iframe_url': '',
-            'preview_image': '',
-            'categories': [],
-            'tags': [],
-            'scraped_at': datetime.now().isoformat()
-        }
+        # 保存原始页面，修改解析规则后可用 scripts/reprocess_archive.py 重新生成数据
+        self.archive.write(url, content)
         
         try:
-            # 获取标题
-            title_elem = soup.find('title')  # 使用title标签
-            if title_elem:
-                game_data['title'] = title_elem.text.strip().replace(' - 1000 Web Games', '')
-                logger.info(f"Found title: {game_data['title']}")
-            
-            # 获取描述
-            # 尝试多种可能的描述元素
-            desc_candidates = [
-                soup.find('meta', {'name': 'description'}),  # meta描述
-                soup.find('meta', {'property': 'og:description'}),  # Open Graph描述
-                soup.find('div', class_='game-description'),  # 游戏描述div
-                soup.find('div', class_='description'),  # 描述div
-                soup.find('p', class_='description'),  # 描述段落
-                soup.find('div', {'id': 'about'}),  # about区域
-                soup.find('div', {'id': 'description'})  # description区域
-            ]
-            
-            for desc_elem in desc_candidates:
-                if desc_elem:
-                    if desc_elem.name == 'meta':
-                        desc_text = desc_elem.get('content', '')
-                    else:
-                        desc_text = desc_elem.text
-                    if desc_text and len(desc_text.strip()) > 0:
-                        game_data['description'] = desc_text.strip()
-                        logger.info(f"Found description: {game_data['description'][:100]}...")
-                        break
-            
-            # 获取iframe URL
-            # 尝试多种可能的iframe
-            iframe_candidates = [
-                soup.find('iframe', id='gameFrame'),  # 游戏框架
-                soup.find('iframe', class_='game-iframe'),  # 游戏iframe
-                soup.find('iframe', {'data-type': 'game'}),  # 游戏类型iframe
-                soup.find('iframe', {'name': 'game'}),  # 游戏名称iframe
-                soup.find('iframe', {'title': lambda x: x and 'game' in x.lower()}),  # 标题包含game的iframe
-                soup.find('iframe')  # 任何iframe
-            ]
-            
-            for iframe_elem in iframe_candidates:
-                if iframe_elem and 'src' in iframe_elem.attrs:
-                    src = iframe_elem['src']
-                    # 确保是完整的URL
-                    if not src.startswith(('http://', 'https://')):
-                        src = f"{self.base_url}/{src.lstrip('/')}"
-                    game_data['iframe_url'] = src
-                    logger.info(f"Found iframe URL: {game_data['iframe_url']}")
-                    break
-            
-            # 获取预览图片
-            # 尝试多种可能的图片元素
-            img_candidates = [
-                soup.find('meta', {'property': 'og:image'}),  # Open Graph图片
-                soup.find('img', class_='game-preview'),  # 游戏预览图
-                soup.find('img', class_='preview'),  # 预览图
-                soup.find('img', {'alt': lambda x: x and game_data['title'].lower() in x.lower()}),  # alt包含游戏名的图片
-                soup.find('img', src=True)  # 任何图片
-            ]
-            
-            for img_elem in img_candidates:
-                if img_elem:
-                    if img_elem.name == 'meta':
-                        src = img_elem.get('content', '')
-                    else:
-                        src = img_elem.get('src', '')
-                    if src:
-                        if not src.startswith(('http://', 'https://')):
-                            src = f"{self.base_url}/{src.lstrip('/')}"
-                        game_data['preview_image'] = src
-                        logger.info(f"Found preview image: {game_data['preview_image']}")
-                        break
-            
-            # 获取分类和标签
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if 'category=' in href or 'tag=' in href or 'cat=' in href:
-                    tag = link.text.strip()
-                    if tag:
-                        if 'category=' in href or 'cat=' in href:
-                            game_data['categories'].append(tag)
-                        else:
-                            game_data['tags'].append(tag)
-            
-            if game_data['categories']:
-                logger.info(f"Found categories: {game_data['categories']}")
-            if game_data['tags']:
-                logger.info(f"Found tags: {game_data['tags']}")
-                
+            game_data = parse_1000webgames(url, content)
+            logger.info(f"Parsed game: {game_data['title']} (iframe: {game_data['iframe_url'] or 'none'})")
+            return game_data
         except Exception as e:
             logger.error(f"Error parsing game page: {str(e)}")
             return None
-            
-        return game_data
         
     def save_game_data(self, game_data):
         """保存游戏数据到JSON文件"""
@@ -324,14 +240,9 @@ class WebGameScraper:
             return False
             
         try:
-            # 生成文件名
-            filename = f"{game_data['title'].strip().replace(' ', '_')}.json"
-            filepath = os.path.join(self.base_dir, filename)
-            
-            # 保存数据
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(game_data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Saved game data to: {filename}")
+            # 以稳定键保存（重复抓取时更新同一文件）
+            filepath, status = upsert_game(self.base_dir, '1000webgames', game_data)
+            logger.info(f"Saved game data to: {filepath} ({status})")
             return True
             
         except Exception as e:
@@ -351,9 +262,7 @@ class WebGameScraper:
             
             # 查找游戏链接
             for link in soup.find_all('a', href=True):
-                href = link['href']
-                if not href.startswith(('http://', 'https://')):
-                    href = f"{self.base_url}/{href.lstrip('/')}"
+                href = canonicalize(link['href'], self.base_url + '/')
                 
                 if '1000webgames.com/play-' in href and href not in game_links:
                     game_links.append(href)
@@ -380,6 +289,7 @@ class WebGameScraper:
             
             # 爬取每个游戏页面
             for link in game_links:
+                set_page(link)
                 try:
                     logger.info(f"Scraping game: {link}")
                     game_data = self.parse_game_page(link)
@@ -396,6 +306,8 @@ class WebGameScraper:
                     logger.error(f"Error processing game {link}: {str(e)}")
                     continue
                     
+            logger.info(format_head_stats(self.head_stats, '1000webgames'))
+                    
         except Exception as e:
             logger.error(f"Error in scrape_games: {str(e)}")
         finally:
@@ -406,4 +318,5 @@ def main():
     scraper.scrape_games()
 
 if __name__ == "__main__":
+    setup_logging()
     main()
\ No newline at end of file
@@ -0,0 +1,33 @@
+import { NextResponse } from 'next/server'
+
+// 目录查询服务（scripts/catalog_service.py）的代理：支持过滤、分页、字段投影和 ETag，
+// 返回 {total, page, per_page, games}，games 只含卡片字段。/api/games 保持原有的完整记录数组
+const CATALOG_SERVICE_URL = process.env.CATALOG_SERVICE_URL
+
+export async function GET(request: Request) {
+  if (!CATALOG_SERVICE_URL) {
+    return NextResponse.json({ error: 'Catalog service is not configured' }, { status: 503 })
+  }
+
+  const { search } = new URL(request.url)
+  const headers: Record<string, string> = {}
+  const ifNoneMatch = request.headers.get('if-none-match')
+  if (ifNoneMatch) {
+    headers['If-None-Match'] = ifNoneMatch
+  }
+  try {
+    const response = await fetch(`${CATALOG_SERVICE_URL}/games${search}`, { headers, cache: 'no-store' })
+    const forwarded = new Headers()
+    for (const name of ['content-type', 'etag', 'cache-control']) {
+      const value = response.headers.get(name)
+      if (value) {
+        forwarded.set(name, value)
+      }
+    }
+    const body = response.status === 304 ? null : await response.arrayBuffer()
+    return new Response(body, { status: response.status, headers: forwarded })
+  } catch (error) {
+    console.error('Catalog service unavailable:', error)
+    return NextResponse.json({ error: 'Catalog service unavailable' }, { status: 502 })
+  }
+}
@@ -0,0 +1,115 @@
+import { NextResponse } from 'next/server'
+import fs from 'fs/promises'
+import path from 'path'
+
+// 事件日志由 scripts/build_popularity.py 增量汇总为热门列表，格式与 gamecollect/popularity.py 保持一致
+const eventsDir = path.join(process.cwd(), 'catalog', 'events')
+const EVENT_TYPES = ['play', 'click']
+const SOURCE_PATTERN = /^[\w.-]{1,200}$/
+// 游戏 id 接受站点实际使用的所有 id（未迁移的旧 id 含空格等字符），只拒绝会破坏按行、按制表符分隔的日志格式的控制字符
+const ID_PATTERN = /^[^\u0000-\u001f\u007f]{1,200}$/
+
+// 匿名接口的防刷：每个客户端（IP）每分钟最多 RATE_LIMIT 个事件；同一会话或同一 IP 对同一游戏
+// 在 DEDUP_WINDOW_MS 内只计一次。状态保存在进程内存中（多实例部署时每个实例各自限制）
+const SESSION_COOKIE = 'gc_sid'
+const RATE_LIMIT = 30
+const RATE_WINDOW_MS = 60 * 1000
+const DEDUP_WINDOW_MS = 30 * 60 * 1000
+const MAX_TRACKED = 100000
+
+const rateWindows = new Map<string, { start: number; count: number }>()
+const recentEvents = new Map<string, number>()
+
+function clientIp(request: Request): string {
+  const forwarded = request.headers.get('x-forwarded-for')
+  return forwarded?.split(',')[0].trim() || request.headers.get('x-real-ip') || 'unknown'
+}
+
+function sessionId(request: Request): string | null {
+  const match = (request.headers.get('cookie') || '').match(new RegExp(`(?:^|;\\s*)${SESSION_COOKIE}=([\\w-]{1,64})`))
+  return match ? match[1] : null
+}
+
+// 超过上限时丢弃过期条目，避免内存无限增长
+function prune(now: number) {
+  if (rateWindows.size > MAX_TRACKED) {
+    rateWindows.forEach((entry, key) => {
+      if (now - entry.start >= RATE_WINDOW_MS) rateWindows.delete(key)
+    })
+  }
+  if (recentEvents.size > MAX_TRACKED) {
+    recentEvents.forEach((seen, key) => {
+      if (now - seen >= DEDUP_WINDOW_MS) recentEvents.delete(key)
+    })
+  }
+}
+
+function rateLimited(ip: string, now: number): boolean {
+  const entry = rateWindows.get(ip)
+  if (!entry || now - entry.start >= RATE_WINDOW_MS) {
+    rateWindows.set(ip, { start: now, count: 1 })
+    return false
+  }
+  entry.count += 1
+  return entry.count > RATE_LIMIT
+}
+
+// 同一会话或同一 IP 在窗口内已经记录过该游戏的同类事件时返回 true
+function isDuplicate(keys: string[], now: number): boolean {
+  const duplicate = keys.some((key) => {
+    const seen = recentEvents.get(key)
+    return seen !== undefined && now - seen < DEDUP_WINDOW_MS
+  })
+  if (!duplicate) {
+    keys.forEach((key) => recentEvents.set(key, now))
+  }
+  return duplicate
+}
+
+function eventLogPath(now: Date): string {
+  const day = now.toISOString().slice(0, 10).replace(/-/g, '')
+  return path.join(eventsDir, `${day}.log`)
+}
+
+export async function POST(request: Request) {
+  let event: { type?: string; source?: string; id?: string }
+  try {
+    event = JSON.parse(await request.text())
+  } catch {
+    return NextResponse.json({ error: 'Invalid JSON' }, { status: 400 })
+  }
+
+  const { type, source, id } = event
+  if (!type || !EVENT_TYPES.includes(type) || !source || !id || !SOURCE_PATTERN.test(source) || !ID_PATTERN.test(id)) {
+    return NextResponse.json({ error: 'Invalid event' }, { status: 400 })
+  }
+
+  const now = new Date()
+  const ip = clientIp(request)
+  let sid = sessionId(request)
+  const response = new NextResponse(null, { status: 204 })
+  if (!sid) {
+    sid = crypto.randomUUID()
+    response.cookies.set(SESSION_COOKIE, sid, { httpOnly: true, sameSite: 'lax', path: '/', maxAge: 60 * 60 * 24 * 365 })
+  }
+
+  prune(now.getTime())
+  if (rateLimited(ip, now.getTime())) {
+    return NextResponse.json({ error: 'Too many events' }, { status: 429 })
+  }
+  // 重复事件不计数，但仍返回成功，客户端无需区分
+  const game = `${type}\t${source}\t${id}`
+  if (isDuplicate([`s:${sid}\t${game}`, `ip:${ip}\t${game}`], now.getTime())) {
+    return response
+  }
+
+  try {
+    await fs.mkdir(eventsDir, { recursive: true })
+    // 每个事件一行，追加写入
+    await fs.appendFile(eventLogPath(now), `${(now.getTime() / 1000).toFixed(3)}\t${type}\t${source}\t${id}\n`)
+    return response
+  } catch (error) {
+    console.error('Error recording event:', error)
+    return NextResponse.json({ error: 'Failed to record event' }, { status: 500 })
+  }
+}
@@ -1,27 +1,8 @@
 import { NextResponse } from 'next/server'
 import fs from 'fs/promises'
 import path from 'path'
-
-// 分类名称标准化映射
-const categoryMapping: { [key: string]: string } = {
-  'Girls': 'Girl',
-  'Girl': 'Girl',
-  'Sports': 'Sports',
-  'Sport': 'Sports',
-  'Spor': 'Sports'
-}
-
-// 标准化分类名称
-function normalizeCategory(category: string): string {
-  return categoryMapping[category] || category
-}
-
-// 处理目录名称的函数
-function getCategoryDirName(category: string): string {
-  return category.toLowerCase()
-  .replace(/\s*&\s*/g, '_')  // 处理 & 前后可能的空格
-  .replace(/\s+/g, '_')      // 处理其他空格
-}
+import { canonicalCategoryName, recordCategories } from '@/lib/taxonomy'
+import { isEmbeddable } from '@/lib/utils'
 
 export async function GET() {
   try {
@@ -53,17 +34,12 @@ export async function GET() {
                   const content = await fs.readFile(filePath, 'utf-8')
                   const gameData = JSON.parse(content)
                   
-                  // 从目录名还原分类名
-                  const categoryName = categoryDir
-                    .replace(/_/g, ' ')
-                    .replace(/\b\w/g, l => l.toUpperCase())
-                  
-                  // 标准化分类名称
-                  const normalizedCategory = normalizeCategory(categoryName)
-                  
                   gameData.source = 'html5games'
-                  gameData.id = file.replace('.json', '')
-                  gameData.categories = [normalizedCategory]
+                  gameData.id = gameData.id || file.replace('.json', '')
+                  // 入库时已规范化的记录直接使用；旧记录按目录名解析分类
+                  if (!gameData.category_ids) {
+                    gameData.categories = [canonicalCategoryName(categoryDir)]
+                  }
                   games.push(gameData)
                 } catch (error) {
                   console.error(`Error processing file ${file} in category ${categoryDir}:`, error)
@@ -82,12 +58,9 @@ export async function GET() {
               const content = await fs.readFile(filePath, 'utf-8')
               const gameData = JSON.parse(content)
               
-              // 标准化所有分类名称
-              const normalizedCategories = (gameData.categories || []).map((cat: string) => normalizeCategory(cat))
-              
               gameData.source = subdir
-              gameData.id = file.replace('.json', '')
-              gameData.categories = normalizedCategories
+              gameData.id = gameData.id || file.replace('.json', '')
+              gameData.categories = recordCategories(gameData)
               games.push(gameData)
             } catch (error) {
               console.error(`Error processing file ${file} in directory ${subdir}:`, error)
@@ -101,12 +74,9 @@ export async function GET() {
           const content = await fs.readFile(filePath, 'utf-8')
           const gameData = JSON.parse(content)
           
-          // 标准化所有分类名称
-          const normalizedCategories = (gameData.categories || []).map((cat: string) => normalizeCategory(cat))
-          
           gameData.source = 'root'
-          gameData.id = subdir.replace('.json', '')
-          gameData.categories = normalizedCategories
+          gameData.id = gameData.id || subdir.replace('.json', '')
+          gameData.categories = recordCategories(gameData)
           games.push(gameData)
         } catch (error) {
           console.error(`Error processing root file ${subdir}:`, error)
@@ -114,7 +84,7 @@ export async function GET() {
       }
     }
 
-    return NextResponse.json(games)
+    return NextResponse.json(games.filter(isEmbeddable))
   } catch (error) {
     console.error('Error reading games:', error)
     return NextResponse.json({ error: 'Failed to load games' }, { status: 500 })
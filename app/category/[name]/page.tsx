@@ -1,20 +1,9 @@
 import { promises as fs } from 'fs'
 import path from 'path'
 import { GameCard } from '@/components/game-card'
-
-// 分类名称标准化映射
-const categoryMapping: { [key: string]: string } = {
-  'Girls': 'Girl',
-  'Girl': 'Girl',
-  'Sports': 'Sports',
-  'Sport': 'Sports',
-  'Spor': 'Sports'
-}
-
-// 标准化分类名称
-function normalizeCategory(category: string): string {
-  return categoryMapping[category] || category
-}
+import { PopularGames } from '@/components/popular-games'
+import { categoryId } from '@/lib/taxonomy'
+import { ShardCard, ShardManifest, gameHref, shardListName } from '@/lib/shards'
 
 // 分类描述映射
 const categoryDescriptions: { [key: string]: string } = {
@@ -49,140 +38,105 @@ interface GameData {
   source: string
   title: string
   preview_image: string
+  thumbnail?: string | null
   categories: string[]
   description?: string
 }
 
-async function getGamesForCategory(categoryName: string): Promise<GameData[]> {
-  const projectRoot = process.cwd()
-  const scrapedDataDir = path.join(projectRoot, 'scraped_data')
-  const games: GameData[] = []
+interface CategoryIndex {
+  games: GameData[]
+  category: { [name: string]: { count: number; ids: number[] } }
+}
 
-  // 处理目录名称的函数
-  function getCategoryDirName(category: string): string {
-    return category.toLowerCase()
-      .replace(/\s*&\s*/g, '_')  // 处理 & 前后可能的空格
-      .replace(/\s+/g, '_')      // 处理其他空格
+// 分类分页分片（scripts/build_category_index.py 生成），manifest 按修改时间缓存
+const shardsDir = path.join(process.cwd(), 'public')
+const manifestPath = path.join(shardsDir, 'shards', 'manifest.json')
+let cachedManifest: { mtimeMs: number; manifest: ShardManifest } | null = null
+
+async function loadManifest(): Promise<ShardManifest | null> {
+  try {
+    const { mtimeMs } = await fs.stat(manifestPath)
+    if (!cachedManifest || cachedManifest.mtimeMs !== mtimeMs) {
+      const content = await fs.readFile(manifestPath, 'utf-8')
+      cachedManifest = { mtimeMs, manifest: JSON.parse(content) }
+    }
+    return cachedManifest.manifest
+  } catch {
+    return null
+  }
+}
+
+// 只读取请求的那一页分片，还没有生成分片时返回 null
+async function getGamesFromShards(categoryName: string, page: number): Promise<{ games: ShardCard[]; pages: number } | null> {
+  const manifest = await loadManifest()
+  if (!manifest) {
+    return null
   }
+  const entry = manifest.categories[shardListName(categoryName)]
+  if (!entry) {
+    return { games: [], pages: 0 }
+  }
+  const shard = entry.pages[page - 1]
+  if (!shard) {
+    return { games: [], pages: entry.pages.length }
+  }
+  const content = await fs.readFile(path.join(shardsDir, ...shard.path.split('/')), 'utf-8')
+  return { games: JSON.parse(content), pages: entry.pages.length }
+}
 
+// 预构建的分类倒排索引（没有分片时使用），按修改时间缓存
+const categoryIndexPath = path.join(process.cwd(), 'catalog', 'category_index.json')
+let cachedIndex: { mtimeMs: number; index: CategoryIndex } | null = null
+
+async function loadCategoryIndex(): Promise<CategoryIndex | null> {
   try {
-    // 读取所有子目录
-    const subdirs = await fs.readdir(scrapedDataDir)
-    
-    for (const subdir of subdirs) {
-      const subdirPath = path.join(scrapedDataDir, subdir)
-      const stats = await fs.stat(subdirPath)
-      
-      if (stats.isDirectory()) {
-        // 如果是 html5games 目录，需要处理其子目录
-        if (subdir === 'html5games') {
-          const categoryDirName = getCategoryDirName(categoryName)
-          const categoryPath = path.join(subdirPath, categoryDirName)
-          
-          console.log('Looking for category in:', categoryPath) // 调试日志
-          
-          if (await fs.access(categoryPath).then(() => true).catch(() => false)) {
-            const files = await fs.readdir(categoryPath)
-            const jsonFiles = files.filter(file => file.endsWith('.json'))
-            
-            for (const file of jsonFiles) {
-              try {
-                const filePath = path.join(categoryPath, file)
-                const content = await fs.readFile(filePath, 'utf-8')
-                const gameData = JSON.parse(content)
-                
-                // 检查游戏的分类是否匹配（考虑标准化后的分类名称）
-                const normalizedGameCategories = (gameData.categories || []).map(normalizeCategory)
-                const normalizedCategoryName = normalizeCategory(categoryName)
-                
-                if (normalizedGameCategories.includes(normalizedCategoryName)) {
-                  const game: GameData = {
-                    id: file.replace('.json', ''),
-                    source: 'html5games',
-                    title: gameData.title || 'Untitled Game',
-                    preview_image: gameData.preview_image || '/placeholder.jpg',
-                    categories: normalizedGameCategories,
-                    description: gameData.description
-                  }
-                  games.push(game)
-                }
-              } catch (error) {
-                console.error(`Error processing file ${file}:`, error)
-              }
-            }
-          }
-        } else {
-          // 对于其他目录，读取所有 JSON 文件并检查分类
-          const files = await fs.readdir(subdirPath)
-          const jsonFiles = files.filter(file => file.endsWith('.json'))
-          
-          for (const file of jsonFiles) {
-            try {
-              const filePath = path.join(subdirPath, file)
-              const content = await fs.readFile(filePath, 'utf-8')
-              const gameData = JSON.parse(content)
-              
-              // 标准化游戏的分类名称
-              const normalizedCategories = (gameData.categories || []).map(normalizeCategory)
-              
-              // 检查游戏是否属于当前分类（考虑标准化后的分类名称）
-              const normalizedCategoryName = normalizeCategory(categoryName)
-              if (normalizedCategories.includes(normalizedCategoryName)) {
-                const game: GameData = {
-                  id: file.replace('.json', ''),
-                  source: subdir,
-                  title: gameData.title || 'Untitled Game',
-                  preview_image: gameData.preview_image || '/placeholder.jpg',
-                  categories: normalizedCategories,
-                  description: gameData.description
-                }
-                games.push(game)
-              }
-            } catch (error) {
-              console.error(`Error processing file ${file} in directory ${subdir}:`, error)
-            }
-          }
-        }
-      } else if (stats.isFile() && subdir.endsWith('.json')) {
-        // 处理根目录下的 JSON 文件
-        try {
-          const filePath = path.join(scrapedDataDir, subdir)
-          const content = await fs.readFile(filePath, 'utf-8')
-          const gameData = JSON.parse(content)
-          
-          // 标准化游戏的分类名称
-          const normalizedCategories = (gameData.categories || []).map(normalizeCategory)
-          
-          // 检查游戏是否属于当前分类（考虑标准化后的分类名称）
-          const normalizedCategoryName = normalizeCategory(categoryName)
-          if (normalizedCategories.includes(normalizedCategoryName)) {
-            const game: GameData = {
-              id: subdir.replace('.json', ''),
-              source: 'root',
-              title: gameData.title || 'Untitled Game',
-              preview_image: gameData.preview_image || '/placeholder.jpg',
-              categories: normalizedCategories,
-              description: gameData.description
-            }
-            games.push(game)
-          }
-        } catch (error) {
-          console.error(`Error processing root file ${subdir}:`, error)
-        }
-      }
+    const { mtimeMs } = await fs.stat(categoryIndexPath)
+    if (!cachedIndex || cachedIndex.mtimeMs !== mtimeMs) {
+      const content = await fs.readFile(categoryIndexPath, 'utf-8')
+      cachedIndex = { mtimeMs, index: JSON.parse(content) }
     }
-  } catch (error) {
-    console.error(`Error reading games for category ${categoryName}:`, error)
+    return cachedIndex.index
+  } catch {
+    return null
+  }
+}
+
+// 通过索引查找分类下的游戏，索引不存在时返回 null
+async function getGamesFromIndex(categoryName: string): Promise<GameData[] | null> {
+  const index = await loadCategoryIndex()
+  if (!index) {
+    return null
+  }
+
+  // 索引按规范分类 id 组织，ids 是差值编码的有序数组
+  const entry = index.category[categoryId(categoryName)]
+  if (!entry) {
+    return []
   }
 
+  const games: GameData[] = []
+  let current = 0
+  for (const delta of entry.ids) {
+    current += delta
+    games.push(index.games[current])
+  }
   return games
 }
 
-export default async function CategoryPage({ params }: { params: { name: string } }) {
+export default async function CategoryPage({ params, searchParams }: { params: { name: string }; searchParams?: { page?: string } }) {
   const categoryName = decodeURIComponent(params.name)
-  const games = await getGamesForCategory(categoryName)
+  const page = Math.max(1, parseInt(searchParams?.page || '1', 10) || 1)
   const description = categoryDescriptions[categoryName] || `Browse our collection of ${categoryName.toLowerCase()} games.`
 
+  const sharded = await getGamesFromShards(categoryName, page)
+  const games: ShardCard[] = sharded?.games ?? ((await getGamesFromIndex(categoryName)) ?? []).map(game => ({
+    source: game.source,
+    id: game.id,
+    title: game.title,
+    image: game.thumbnail || game.preview_image,
+  }))
+  const pages = sharded?.pages ?? 1
+
   // 验证每个游戏对象的完整性
   const validGames = games.filter(game => {
     const isValid = game && game.id && game.source && game.title
@@ -192,18 +146,22 @@ export default async function CategoryPage({ params }: { params: { name: string
     return isValid
   })
 
+  const pageHref = (target: number) => `/category/${encodeURIComponent(categoryName)}?page=${target}`
+
   return (
     <div className="p-6">
       <h1 className="text-2xl font-bold mb-2">{categoryName}</h1>
       <p className="text-gray-400 mb-6">{description}</p>
+
+      <PopularGames category={categoryName} />
       
       <div className="grid grid-cols-1 sm:grid-cols-2 md:grid-cols-3 lg:grid-cols-4 xl:grid-cols-6 gap-4">
         {validGames.map((game) => (
           <GameCard
             key={`${game.source}-${game.id}`}
             title={game.title}
-            image={game.preview_image}
-            href={`/game/${encodeURIComponent(game.source)}/${encodeURIComponent(game.id)}`}
+            image={game.image}
+            href={gameHref(game)}
           />
         ))}
       </div>
@@ -213,6 +171,14 @@ export default async function CategoryPage({ params }: { params: { name: string
           No games found in this category.
         </div>
       )}
+
+      {pages > 1 && (
+        <nav className="flex items-center justify-center gap-4 mt-8 text-sm">
+          {page > 1 && <a href={pageHref(page - 1)} className="text-green-400 hover:text-green-300">Previous</a>}
+          <span className="text-gray-400">Page {page} of {pages}</span>
+          {page < pages && <a href={pageHref(page + 1)} className="text-green-400 hover:text-green-300">Next</a>}
+        </nav>
+      )}
     </div>
   )
-} 
\ No newline at end of file
+}
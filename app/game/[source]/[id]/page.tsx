@@ -1,6 +1,7 @@
 import { promises as fs } from 'fs'
 import path from 'path'
 import { GameDetail } from '@/components/game-detail'
+import { RelatedGames } from '@/components/related-games'
 
 interface GameDetailPageProps {
   params: {
@@ -28,10 +29,13 @@ export default async function GameDetailPage({ params }: GameDetailPageProps) {
     game.id = id
 
     return (
-      <GameDetail 
-        game={game} 
-        onBack={() => {}} // 这个函数在客户端组件中会被覆盖
-      />
+      <>
+        <GameDetail 
+          game={game} 
+          onBack={() => {}} // 这个函数在客户端组件中会被覆盖
+        />
+        <RelatedGames related={game.related} />
+      </>
     )
   } catch (error) {
     console.error(`Error loading game ${id} from ${source}:`, error)
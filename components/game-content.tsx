@@ -1,7 +1,9 @@
 import { useGameStore } from '@/lib/store'
 import { GameDetail } from './game-detail'
 import Image from 'next/image'
-import { useEffect, useRef } from 'react'
+import Link from 'next/link'
+import { SHARDS_MANIFEST_URL, ShardCard, ShardManifest, gameHref, shardListName } from '@/lib/shards'
+import { useEffect, useRef, useState } from 'react'
 
 const categoryDescriptions: Record<string, string> = {
   'All games': 'Browse our complete collection of free online games.',
@@ -31,9 +33,34 @@ const categoryDescriptions: Record<string, string> = {
   'Strategy': 'Plan your moves and outsmart your opponents.',
 }
 
+// manifest 在页面生命周期内只请求一次
+let manifestRequest: Promise<ShardManifest | null> | null = null
+
+function fetchManifest(): Promise<ShardManifest | null> {
+  if (!manifestRequest) {
+    manifestRequest = fetch(SHARDS_MANIFEST_URL)
+      .then(response => (response.ok ? response.json() : null))
+      .catch(() => null)
+  }
+  return manifestRequest
+}
+
+// 分片请求失败时抛出错误，不把错误页面当作 JSON 解析；下次加载时重新请求 manifest（可能已经过期）
+async function fetchShard(path: string): Promise<ShardCard[]> {
+  const response = await fetch(path)
+  if (!response.ok) {
+    manifestRequest = null
+    throw new Error(`Failed to load ${path}: HTTP ${response.status}`)
+  }
+  return response.json()
+}
+
 export function GameContent() {
-  const { selectedCategory, selectedGame, games, setSelectedGame } = useGameStore()
+  const { selectedCategory, selectedGame, setSelectedGame } = useGameStore()
   const previousCategory = useRef(selectedCategory)
+  const [manifest, setManifest] = useState<ShardManifest | null>(null)
+  const [games, setGames] = useState<ShardCard[]>([])
+  const [loadedPages, setLoadedPages] = useState(0)
   
   // 只在分类变化时，且在游戏详情页面时，才返回到分类页面
   useEffect(() => {
@@ -43,14 +70,44 @@ export function GameContent() {
     previousCategory.current = selectedCategory
   }, [selectedCategory, selectedGame, setSelectedGame])
 
+  const listName = shardListName(selectedCategory)
+  const pages = manifest?.categories[listName]?.pages ?? []
+
+  // 分类变化时只加载第一页分片（只含卡片字段），其余页按需加载
+  useEffect(() => {
+    let cancelled = false
+    setGames([])
+    setLoadedPages(0)
+    fetchManifest().then(async (loaded) => {
+      const first = loaded?.categories[listName]?.pages[0]
+      if (cancelled) return
+      setManifest(loaded)
+      if (!first) return
+      const cards = await fetchShard(first.path)
+      if (!cancelled) {
+        setGames(cards)
+        setLoadedPages(1)
+      }
+    }).catch(error => console.error('Failed to load games:', error))
+    return () => { cancelled = true }
+  }, [listName])
+
+  const loadMore = async () => {
+    const next = pages[loadedPages]
+    if (!next) return
+    try {
+      const cards = await fetchShard(next.path)
+      setGames(current => [...current, ...cards])
+      setLoadedPages(loadedPages + 1)
+    } catch (error) {
+      console.error('Failed to load games:', error)
+    }
+  }
+
   if (selectedGame) {
     return <GameDetail game={selectedGame} onBack={() => setSelectedGame(null)} />
   }
 
-  const filteredGames = selectedCategory === 'All games' 
-    ? games 
-    : games.filter(game => game.categories.includes(selectedCategory))
-
   return (
     <div className="flex-1 p-6">
       <div className="mb-8">
@@ -61,15 +118,15 @@ export function GameContent() {
       </div>
 
       <div className="grid grid-cols-1 sm:grid-cols-2 md:grid-cols-3 lg:grid-cols-4 xl:grid-cols-6 gap-4">
-        {filteredGames.map((game, index) => (
-          <div 
-            key={index} 
+        {games.map((game) => (
+          <Link
+            key={`${game.source}-${game.id}`}
+            href={gameHref(game)}
             className="bg-gray-800 rounded-lg overflow-hidden hover:bg-gray-700 transition-colors cursor-pointer"
-            onClick={() => setSelectedGame(game)}
           >
             <div className="relative aspect-square">
               <Image
-                src={game.preview_image}
+                src={game.image || '/placeholder.jpg'}
                 alt={game.title}
                 fill
                 className="object-cover"
@@ -78,9 +135,17 @@ export function GameContent() {
             <div className="p-2 text-center">
               <h3 className="text-white font-medium text-sm truncate">{game.title}</h3>
             </div>
-          </div>
+          </Link>
         ))}
       </div>
+
+      {loadedPages < pages.length && (
+        <div className="flex justify-center mt-8">
+          <button onClick={loadMore} className="text-green-400 hover:text-green-300 text-sm font-medium">
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   )
-} 
\ No newline at end of file
+}
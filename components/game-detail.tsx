@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useRef, useState } from 'react'
 import { ArrowLeft, Maximize } from 'lucide-react'
 import { Button } from './ui/button'
 
@@ -8,6 +8,8 @@ interface GameDetailProps {
     description: string
     iframe_url: string
     html_content: string
+    source?: string
+    id?: string
   }
   onBack: () => void
 }
@@ -124,6 +126,16 @@ export function GameDetail({ game, onBack }: GameDetailProps) {
     }
   }
 
+  // 游戏加载后记录一次游玩事件，用于生成热门列表（scripts/build_popularity.py）
+  // iframe 内的重新加载和跳转也会触发 onLoad，每次打开游戏只记录第一次
+  const playRecorded = useRef(false)
+  const recordPlay = () => {
+    if (playRecorded.current) return
+    if (!game.source || !game.id || typeof navigator === 'undefined' || !navigator.sendBeacon) return
+    playRecorded.current = true
+    navigator.sendBeacon('/api/events', JSON.stringify({ type: 'play', source: game.source, id: game.id }))
+  }
+
   const toggleFullscreen = () => {
     const iframe = document.getElementById('gameFrame') as HTMLIFrameElement
     if (!iframe) return
@@ -204,6 +216,7 @@ export function GameDetail({ game, onBack }: GameDetailProps) {
             className="absolute inset-0 w-full h-full"
             frameBorder="0"
             allowFullScreen
+            onLoad={recordPlay}
           />
         </div>
       </div>
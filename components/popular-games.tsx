@@ -1,58 +1,63 @@
-import { ChevronRight } from "lucide-react"
+import { promises as fs } from 'fs'
+import path from 'path'
 import { GameCard } from "@/components/game-card"
+import { categoryId } from '@/lib/taxonomy'
+
+interface PopularGame {
+  source: string
+  id: string
+  title: string
+  preview_image: string
+  thumbnail?: string | null
+  score: number
+}
+
+interface PopularData {
+  all: PopularGame[]
+  categories: { [categoryId: string]: PopularGame[] }
+}
+
+// 热门列表由 scripts/build_popularity.py 根据游玩/点击事件生成，按修改时间缓存
+const popularPath = path.join(process.cwd(), 'catalog', 'popular.json')
+let cachedPopular: { mtimeMs: number; data: PopularData } | null = null
+
+async function loadPopular(): Promise<PopularData | null> {
+  try {
+    const { mtimeMs } = await fs.stat(popularPath)
+    if (!cachedPopular || cachedPopular.mtimeMs !== mtimeMs) {
+      const content = await fs.readFile(popularPath, 'utf-8')
+      cachedPopular = { mtimeMs, data: JSON.parse(content) }
+    }
+    return cachedPopular.data
+  } catch {
+    return null
+  }
+}
+
+export async function PopularGames({ category, limit = 12 }: { category?: string; limit?: number }) {
+  const popular = await loadPopular()
+  const games = (category ? popular?.categories[categoryId(category)] : popular?.all) ?? []
+
+  // 还没有热门数据时不显示这一栏
+  if (games.length === 0) {
+    return null
+  }
 
-const popularGames = [
-  {
-    id: 1,
-    title: "Halloween merge",
-    rating: 75,
-    image: "/placeholder.svg?height=200&width=300",
-    gradient: "from-purple-600 to-purple-800",
-  },
-  {
-    id: 2,
-    title: "Stand on the right color, Robby!",
-    rating: 69,
-    image: "/placeholder.svg?height=200&width=300",
-    gradient: "from-cyan-400 to-blue-500",
-  },
-  {
-    id: 3,
-    title: "Dark Lands: Online RPG",
-    rating: 68,
-    image: "/placeholder.svg?height=200&width=300",
-    gradient: "from-gray-700 to-gray-900",
-  },
-  {
-    id: 4,
-    title: "Crazy Crash Landing",
-    rating: 70,
-    image: "/placeholder.svg?height=200&width=300",
-    gradient: "from-green-400 to-cyan-500",
-  },
-  {
-    id: 5,
-    title: "Net Fighters",
-    rating: 75,
-    image: "/placeholder.svg?height=200&width=300",
-    gradient: "from-green-500 to-green-700",
-  },
-]
-
-export function PopularGames() {
   return (
     <section className="mb-8">
       <div className="flex items-center justify-between mb-4">
         <h2 className="text-lg lg:text-xl font-semibold text-white">Popular</h2>
-        <button className="text-green-400 hover:text-green-300 text-sm font-medium flex items-center">
-          All
-          <ChevronRight className="w-4 h-4 ml-1" />
-        </button>
       </div>
 
       <div className="flex space-x-3 lg:space-x-4 overflow-x-auto pb-4 scrollbar-hide">
-        {popularGames.map((game) => (
-          <GameCard key={game.id} game={game} />
+        {games.slice(0, limit).map((game) => (
+          <div key={`${game.source}-${game.id}`} className="w-48 flex-shrink-0">
+            <GameCard
+              title={game.title}
+              image={game.thumbnail || game.preview_image}
+              href={`/game/${encodeURIComponent(game.source)}/${encodeURIComponent(game.id)}`}
+            />
+          </div>
         ))}
       </div>
     </section>
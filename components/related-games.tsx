@@ -0,0 +1,55 @@
+import { promises as fs } from 'fs'
+import path from 'path'
+import { GameCard } from '@/components/game-card'
+
+interface IndexedGame {
+  source: string
+  id: string
+  title: string
+  preview_image: string
+  thumbnail?: string | null
+}
+
+// 相关游戏的卡片信息取自分类索引（scripts/build_category_index.py 生成），按修改时间缓存
+const categoryIndexPath = path.join(process.cwd(), 'catalog', 'category_index.json')
+let cachedGames: { mtimeMs: number; games: Map<string, IndexedGame> } | null = null
+
+async function loadIndexedGames(): Promise<Map<string, IndexedGame> | null> {
+  try {
+    const { mtimeMs } = await fs.stat(categoryIndexPath)
+    if (!cachedGames || cachedGames.mtimeMs !== mtimeMs) {
+      const content = await fs.readFile(categoryIndexPath, 'utf-8')
+      const games: IndexedGame[] = JSON.parse(content).games
+      cachedGames = { mtimeMs, games: new Map(games.map(game => [`${game.source}/${game.id}`, game])) }
+    }
+    return cachedGames.games
+  } catch {
+    return null
+  }
+}
+
+// related 是 scripts/build_related.py 写入记录的 "来源/id" 列表
+export async function RelatedGames({ related }: { related?: string[] }) {
+  const indexed = related?.length ? await loadIndexedGames() : null
+  // 不在索引中的游戏（如嵌入失效）不显示
+  const games = (related ?? []).map(key => indexed?.get(key)).filter((game): game is IndexedGame => !!game)
+  if (games.length === 0) {
+    return null
+  }
+
+  return (
+    <section className="px-6 pb-6">
+      <h2 className="text-xl font-bold text-white mb-4">Related Games</h2>
+      <div className="grid grid-cols-2 sm:grid-cols-3 lg:grid-cols-4 xl:grid-cols-6 gap-4">
+        {games.map((game) => (
+          <GameCard
+            key={`${game.source}-${game.id}`}
+            title={game.title}
+            image={game.thumbnail || game.preview_image}
+            href={`/game/${encodeURIComponent(game.source)}/${encodeURIComponent(game.id)}`}
+          />
+        ))}
+      </div>
+    </section>
+  )
+}
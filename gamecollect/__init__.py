@@ -0,0 +1 @@
+"""游戏采集站的共享 Python 工具库（爬虫与数据维护脚本共用）"""
@@ -0,0 +1,5 @@
+import sys
+
+from gamecollect.cli import main
+
+sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+原始页面存档（类 WARC 格式）
+每条记录是一个独立的 gzip 成员：WARC 风格的头部 + 渲染后的 HTML。
+多个成员直接追加在同一文件中，gzip 可以按顺序整体解压。
+"""
+import gzip
+import json
+import os
+import uuid
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from gamecollect.paths import PROJECT_ROOT
+
+ARCHIVE_DIR = os.path.join(PROJECT_ROOT, 'archive')
+
+ArchiveRecord = namedtuple('ArchiveRecord', ['source', 'url', 'fetched_at', 'kind', 'meta', 'body'])
+
+
+def encode_record(source, url, body, kind='game', meta=None, fetched_at=None):
+    """把一条记录编码为一个 gzip 成员"""
+    payload = body.encode('utf-8')
+    headers = [
+        'WARC/1.0',
+        'WARC-Type: response',
+        f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+        f"WARC-Date: {fetched_at or datetime.now(timezone.utc).isoformat()}",
+        f"WARC-Target-URI: {url}",
+        f"X-Source: {source}",
+        f"X-Page-Kind: {kind}",
+        f"X-Meta: {json.dumps(meta or {}, ensure_ascii=False)}",
+        'Content-Type: text/html; charset=utf-8',
+        f"Content-Length: {len(payload)}",
+    ]
+    block = '\r\n'.join(headers).encode('utf-8') + b'\r\n\r\n' + payload + b'\r\n\r\n'
+    return gzip.compress(block, compresslevel=6)
+
+
+class ArchiveWriter:
+    """
+    追加写入某个来源的存档文件: archive/<source>/<日期>-<pid>.warc.gz
+    每个进程写自己的文件，多进程抓取时不需要加锁；首次写入时才创建文件
+    """
+
+    def __init__(self, source, archive_dir=ARCHIVE_DIR):
+        self.source = source
+        self.archive_dir = archive_dir
+        self._file = None
+        self._path = None
+
+    def _current_path(self):
+        name = f"{datetime.now().strftime('%Y%m%d')}-{os.getpid()}.warc.gz"
+        return os.path.join(self.archive_dir, self.source, name)
+
+    def write(self, url, body, kind='game', meta=None):
+        path = self._current_path()
+        if path != self._path:
+            self.close()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._file = open(path, 'ab')
+            self._path = path
+        self._file.write(encode_record(self.source, url, body, kind, meta))
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            self._path = None
+
+
+def read_archive(path):
+    """顺序读取一个存档文件中的所有记录"""
+    with gzip.open(path, 'rb') as f:
+        while True:
+            line = f.readline()
+            if not line:
+                return
+            if line.strip() != b'WARC/1.0':
+                raise ValueError(f"Malformed archive record in {path}")
+            headers = {}
+            while True:
+                line = f.readline().rstrip(b'\r\n')
+                if not line:
+                    break
+                name, _, value = line.decode('utf-8').partition(': ')
+                headers[name] = value
+            body = f.read(int(headers['Content-Length'])).decode('utf-8')
+            f.read(4)
+            yield ArchiveRecord(
+                source=headers['X-Source'],
+                url=headers['WARC-Target-URI'],
+                fetched_at=headers['WARC-Date'],
+                kind=headers.get('X-Page-Kind', 'game'),
+                meta=json.loads(headers.get('X-Meta') or '{}'),
+                body=body,
+            )
+
+
+def archive_files(archive_dir=ARCHIVE_DIR, sources=None):
+    """列出存档文件（按来源、文件名排序，即按时间顺序）"""
+    if not os.path.isdir(archive_dir):
+        return []
+    paths = []
+    for source in sorted(os.listdir(archive_dir)):
+        source_dir = os.path.join(archive_dir, source)
+        if (sources and source not in sources) or not os.path.isdir(source_dir):
+            continue
+        paths += [os.path.join(source_dir, name) for name in sorted(os.listdir(source_dir))
+                  if name.endswith('.warc.gz')]
+    return paths
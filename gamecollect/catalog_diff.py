@@ -0,0 +1,199 @@
+"""
+两次抓取之间的目录差异
+目录快照是按键（<来源>/<id>）排序的 gzip JSON Lines 文件（catalog/snapshots/），每行 "键\\t记录JSON"。
+语料目录先经外部排序（内存中排序固定行数的块，写入临时文件后多路归并）转换为同样的有序流，
+再对两个有序流做归并连接：内存占用只取决于排序块大小，与目录规模无关。
+"""
+import gzip
+import heapq
+import json
+import os
+import tempfile
+from datetime import datetime
+from itertools import groupby
+
+from gamecollect.changes import IGNORED_FIELDS, OMITTED_FIELDS
+from gamecollect.corpus import map_records
+from gamecollect.paths import CATALOG_DIR, SCRAPED_DATA_DIR, route_source
+
+try:
+    import orjson
+except ImportError:  # orjson 不可用时退回标准库
+    orjson = None
+
+SNAPSHOTS_DIR = os.path.join(CATALOG_DIR, 'snapshots')
+DIFFS_DIR = os.path.join(CATALOG_DIR, 'diffs')
+
+# 外部排序时每个内存块的行数
+SORT_CHUNK_LINES = 50000
+
+# 字段变化的类型（报告中按类型汇总）
+CHANGE_KINDS = {
+    'iframe_url': 'iframe_moved',
+    'url': 'url_changed',
+    'preview_image': 'image_changed',
+    'categories': 'categories_changed',
+    'category_ids': 'categories_changed',
+    'title': 'title_changed',
+    'description': 'description_changed',
+    'instructions': 'description_changed',
+    'tags': 'tags_changed',
+    'embed_status': 'embed_status_changed',
+}
+# 与分类相关的派生字段，变化已体现在 categories_changed 中
+DERIVED_CATEGORY_FIELDS = ('category_icons', 'source_categories')
+
+
+def _dumps(record):
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_SORT_KEYS).decode('utf-8')
+    return json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+
+def _loads(text):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def snapshot_line(corpus_file, record):
+    """语料中一条记录在快照中的行（在进程池中执行）"""
+    game_id = record.get('id') or os.path.basename(corpus_file.path)[:-len('.json')]
+    record = {k: v for k, v in record.items() if k not in IGNORED_FIELDS and k not in OMITTED_FIELDS}
+    record['id'] = game_id
+    key = f"{route_source(corpus_file.rel_dir)}/{game_id}"
+    return f"{key}\t{_dumps(record)}\n"
+
+
+def _write_run(lines, tmp_dir):
+    fd, path = tempfile.mkstemp(dir=tmp_dir, prefix='.sort-', suffix='.txt')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.writelines(sorted(lines))
+    return path
+
+
+def external_sort(lines, chunk_lines=SORT_CHUNK_LINES, tmp_dir=None):
+    """
+    对任意多的文本行排序：每 chunk_lines 行排序后写入临时文件，最后用 heapq.merge 归并
+    "\\t" 小于键中可能出现的任何字符，整行排序即按键排序
+    """
+    runs, chunk = [], []
+    try:
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= chunk_lines:
+                runs.append(_write_run(chunk, tmp_dir))
+                chunk = []
+        if not runs:
+            yield from sorted(chunk)
+            return
+        if chunk:
+            runs.append(_write_run(chunk, tmp_dir))
+        chunk = []
+        files = [open(path, 'r', encoding='utf-8') for path in runs]
+        try:
+            yield from heapq.merge(*files)
+        finally:
+            for f in files:
+                f.close()
+    finally:
+        for path in runs:
+            os.remove(path)
+
+
+def corpus_lines(root=SCRAPED_DATA_DIR, workers=None, chunk_lines=SORT_CHUNK_LINES):
+    """语料目录按键排序后的快照行"""
+    lines = (line for line in map_records(snapshot_line, root=root, workers=workers) if line)
+    yield from external_sort(lines, chunk_lines)
+
+
+def snapshot_lines(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        yield from f
+
+
+def write_snapshot(lines, path):
+    """把有序的快照行写入 gzip 文件（先写临时文件再原子替换），返回行数"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    count = 0
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line)
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def latest_snapshot(directory=SNAPSHOTS_DIR):
+    if not os.path.isdir(directory):
+        return None
+    names = sorted(name for name in os.listdir(directory) if name.endswith('.jsonl.gz'))
+    return os.path.join(directory, names[-1]) if names else None
+
+
+def new_snapshot_path(directory=SNAPSHOTS_DIR):
+    return os.path.join(directory, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl.gz")
+
+
+def iter_keyed(lines):
+    """有序快照行 -> (键, 记录)；同一键有多个副本（html5games 各分类目录）时取第一个"""
+    for key, group in groupby(lines, key=lambda line: line.split('\t', 1)[0]):
+        yield key, _loads(next(group).split('\t', 1)[1])
+
+
+def field_changes(before, after):
+    """字段级变化：列表字段给出增删的元素，其他字段给出前后值"""
+    changes = {}
+    for field in sorted(before.keys() | after.keys()):
+        old, new = before.get(field), after.get(field)
+        if old == new or field in DERIVED_CATEGORY_FIELDS:
+            continue
+        if isinstance(old, list) or isinstance(new, list):
+            old_items, new_items = old or [], new or []
+            changes[field] = {
+                'added': [v for v in new_items if v not in old_items],
+                'removed': [v for v in old_items if v not in new_items],
+            }
+        else:
+            changes[field] = {'before': old, 'after': new}
+    return changes
+
+
+def diff_streams(old, new):
+    """
+    对两个按键有序的 (键, 记录) 流做归并连接
+    产出 {'key', 'op': 'added' | 'removed' | 'changed', 'kinds', 'fields'}
+    """
+    old, new = iter(old), iter(new)
+    old_item, new_item = next(old, None), next(new, None)
+    while old_item is not None or new_item is not None:
+        if new_item is None or (old_item is not None and old_item[0] < new_item[0]):
+            yield {'key': old_item[0], 'op': 'removed', 'title': old_item[1].get('title')}
+            old_item = next(old, None)
+        elif old_item is None or new_item[0] < old_item[0]:
+            yield {'key': new_item[0], 'op': 'added', 'title': new_item[1].get('title')}
+            new_item = next(new, None)
+        else:
+            fields = field_changes(old_item[1], new_item[1])
+            if fields:
+                kinds = sorted({CHANGE_KINDS.get(field, 'other_changed') for field in fields})
+                yield {'key': new_item[0], 'op': 'changed', 'title': new_item[1].get('title'),
+                       'kinds': kinds, 'fields': fields}
+            old_item, new_item = next(old, None), next(new, None)
+
+
+def write_report(changes, path):
+    """
+    把变化逐行写入 JSON Lines 报告，返回汇总：
+    {'added': n, 'removed': n, 'changed': n, 'kinds': {类型: n}}
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    summary = {'added': 0, 'removed': 0, 'changed': 0, 'kinds': {}}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for change in changes:
+            summary[change['op']] += 1
+            for kind in change.get('kinds', ()):
+                summary['kinds'][kind] = summary['kinds'].get(kind, 0) + 1
+            f.write(json.dumps(change, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, path)
+    return summary
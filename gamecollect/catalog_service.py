@@ -0,0 +1,251 @@
+"""
+独立的目录查询服务（asyncio，只依赖标准库）
+启动时把分类索引（catalog/category_index.json）读入内存，按分类、来源、标签和标题关键词过滤，
+支持分页、字段投影和 ETag；索引文件被替换后在后台重新加载，再原子地切换到新数据。
+"""
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlsplit
+
+from gamecollect.facets import INDEX_FILE, FacetIndex, intersect
+from gamecollect.taxonomy import load_taxonomy
+
+try:
+    import orjson
+except ImportError:  # orjson 不可用时退回标准库
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+CARD_FIELDS = ('source', 'id', 'title', 'preview_image', 'thumbnail', 'categories', 'category_ids', 'tags')
+DEFAULT_PER_PAGE = 48
+MAX_PER_PAGE = 200
+RESPONSE_CACHE_SIZE = 4096
+MAX_REQUEST_HEADER = 16 * 1024
+
+_WORD = re.compile(r'\w+')
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class Catalog:
+    """
+    一个不可变的目录快照及其内存索引
+    过滤条件都转换为有序的文档id数组后求交集；查询结果按规范化后的查询参数缓存
+    """
+
+    def __init__(self, data, etag):
+        index = FacetIndex(data)
+        self.etag = etag
+        self.built_at = data.get('built_at')
+        self.loaded_at = time.time()
+        self.games = index.games
+        self.categories = {value: index.postings('category', value) for value in index.facet_counts('category')}
+        self.tags = {value: index.postings('tag', value) for value in index.facet_counts('tag')}
+        self.sources = {}
+        self.words = {}
+        for doc_id, game in enumerate(self.games):
+            self.sources.setdefault(game['source'], []).append(doc_id)
+            for word in set(_WORD.findall(game['title'].lower())):
+                self.words.setdefault(word, []).append(doc_id)
+        self.vocabulary = sorted(self.words)
+        self.taxonomy = load_taxonomy()
+        self._cache = OrderedDict()
+
+    def _prefix_ids(self, prefix):
+        """以 prefix 开头的所有词对应的文档（用于输入中的最后一个词）"""
+        ids = set()
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        for word in self.vocabulary[start:]:
+            if not word.startswith(prefix):
+                break
+            ids.update(self.words[word])
+        return sorted(ids)
+
+    def match(self, category=None, source=None, tag=None, q=None):
+        id_lists = []
+        if category:
+            id_lists.append(self.categories.get(self.taxonomy.resolve(category)['id'], []))
+        if source:
+            id_lists.append(self.sources.get(source, []))
+        if tag:
+            id_lists.append(self.tags.get(tag, []))
+        if q:
+            words = _WORD.findall(q.lower())
+            id_lists += [self.words.get(word, []) for word in words[:-1]]
+            if words:
+                id_lists.append(self._prefix_ids(words[-1]))
+        if not id_lists:
+            return range(len(self.games))
+        return intersect(*id_lists)
+
+    def query(self, params):
+        """
+        执行查询，返回 (状态码, 响应体 bytes)；相同参数的结果直接从缓存返回
+        params: category / source / tag / q / page / per_page / fields
+        """
+        key = tuple(sorted(params.items()))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        try:
+            page = max(1, int(params.get('page', 1)))
+            per_page = min(MAX_PER_PAGE, max(1, int(params.get('per_page', DEFAULT_PER_PAGE))))
+        except ValueError:
+            return 400, dumps({'error': 'page and per_page must be integers'})
+        fields = [f for f in params.get('fields', '').split(',') if f] or list(CARD_FIELDS)
+        unknown = [f for f in fields if f not in CARD_FIELDS]
+        if unknown:
+            return 400, dumps({'error': f"unknown fields: {', '.join(unknown)}"})
+
+        ids = self.match(params.get('category'), params.get('source'), params.get('tag'), params.get('q'))
+        start = (page - 1) * per_page
+        games = [{f: self.games[doc_id].get(f) for f in fields} for doc_id in ids[start:start + per_page]]
+        result = (200, dumps({'total': len(ids), 'page': page, 'per_page': per_page, 'games': games}))
+
+        self._cache[key] = result
+        if len(self._cache) > RESPONSE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return result
+
+    def response_etag(self, params):
+        """ETag 只取决于快照和查询参数，命中 If-None-Match 时无需执行查询"""
+        query = '&'.join(f"{k}={v}" for k, v in sorted(params.items()))
+        return f'"{self.etag}-{hashlib.blake2b(query.encode("utf-8"), digest_size=6).hexdigest()}"'
+
+    def facets(self):
+        return dumps({
+            'category': {value: len(ids) for value, ids in self.categories.items()},
+            'source': {value: len(ids) for value, ids in self.sources.items()},
+            'tag': {value: len(ids) for value, ids in self.tags.items()},
+        })
+
+
+def load_catalog(path=INDEX_FILE):
+    with open(path, 'rb') as f:
+        content = f.read()
+    data = orjson.loads(content) if orjson is not None else json.loads(content.decode('utf-8'))
+    return Catalog(data, hashlib.blake2b(content, digest_size=8).hexdigest())
+
+
+class CatalogService:
+    """HTTP/1.1 服务（支持 keep-alive），只处理 GET/HEAD"""
+
+    def __init__(self, index_path=INDEX_FILE, reload_interval=2.0):
+        self.index_path = index_path
+        self.reload_interval = reload_interval
+        self.catalog = load_catalog(index_path)
+        self._mtime = os.stat(index_path).st_mtime_ns
+        logger.info(f"Loaded {len(self.catalog.games)} games from {index_path}")
+
+    async def watch(self):
+        """索引文件被替换（write_json_atomic 原子写入）后，在线程中加载新快照再切换"""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                mtime = os.stat(self.index_path).st_mtime_ns
+                if mtime == self._mtime:
+                    continue
+                catalog = await asyncio.to_thread(load_catalog, self.index_path)
+                self.catalog, self._mtime = catalog, mtime
+                logger.info(f"Reloaded catalog: {len(catalog.games)} games (etag {catalog.etag})")
+            except Exception as e:
+                logger.error(f"Error reloading catalog: {str(e)}")
+
+    def route(self, method, target, headers):
+        """返回 (状态码, 响应头, 响应体)"""
+        if method not in ('GET', 'HEAD'):
+            return 405, {'Allow': 'GET, HEAD'}, dumps({'error': 'method not allowed'})
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        catalog = self.catalog  # 整个请求使用同一个快照
+        if url.path == '/games':
+            etag = catalog.response_etag(params)
+            cache_headers = {'ETag': etag, 'Cache-Control': 'public, max-age=0, must-revalidate'}
+            if headers.get('if-none-match') == etag:
+                return 304, cache_headers, b''
+            status, body = catalog.query(params)
+            return status, cache_headers if status == 200 else {}, body
+        if url.path == '/facets':
+            return 200, {'ETag': f'"{catalog.etag}"'}, catalog.facets()
+        if url.path == '/health':
+            return 200, {}, dumps({'games': len(catalog.games), 'etag': catalog.etag,
+                                   'built_at': catalog.built_at, 'loaded_at': catalog.loaded_at})
+        return 404, {}, dumps({'error': 'not found'})
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    writer.write(self._response(400, {}, dumps({'error': 'header too large'}), False, False))
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ', 2)
+                except ValueError:
+                    writer.write(self._response(400, {}, dumps({'error': 'bad request line'}), False, False))
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                # 只支持没有请求体的请求
+                length = headers.get('content-length', '') or '0'
+                if not length.isdigit():
+                    writer.write(self._response(400, {}, dumps({'error': 'bad content-length'}), False, False))
+                    break
+                if int(length):
+                    await reader.readexactly(int(length))
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close') or \
+                             headers.get('connection', '').lower() == 'keep-alive'
+                status, extra, body = self.route(method, target, headers)
+                writer.write(self._response(status, extra, body, keep_alive, method == 'HEAD'))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except Exception as e:
+            logger.error(f"Error handling request: {str(e)}")
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _response(status, extra, body, keep_alive, head_only):
+        headers = [
+            f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status != 304:
+            headers.append('Content-Type: application/json; charset=utf-8')
+        headers += [f"{name}: {value}" for name, value in extra.items()]
+        return ('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + (b'' if head_only or status == 304 else body)
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_REQUEST_HEADER)
+        logger.info(f"Catalog service listening on http://{host}:{port}")
+        watcher = asyncio.create_task(self.watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
@@ -0,0 +1,231 @@
+"""
+目录变更日志
+每次记录被新增、修改或删除时追加一条带单调递增版本号的变更（catalog/changes.sqlite3），
+客户端和缓存只需要按 "自版本 N 以来的变更" 增量同步。旧的变更定期压缩进基础快照：
+版本早于快照的客户端需要先下载完整快照。
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from gamecollect.paths import CATALOG_DIR, SCRAPED_DATA_DIR, route_source
+
+logger = logging.getLogger(__name__)
+
+CHANGES_DB = os.path.join(CATALOG_DIR, 'changes.sqlite3')
+
+# 不影响内容的字段（每次抓取都会变化，或只是 html5games 各分类目录副本之间的差别）
+IGNORED_FIELDS = ('scraped_at', 'first_seen_at', 'category')
+# 变更中不携带的大字段，详情页直接读取记录文件
+OMITTED_FIELDS = ('html_content',)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    op TEXT NOT NULL,
+    record TEXT,
+    changed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS current (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot (
+    key TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def record_key(output_dir, record):
+    """变更日志中的键与网站路由一致：<来源>/<id>"""
+    rel_dir = os.path.relpath(output_dir, SCRAPED_DATA_DIR)
+    return f"{route_source(rel_dir)}/{record.get('id')}"
+
+
+def feed_view(record):
+    return {k: v for k, v in record.items() if k not in OMITTED_FIELDS}
+
+
+def fingerprint(record):
+    content = json.dumps({k: v for k, v in feed_view(record).items() if k not in IGNORED_FIELDS},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ChangeLog:
+    """
+    变更日志（SQLite WAL，多个抓取进程可以同时写入）
+    changes 保存快照之后的变更；current 保存每个现存记录的内容指纹，用于去掉没有实际变化的写入
+    """
+
+    def __init__(self, path=CHANGES_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def _transaction(self, mode='IMMEDIATE'):
+        """正常结束时提交；出现异常时回滚，不会留下只执行了一半的变更"""
+        self.conn.execute(f'BEGIN {mode}')
+        try:
+            yield
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        else:
+            self.conn.execute('COMMIT')
+
+    def _meta(self, name):
+        row = self.conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def version(self):
+        row = self.conn.execute("SELECT MAX(version) FROM changes").fetchone()
+        return max(row[0] or 0, self._meta('base_version'))
+
+    def base_version(self):
+        return self._meta('base_version')
+
+    def _record(self, key, record, now):
+        """在当前事务中记录一条变更，没有实际变化时返回 None"""
+        row = self.conn.execute("SELECT fingerprint FROM current WHERE key = ?", (key,)).fetchone()
+        if record is None:
+            if row is None:
+                return None
+            self.conn.execute("DELETE FROM current WHERE key = ?", (key,))
+            op, payload, fp = 'delete', None, None
+        else:
+            fp = fingerprint(record)
+            if row is not None and row[0] == fp:
+                return None
+            op = 'insert' if row is None else 'update'
+            payload = json.dumps(feed_view(record), ensure_ascii=False, separators=(',', ':'))
+        version = self.conn.execute(
+            "INSERT INTO changes (key, op, record, changed_at) VALUES (?, ?, ?, ?)",
+            (key, op, payload, now)).lastrowid
+        if fp is not None:
+            self.conn.execute("INSERT OR REPLACE INTO current (key, fingerprint, version) VALUES (?, ?, ?)",
+                              (key, fp, version))
+        return version
+
+    def record(self, key, record):
+        """记录一个键的新内容（record 为 None 表示删除），返回新版本号；内容没有变化时返回 None"""
+        with self._transaction():
+            return self._record(key, record, time.time())
+
+    def reconcile(self, records):
+        """
+        与完整语料对齐：records 为 {key: record}，不在其中的现存键记为删除
+        用于捕获绕过 upsert_game 直接改写或删除文件的变化
+        :return: {'insert': n, 'update': n, 'delete': n, 'unchanged': n}
+        """
+        stats = {'insert': 0, 'update': 0, 'delete': 0, 'unchanged': 0}
+        now = time.time()
+        with self._transaction():
+            existing = {key for (key,) in self.conn.execute("SELECT key FROM current")}
+            for key, record in records.items():
+                op = 'update' if key in existing else 'insert'
+                stats[op if self._record(key, record, now) else 'unchanged'] += 1
+            for key in existing - set(records):
+                self._record(key, None, now)
+                stats['delete'] += 1
+        return stats
+
+    def changes_since(self, since, limit=1000):
+        """
+        返回版本 since 之后的变更（同一个键只保留最新的一条）
+        since 早于基础快照（或晚于当前版本，如日志被重建）时返回 reset=True，客户端需要先读取 snapshot()
+        """
+        base = self.base_version()
+        current = self.version()
+        if since < base or since > current:
+            return {'reset': True, 'base_version': base, 'version': current, 'changes': []}
+        rows = self.conn.execute(
+            "SELECT version, key, op, record FROM changes WHERE version > ? ORDER BY version LIMIT ?",
+            (since, limit)).fetchall()
+        latest = {}
+        for version, key, op, record in rows:
+            latest[key] = {'version': version, 'key': key, 'op': op,
+                           'record': json.loads(record) if record else None}
+        upto = rows[-1][0] if rows else since
+        return {
+            'reset': False,
+            'base_version': base,
+            'version': upto,
+            'more': upto < current,
+            'changes': sorted(latest.values(), key=lambda change: change['version']),
+        }
+
+    def snapshot(self):
+        """
+        当前完整状态：基础快照叠加其后的变更，返回 (版本, {key: record})
+        """
+        with self._transaction('DEFERRED'):
+            version = self.version()
+            state = {key: record for key, record in self.conn.execute("SELECT key, record FROM snapshot")}
+            for key, op, record in self.conn.execute("SELECT key, op, record FROM changes ORDER BY version"):
+                if op == 'delete':
+                    state.pop(key, None)
+                else:
+                    state[key] = record
+        return version, {key: json.loads(record) for key, record in state.items()}
+
+    def compact(self, keep=0):
+        """
+        把除最近 keep 条以外的变更合并进基础快照，返回新的基础版本
+        版本早于新基础版本的客户端下次同步时会收到 reset
+        """
+        with self._transaction():
+            row = self.conn.execute(
+                "SELECT version FROM changes ORDER BY version DESC LIMIT 1 OFFSET ?", (keep,)).fetchone()
+            if row is None:
+                return self.base_version()
+            cutoff = row[0]
+            for version, key, op, record in self.conn.execute(
+                    "SELECT version, key, op, record FROM changes WHERE version <= ? ORDER BY version", (cutoff,)
+            ).fetchall():
+                if op == 'delete':
+                    self.conn.execute("DELETE FROM snapshot WHERE key = ?", (key,))
+                else:
+                    self.conn.execute("INSERT OR REPLACE INTO snapshot (key, record, version) VALUES (?, ?, ?)",
+                                      (key, record, version))
+            self.conn.execute("DELETE FROM changes WHERE version <= ?", (cutoff,))
+            self.conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('base_version', ?)", (cutoff,))
+        self.conn.execute('VACUUM')
+        return cutoff
+
+
+_change_log = None
+
+
+def log_change(output_dir, record):
+    """
+    upsert_game 写入记录后调用；删除和绕过 upsert_game 的修改由 ChangeLog.reconcile 捕获
+    （html5games 的同一游戏在多个分类目录下有副本，删除单个文件不代表游戏被删除）
+    每个进程复用一个连接；写日志失败不影响记录本身的保存
+    """
+    global _change_log
+    try:
+        if _change_log is None or _change_log[0] != os.getpid():
+            _change_log = (os.getpid(), ChangeLog())
+        _change_log[1].record(record_key(output_dir, record), record)
+    except Exception as e:
+        logger.warning(f"Could not record change for {record.get('id')}: {str(e)}")
@@ -0,0 +1,130 @@
+"""
+统一的命令行入口：python -m gamecollect <子命令> [参数...]
+每个子命令对应一个已有脚本，选定子命令后才执行该脚本（runpy），浏览器、HTTP 客户端等重量级依赖
+只在需要它们的子命令中导入；子命令之后的参数原样交给脚本自己的参数解析（包括 --help）。
+没有参数解析的脚本（NO_ARGS_SCRIPTS）不会被 --help 启动，由本模块输出该子命令的说明。
+本模块只能导入标准库中的轻量模块，启动耗时由 scripts/benchmark_startup.py 检查。
+"""
+import argparse
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 各来源的爬虫脚本（相对项目根目录）；all 为多进程分片抓取
+CRAWLERS = {
+    'onlinegames': 'scripts/game_scraper.py',
+    '1000webgames': '1000webgames_scraper.py',
+    'html5games': 'html5games_scraper.py',
+    'gamedistribution': 'gamedistribution_scraper.py',
+    'jopi': 'scripts/jopi_scraper.py',
+    'all': 'scripts/crawl_supervisor.py',
+}
+
+# 检查类任务
+CHECKS = {
+    'embeds': 'scripts/check_embeds.py',
+    'previews': 'scripts/check_preview_images.py',
+    'extraction': 'scripts/extraction_report.py',
+    'chrome': 'scripts/check_chrome.py',
+}
+
+# 子命令 -> (脚本, 说明)
+COMMANDS = {
+    'build-catalog': ('scripts/build_category_index.py', '构建分类/标签倒排索引和分类分页分片'),
+    'organize': ('scripts/organize_games.py', '把 html5games 的记录整理到各分类目录'),
+    'categories': ('scripts/process_categories.py', '汇总所有记录的规范分类'),
+    'normalize': ('scripts/normalize_categories.py', '按分类体系重新规范化已保存的记录'),
+    'filter': ('scripts/filter_games.py', '列出属于多个分类的游戏'),
+    'search': ('scripts/build_search_index.py', '构建或查询全文搜索索引'),
+    'related': ('scripts/build_related.py', '计算相关游戏'),
+    'popularity': ('scripts/build_popularity.py', '汇总游玩事件，生成热门游戏列表'),
+    'images': ('scripts/process_images.py', '镜像预览图并生成缩略图'),
+    'reprocess': ('scripts/reprocess_archive.py', '从原始页面存档离线重新生成记录'),
+    'changes': ('scripts/sync_changes.py', '维护目录变更日志'),
+    'diff': ('scripts/diff_catalog.py', '比较两次抓取之间的目录'),
+    'export': ('scripts/export_parquet.py', '导出 Parquet 并运行统计报表'),
+    'serve': ('scripts/catalog_service.py', '启动目录查询服务'),
+}
+
+# 没有参数解析、直接开始执行的脚本：--help 由本模块处理，不能交给脚本
+NO_ARGS_SCRIPTS = {
+    'scripts/game_scraper.py',
+    '1000webgames_scraper.py',
+    'html5games_scraper.py',
+    'gamedistribution_scraper.py',
+    'scripts/jopi_scraper.py',
+    'scripts/check_chrome.py',
+    'scripts/organize_games.py',
+    'scripts/process_categories.py',
+    'scripts/filter_games.py',
+}
+
+HELP_FLAGS = ('-h', '--help')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m gamecollect', description='游戏采集站的数据与抓取任务')
+    subparsers = parser.add_subparsers(dest='command', metavar='<command>')
+
+    # 子命令自身的参数（包括 --help）交给对应脚本解析；没有指定来源/检查项时由 main 输出帮助
+    crawl = subparsers.add_parser('crawl', help='运行某个来源的爬虫（all 为多进程分片抓取）', add_help=False,
+                                  description='运行某个来源的爬虫（all 为多进程分片抓取）')
+    crawl.add_argument('source', nargs='?', choices=sorted(CRAWLERS))
+    crawl.set_defaults(subparser=crawl)
+    check = subparsers.add_parser('check', help='检查 iframe 可嵌入性、预览图、解析规则或 Chrome 环境', add_help=False,
+                                  description='检查 iframe 可嵌入性、预览图、解析规则或 Chrome 环境')
+    check.add_argument('target', nargs='?', choices=sorted(CHECKS))
+    check.set_defaults(subparser=check)
+    for name, (_, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def run_script(script, args):
+    """以 __main__ 身份运行脚本，sys.argv 与直接运行该脚本时一致"""
+    import runpy
+
+    path = os.path.join(PROJECT_ROOT, script)
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+    sys.argv = [path] + list(args)
+    try:
+        runpy.run_path(path, run_name='__main__')
+    except SystemExit as e:
+        return e.code or 0
+    return 0
+
+
+def print_script_help(command, script, description):
+    print(f"usage: python -m gamecollect {command}\n\n{description}\n\n"
+          f"该子命令没有参数，直接运行 {script}。")
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    wants_help = any(arg in HELP_FLAGS for arg in rest)
+    if args.command in ('crawl', 'check'):
+        choice = args.source if args.command == 'crawl' else args.target
+        if choice is None:
+            args.subparser.print_help()
+            return 0 if wants_help else 2
+        command = f"{args.command} {choice}"
+        if args.command == 'crawl':
+            script, description = CRAWLERS[choice], f"运行 {choice} 的爬虫"
+        else:
+            script, description = CHECKS[choice], f"运行检查：{choice}"
+    else:
+        command = args.command
+        script, description = COMMANDS[args.command]
+    if wants_help and script in NO_ARGS_SCRIPTS:
+        print_script_help(command, script, description)
+        return 0
+    if args.command == 'crawl':
+        # 爬虫脚本使用相对项目根目录的输出路径
+        os.chdir(PROJECT_ROOT)
+    return run_script(script, rest)
@@ -0,0 +1,240 @@
+"""
+目录的列式导出（Arrow / Parquet），用于统计分析
+每个游戏一行，按 来源/主分类 分区写入 catalog/parquet（hive 风格目录：source=.../category=...），
+分类和标签列使用字典编码。导出时先把整个目录读入内存合并、排序，再分批写入（不是流式导出）。
+内置的报表直接在 Arrow 列上用 pyarrow.compute 计算，不逐条遍历记录。
+"""
+import os
+import shutil
+from datetime import datetime
+
+from gamecollect.corpus import map_records
+from gamecollect.paths import CATALOG_DIR, route_source
+from gamecollect.records import GameRecord
+from gamecollect.taxonomy import canonical_categories
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:  # 没有安装 pyarrow 时无法导出，调用方给出提示
+    pa = None
+
+PARQUET_DIR = os.path.join(CATALOG_DIR, 'parquet')
+BATCH_ROWS = 16384
+# 没有分类的游戏所在的分区
+UNCATEGORIZED = 'uncategorized'
+# 抓取时间分布的区间上限（天）
+STALENESS_BUCKETS = (1, 7, 30, 90, 365)
+# 内置报表用到的列（只读取这些列）
+REPORT_COLUMNS = ('source', 'category', 'id', 'title', 'category_ids', 'has_iframe', 'has_preview', 'scraped_at')
+
+
+def arrow_schema():
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('source', pa.string()),
+        ('category', pa.string()),
+        ('id', pa.string()),
+        ('title', pa.string()),
+        ('category_ids', pa.list_(dictionary)),
+        ('tags', pa.list_(dictionary)),
+        ('has_iframe', pa.bool_()),
+        ('has_preview', pa.bool_()),
+        ('embed_status', dictionary),
+        ('preview_status', dictionary),
+        ('scraped_at', pa.timestamp('us')),
+        ('first_seen_at', pa.timestamp('us')),
+    ])
+
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def export_row(corpus_file, record):
+    """提取导出需要的列（在进程池中执行）"""
+    game = GameRecord.from_dict(record, corpus_file.source)
+    category_ids, _ = canonical_categories(record)
+    scraped_at = _timestamp(game.scraped_at)
+    return {
+        'source': route_source(corpus_file.rel_dir),
+        'id': game.id or os.path.basename(corpus_file.path)[:-len('.json')],
+        'title': game.title or '',
+        'category_ids': list(category_ids),
+        'tags': list(game.tags or []),
+        'has_iframe': bool(game.iframe_url),
+        'has_preview': bool(game.preview_image),
+        'embed_status': game.embed_status,
+        'preview_status': game.preview_status,
+        'scraped_at': scraped_at,
+        'first_seen_at': _timestamp(game.first_seen_at) or scraped_at,
+    }
+
+
+def collect_rows(workers=None):
+    """
+    读取语料，同一 (source, id) 的多个文件（html5games 各分类目录下的副本）合并为一行
+    合并需要看到全部文件，因此整个目录的行会先读入内存并排序，再由 to_batches 分批转换
+    """
+    rows = {}
+    for row in map_records(export_row, workers=workers):
+        if not row:
+            continue
+        key = (row['source'], row['id'])
+        existing = rows.get(key)
+        if existing is None:
+            rows[key] = row
+            continue
+        for field in ('category_ids', 'tags'):
+            existing[field] += [v for v in row[field] if v not in existing[field]]
+        if row['scraped_at'] and (existing['scraped_at'] is None or row['scraped_at'] > existing['scraped_at']):
+            existing['scraped_at'] = row['scraped_at']
+    return [rows[key] for key in sorted(rows)]
+
+
+def _list_column(values):
+    """list<dictionary<string>>：先展平再字典编码，最后按偏移量还原为列表"""
+    offsets, flat = [0], []
+    for items in values:
+        flat.extend(items)
+        offsets.append(len(flat))
+    encoded = pa.array(flat, type=pa.string()).dictionary_encode()
+    return pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), encoded)
+
+
+def to_batches(rows, batch_rows=BATCH_ROWS):
+    """把行按 batch_rows 分批转换为 Arrow RecordBatch"""
+    schema = arrow_schema()
+    for start in range(0, len(rows), batch_rows):
+        chunk = rows[start:start + batch_rows]
+        columns = []
+        for field in schema:
+            if field.name == 'category':
+                values = [row['category_ids'][0] if row['category_ids'] else UNCATEGORIZED for row in chunk]
+            else:
+                values = [row[field.name] for row in chunk]
+            if pa.types.is_list(field.type):
+                columns.append(_list_column(values))
+            elif pa.types.is_dictionary(field.type):
+                columns.append(pa.array(values, type=pa.string()).dictionary_encode())
+            else:
+                columns.append(pa.array(values, type=field.type))
+        yield pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def partitioning():
+    """hive 风格的 source=.../category=... 分区（读写使用同一定义，分区值始终按字符串解析）"""
+    return ds.partitioning(pa.schema([('source', pa.string()), ('category', pa.string())]), flavor='hive')
+
+
+def export_parquet(rows, output_dir=PARQUET_DIR, batch_rows=BATCH_ROWS):
+    """
+    按 来源/主分类 分区写入 Parquet；先写入临时目录再整体替换，读取方不会看到写了一半的数据集
+    :return: 写入的行数
+    """
+    tmp_dir = f"{output_dir}.tmp"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    ds.write_dataset(
+        to_batches(rows, batch_rows),
+        tmp_dir,
+        schema=arrow_schema(),
+        format='parquet',
+        partitioning=partitioning(),
+        basename_template='part-{i}.parquet',
+        max_rows_per_group=batch_rows,
+    )
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.replace(tmp_dir, output_dir)
+    return len(rows)
+
+
+def load_table(output_dir=PARQUET_DIR, columns=None):
+    """读取导出的数据集（分区目录中的 source / category 会还原为列）"""
+    dataset = ds.dataset(output_dir, format='parquet', partitioning=partitioning())
+    return dataset.to_table(columns=list(columns) if columns else None)
+
+
+def coverage_report(table):
+    """
+    各来源、各分类的游戏数，以及有 iframe / 预览图的比例
+    按 category_ids 展开统计：属于多个分类的游戏在每个分类下各计一次，没有分类的游戏计入 uncategorized
+    """
+    category_ids = table['category_ids']
+    parents = pc.list_parent_indices(category_ids)
+    uncategorized = table.filter(pc.equal(pc.fill_null(pc.list_value_length(category_ids), 0), 0))
+    exploded = pa.concat_tables([
+        pa.table({
+            'source': pc.take(table['source'], parents),
+            'category': pc.cast(pc.list_flatten(category_ids), pa.string()),
+            'id': pc.take(table['id'], parents),
+            'iframe': pc.cast(pc.take(table['has_iframe'], parents), pa.int64()),
+            'preview': pc.cast(pc.take(table['has_preview'], parents), pa.int64()),
+        }),
+        pa.table({
+            'source': uncategorized['source'],
+            'category': pa.array([UNCATEGORIZED] * uncategorized.num_rows, type=pa.string()),
+            'id': uncategorized['id'],
+            'iframe': pc.cast(uncategorized['has_iframe'], pa.int64()),
+            'preview': pc.cast(uncategorized['has_preview'], pa.int64()),
+        }),
+    ])
+    grouped = exploded.group_by(['source', 'category']).aggregate(
+        [('id', 'count'), ('iframe', 'sum'), ('preview', 'sum')])
+    rows = []
+    for row in grouped.to_pylist():
+        total = row['id_count']
+        rows.append({
+            'source': row['source'],
+            'category': row['category'],
+            'games': total,
+            'iframe': row['iframe_sum'] / total,
+            'preview': row['preview_sum'] / total,
+        })
+    return sorted(rows, key=lambda r: (r['source'], -r['games'], r['category']))
+
+
+def staleness_report(table, now=None, buckets=STALENESS_BUCKETS):
+    """
+    按距最近一次抓取的天数统计各来源的游戏数
+    :return: {来源: {'<=1d': n, ..., '>365d': n, 'unknown': n}}
+    """
+    now = pa.scalar(now or datetime.now(), type=pa.timestamp('us'))
+    age = pc.divide(pc.cast(pc.subtract(now, table['scraped_at']), pa.int64()), 86400 * 1e6)
+    sources = table['source']
+    report = {}
+    for source in sorted(pc.unique(sources).to_pylist()):
+        source_age = pc.filter(age, pc.equal(sources, source))
+        counts, previous = {}, 0
+        for bound in buckets:
+            within = pc.sum(pc.less_equal(source_age, bound)).as_py() or 0
+            counts[f"<={bound}d"] = within - previous
+            previous = within
+        counts[f">{buckets[-1]}d"] = len(source_age) - source_age.null_count - previous
+        counts['unknown'] = source_age.null_count
+        report[source] = counts
+    return report
+
+
+def multi_category_report(table, top=20):
+    """属于多个分类的游戏：分类数分布、各来源的占比，以及分类最多的游戏"""
+    lengths = pc.list_value_length(table['category_ids'])
+    distribution = {item['values']: item['counts'] for item in pc.value_counts(lengths).to_pylist()}
+    multi = pc.greater(lengths, 1)
+    by_source = {}
+    grouped = table.append_column('multi', pc.cast(multi, pa.int64())).group_by('source').aggregate(
+        [('multi', 'sum'), ('id', 'count')])
+    for row in grouped.to_pylist():
+        by_source[row['source']] = row['multi_sum'] / row['id_count']
+    order = pc.array_sort_indices(lengths, order='descending')
+    examples = table.take(order[:top]).select(['source', 'id', 'title', 'category_ids']).to_pylist()
+    return {
+        'distribution': dict(sorted(distribution.items())),
+        'share_by_source': by_source,
+        'examples': [e for e in examples if len(e['category_ids']) > 1],
+    }
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from gamecollect.paths import SCRAPED_DATA_DIR, source_for_dir
+from gamecollect.records import load_record
+
+try:
+    import orjson
+except ImportError:  # orjson 不可用时退回标准库
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# 语料中的一个文件：绝对路径、来源名称、相对 scraped_data 的目录
+CorpusFile = namedtuple('CorpusFile', ['path', 'source', 'rel_dir'])
+
+
+def load_json(path):
+    """读取一个JSON文件（优先使用 orjson 解析）"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
+def discover_sources(root=SCRAPED_DATA_DIR):
+    """列出 scraped_data 下所有来源（根目录的文件归属 onlinegames）"""
+    sources = set()
+    if not os.path.isdir(root):
+        return []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir() and not entry.name.startswith('.'):
+                sources.add(entry.name)
+            elif entry.is_file() and entry.name.endswith('.json'):
+                sources.add(source_for_dir(''))
+    return sorted(sources)
+
+
+def _walk(directory, root):
+    with os.scandir(directory) as entries:
+        entries = sorted(entries, key=lambda e: e.name)
+    for entry in entries:
+        if entry.name.startswith('.'):
+            continue
+        if entry.is_dir():
+            yield from _walk(entry.path, root)
+        elif entry.name.endswith('.json') and entry.is_file():
+            rel_dir = os.path.relpath(directory, root).replace(os.sep, '/')
+            rel_dir = '' if rel_dir == '.' else rel_dir
+            yield CorpusFile(entry.path, source_for_dir(rel_dir), rel_dir)
+
+
+def iter_files(root=SCRAPED_DATA_DIR, sources=None):
+    """按确定顺序遍历所有记录文件，可按来源过滤"""
+    if not os.path.isdir(root):
+        return
+    for corpus_file in _walk(root, root):
+        if sources is None or corpus_file.source in sources:
+            yield corpus_file
+
+
+def iter_records(root=SCRAPED_DATA_DIR, sources=None):
+    """惰性地逐条产出 (CorpusFile, record)，读取失败的文件会被记录并跳过"""
+    for corpus_file in iter_files(root, sources):
+        try:
+            yield corpus_file, load_json(corpus_file.path)
+        except Exception as e:
+            logger.error(f"Error reading {corpus_file.path}: {str(e)}")
+
+
+def iter_games(root=SCRAPED_DATA_DIR, sources=None):
+    """与 iter_records 相同，但产出统一模型 (CorpusFile, GameRecord)"""
+    for corpus_file in iter_files(root, sources):
+        try:
+            yield corpus_file, load_record(corpus_file.path, corpus_file.source)
+        except Exception as e:
+            logger.error(f"Error reading {corpus_file.path}: {str(e)}")
+
+
+def _apply(args):
+    func, corpus_file = args
+    try:
+        record = load_json(corpus_file.path)
+    except Exception as e:
+        logger.error(f"Error reading {corpus_file.path}: {str(e)}")
+        return None
+    return func(corpus_file, record)
+
+
+def map_records(func, files=None, root=SCRAPED_DATA_DIR, sources=None, workers=None, chunksize=64):
+    """
+    在进程池中对每条记录执行 func(corpus_file, record)，按文件顺序产出结果
+    每个文件只读取一次；func 必须是模块级函数（可被 pickle）
+    :param workers: 进程数，默认CPU核数；为1时在当前进程中顺序执行
+    """
+    if files is None:
+        files = list(iter_files(root, sources))
+    workers = workers or os.cpu_count() or 1
+    tasks = ((func, corpus_file) for corpus_file in files)
+    if workers == 1 or len(files) <= chunksize:
+        yield from map(_apply, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_apply, tasks, chunksize=chunksize)
@@ -0,0 +1,161 @@
+"""
+爬虫分片与工作进程
+每个工作进程负责一个分片：自己启动浏览器，发现页面后登记到共享的抓取状态库，
+再逐个领取本分片的待抓取页面。供 scripts/crawl_supervisor.py 调度。
+"""
+import importlib
+import logging
+import os
+import sys
+from collections import namedtuple
+
+from gamecollect.crawl_state import CRAWL_STATE_DB, CrawlState
+from gamecollect.extractors import output_dir_for
+from gamecollect.logs import page_context
+from gamecollect.paths import PROJECT_ROOT
+from gamecollect.storage import upsert_game
+from gamecollect.urls import url_hash
+
+logger = logging.getLogger(__name__)
+
+# category 只对有分类列表的来源（html5games）有效；buckets > 1 时按URL哈希再切分
+Shard = namedtuple('Shard', ['source', 'category', 'bucket', 'buckets'])
+
+# 记录的分类只能来自列表页（游戏页面本身不带分类）的来源，必须按分类分片
+CATEGORY_REQUIRED_SOURCES = ('html5games',)
+
+
+def shard_name(shard):
+    name = shard.source
+    if shard.category:
+        name += f"/{shard.category}"
+    if shard.buckets > 1:
+        name += f"#{shard.bucket}/{shard.buckets}"
+    return name
+
+
+def in_bucket(shard, url):
+    if shard.buckets <= 1:
+        return True
+    return url_hash(url) % shard.buckets == shard.bucket
+
+
+def _import_scraper(module_name):
+    """按模块名导入爬虫脚本（根目录和 scripts/ 下的脚本都不是包）"""
+    for path in (PROJECT_ROOT, os.path.join(PROJECT_ROOT, 'scripts')):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    return importlib.import_module(module_name)
+
+
+class OnlineGamesAdapter:
+    def __init__(self):
+        self.scraper = _import_scraper('game_scraper').GameScraper()
+
+    def discover(self, category):
+        return self.scraper.get_game_links()
+
+    def scrape(self, url, category):
+        game_data = self.scraper.scrape_game_details(url)
+        if not game_data or not game_data.get('iframe_url'):  # 只保存有 iframe URL 的游戏
+            return False
+        upsert_game(output_dir_for('onlinegames', game_data), 'onlinegames', game_data)
+        return True
+
+    def close(self):
+        self.scraper.__del__()
+
+
+class WebGames1000Adapter:
+    def __init__(self):
+        self.scraper = _import_scraper('1000webgames_scraper').WebGameScraper()
+
+    def discover(self, category):
+        return self.scraper.get_game_links()
+
+    def scrape(self, url, category):
+        return self.scraper.save_game_data(self.scraper.parse_game_page(url))
+
+    def close(self):
+        self.scraper.__del__()
+
+
+class Html5GamesAdapter:
+    def __init__(self):
+        self.module = _import_scraper('html5games_scraper')
+        self.driver = self.module.setup_driver(headless=True)
+
+    def discover(self, category):
+        categories = [category] if category else self.module.CATEGORIES
+        urls = []
+        for name in categories:
+            category_url = self.module.get_category_url(self.driver, self.module.CATEGORIES[name])
+            if category_url:
+                urls += self.module.get_game_links(self.driver, category_url) or []
+        return urls
+
+    def scrape(self, url, category):
+        if not category:
+            raise ValueError('html5games shards must be split by category')
+        game_data = self.module.get_game_data(self.driver, url, category)
+        if not game_data or not game_data.get('title'):
+            return False
+        upsert_game(output_dir_for('html5games', game_data), 'html5games', game_data)
+        return True
+
+    def close(self):
+        self.driver.quit()
+
+
+ADAPTERS = {
+    'onlinegames': OnlineGamesAdapter,
+    '1000webgames': WebGames1000Adapter,
+    'html5games': Html5GamesAdapter,
+}
+
+
+def source_categories(source):
+    """来源可用于分片的分类列表（读取爬虫脚本中的 CATEGORIES）"""
+    if source != 'html5games':
+        return ()
+    return tuple(_import_scraper('html5games_scraper').CATEGORIES)
+
+
+def run_shard(shard, state_path=CRAWL_STATE_DB, discover=True):
+    """
+    工作进程入口：抓取一个分片，返回本进程处理的页面统计
+    discover=False 时不再用浏览器扫描列表页，只处理已登记（如来自 sitemap）的页面
+    """
+    name = shard_name(shard)
+    state = CrawlState(state_path)
+    adapter = ADAPTERS[shard.source]()
+    stats = {'discovered': 0, 'done': 0, 'failed': 0}
+    try:
+        if discover:
+            urls = (url for url in adapter.discover(shard.category) if in_bucket(shard, url))
+            stats['discovered'] = state.add_urls(shard.source, name, urls)
+            logger.info(f"[{name}] discovered {stats['discovered']} pages")
+
+        while True:
+            claimed = state.claim(name, os.getpid())
+            if claimed is None:
+                if state.is_paused():
+                    logger.info(f"[{name}] crawl paused, stopping")
+                break
+            key, url = claimed
+            with page_context(url):
+                try:
+                    ok = adapter.scrape(url, shard.category)
+                    state.finish(key, ok, None if ok else 'no game data')
+                except Exception as e:
+                    ok = False
+                    state.finish(key, False, str(e))
+                    logger.error(f"[{name}] error scraping {url}: {str(e)}")
+            stats['done' if ok else 'failed'] += 1
+    finally:
+        try:
+            adapter.close()
+        except Exception as e:
+            logger.error(f"[{name}] error closing browser: {str(e)}")
+        state.close()
+    return stats
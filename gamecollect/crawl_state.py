@@ -0,0 +1,319 @@
+import os
+import sqlite3
+import time
+from itertools import islice
+from urllib.parse import urlsplit
+
+from gamecollect.keys import url_key_hash
+from gamecollect.paths import CATALOG_DIR
+from gamecollect.urls import canonicalize
+
+CRAWL_STATE_DB = os.path.join(CATALOG_DIR, 'crawl_state.sqlite3')
+
+# 失败的页面在达到该次数前会在下次运行时重新排队
+MAX_ATTEMPTS = 3
+
+# 优先级 = 来源权重 + 陈旧度（0~1，从未抓取过的页面为 1） - 失败惩罚
+SOURCE_PRIORITY = {'onlinegames': 1.0, 'html5games': 1.0, 'gamedistribution': 0.8, '1000webgames': 0.6}
+MAX_STALENESS = 30 * 86400
+FAILURE_PENALTY = 0.5
+
+# 批量登记页面时每个事务的行数，保证百万级URL时内存占用有上限
+BATCH_SIZE = 10000
+
+# hosts 表中表示整个抓取的暂停开关
+ALL_HOSTS = '*'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    shard TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker INTEGER,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    lastmod REAL,
+    host TEXT,
+    priority REAL NOT NULL DEFAULT 0,
+    done_at REAL
+);
+CREATE TABLE IF NOT EXISTS sitemaps (
+    url TEXT PRIMARY KEY,
+    lastmod REAL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY,
+    paused INTEGER NOT NULL DEFAULT 0,
+    last_claim REAL NOT NULL DEFAULT 0
+);
+"""
+
+# 索引在补齐旧版本的列之后创建
+INDEXES = """
+DROP INDEX IF EXISTS pages_shard_status;
+CREATE INDEX IF NOT EXISTS pages_frontier ON pages (shard, status, host, priority DESC);
+"""
+
+# 旧版本状态库缺少的列
+MIGRATIONS = {
+    'lastmod': "ALTER TABLE pages ADD COLUMN lastmod REAL",
+    'host': "ALTER TABLE pages ADD COLUMN host TEXT",
+    'priority': "ALTER TABLE pages ADD COLUMN priority REAL NOT NULL DEFAULT 0",
+    'done_at': "ALTER TABLE pages ADD COLUMN done_at REAL",
+}
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+def page_priority(source, attempts=0, done_at=None, now=None):
+    """计算页面优先级，数值越大越先抓取（同时注册为 SQL 函数 page_priority）"""
+    now = time.time() if now is None else now
+    staleness = MAX_STALENESS if done_at is None else min(max(now - done_at, 0), MAX_STALENESS)
+    return SOURCE_PRIORITY.get(source, 1.0) + staleness / MAX_STALENESS - FAILURE_PENALTY * (attempts or 0)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # 进程存在，但属于其他用户
+        return True
+    return True
+
+
+def _batches(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class CrawlState:
+    """
+    多个爬虫进程共享的抓取状态与待抓取队列（SQLite WAL 模式，支持多进程并发读写）
+    页面状态: pending -> running -> done / failed
+    领取时在未暂停的主机之间轮转，主机内部按优先级从高到低；队列在磁盘上，崩溃后可直接继续。
+    """
+
+    def __init__(self, path=CRAWL_STATE_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.create_function('page_priority', 4, page_priority, deterministic=True)
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.executescript(INDEXES)
+
+    def _migrate(self):
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(pages)")]
+        missing = [column for column in MIGRATIONS if column not in columns]
+        for column in missing:
+            self.conn.execute(MIGRATIONS[column])
+        if 'host' not in missing:
+            return
+        # 为旧数据补上主机和优先级（分批处理，避免一次读入全部页面）
+        now = time.time()
+        while True:
+            rows = self.conn.execute(
+                "SELECT key, source, url, attempts FROM pages WHERE host IS NULL LIMIT ?", (BATCH_SIZE,)).fetchall()
+            if not rows:
+                break
+            self.conn.execute('BEGIN IMMEDIATE')
+            self.conn.executemany(
+                "UPDATE pages SET host = ?, priority = ? WHERE key = ?",
+                [(host_of(url), page_priority(source, attempts, None, now), key) for key, source, url, attempts in rows])
+            self._add_hosts(host_of(row[2]) for row in rows)
+            self.conn.execute('COMMIT')
+
+    def close(self):
+        self.conn.close()
+
+    def _add_hosts(self, hosts):
+        self.conn.executemany("INSERT OR IGNORE INTO hosts (host) VALUES (?)", [(host,) for host in set(hosts)])
+
+    def add_urls(self, source, shard, urls):
+        """
+        登记发现的页面（按 key 去重）；已完成的页面保持不变，未超过重试次数的失败页面重新排队
+        urls 可以是任意可迭代对象，分批写入
+        """
+        count = 0
+        for batch in _batches(urls):
+            now = time.time()
+            rows = [(url_key_hash(source, url), source, shard, canonicalize(url), now) for url in batch]
+            self.conn.execute('BEGIN IMMEDIATE')
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO pages (key, source, shard, url, updated_at, host, priority) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [row + (host_of(row[3]), page_priority(source, 0, None, now)) for row in rows])
+            self.conn.executemany(
+                "UPDATE pages SET status = 'pending', updated_at = ?, priority = page_priority(source, attempts, done_at, ?) "
+                "WHERE key = ? AND status = 'failed' AND attempts < ?",
+                [(now, now, row[0], MAX_ATTEMPTS) for row in rows])
+            self._add_hosts(host_of(row[3]) for row in rows)
+            self.conn.execute('COMMIT')
+            count += len(rows)
+        return count
+
+    def add_entries(self, source, shard, entries):
+        """
+        登记带 lastmod 的页面（来自 sitemap）
+        新页面、lastmod 比上次记录更新的页面，以及可以重试的失败页面会（重新）排队，返回受影响的数量
+        """
+        queued = 0
+        for batch in _batches(entries):
+            now = time.time()
+            rows = [(url_key_hash(source, url), source, shard, canonicalize(url), now, lastmod)
+                    for url, lastmod in batch]
+            self.conn.execute('BEGIN IMMEDIATE')
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO pages (key, source, shard, url, updated_at, lastmod, host, priority) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [row + (host_of(row[3]), page_priority(source, 0, None, now)) for row in rows])
+            self.conn.executemany(
+                "UPDATE pages SET status = 'pending', attempts = 0, error = NULL, lastmod = ?, updated_at = ?, "
+                "priority = page_priority(source, 0, done_at, ?) "
+                "WHERE key = ? AND status != 'running' AND ? IS NOT NULL AND (lastmod IS NULL OR lastmod < ?)",
+                [(row[5], now, now, row[0], row[5], row[5]) for row in rows])
+            self.conn.executemany(
+                "UPDATE pages SET status = 'pending', updated_at = ?, priority = page_priority(source, attempts, done_at, ?) "
+                "WHERE key = ? AND status = 'failed' AND attempts < ?",
+                [(now, now, row[0], MAX_ATTEMPTS) for row in rows])
+            queued += self.conn.total_changes - before
+            self._add_hosts(host_of(row[3]) for row in rows)
+            self.conn.execute('COMMIT')
+        return queued
+
+    def sitemap_lastmod(self, url):
+        row = self.conn.execute("SELECT lastmod FROM sitemaps WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def set_sitemap_lastmod(self, url, lastmod):
+        self.conn.execute("INSERT OR REPLACE INTO sitemaps (url, lastmod, fetched_at) VALUES (?, ?, ?)",
+                          (url, lastmod, time.time()))
+
+    def claim(self, shard, worker):
+        """
+        原子地领取分片中的下一个待抓取页面，没有时返回 None（整个抓取被暂停时也返回 None）
+        先选出有待抓取页面、未暂停且最久没有被领取的主机，再取该主机优先级最高的页面，
+        这样一个很慢的主机不会占满整个队列
+        """
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            if self.is_paused():
+                return None
+            row = self.conn.execute(
+                "SELECT h.host FROM hosts h WHERE h.paused = 0 AND h.host != ? AND EXISTS "
+                "(SELECT 1 FROM pages p WHERE p.shard = ? AND p.status = 'pending' AND p.host = h.host) "
+                "ORDER BY h.last_claim LIMIT 1",
+                (ALL_HOSTS, shard)).fetchone()
+            if row is None:
+                return None
+            host = row[0]
+            self.conn.execute("UPDATE hosts SET last_claim = ? WHERE host = ?", (now, host))
+            return self.conn.execute(
+                "UPDATE pages SET status = 'running', worker = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE key = (SELECT key FROM pages WHERE shard = ? AND status = 'pending' AND host = ? "
+                "ORDER BY priority DESC LIMIT 1) "
+                "RETURNING key, url",
+                (worker, now, shard, host)).fetchone()
+        finally:
+            self.conn.execute('COMMIT')
+
+    def finish(self, key, ok, error=None):
+        now = time.time()
+        if ok:
+            self.conn.execute(
+                "UPDATE pages SET status = 'done', error = NULL, worker = NULL, updated_at = ?, done_at = ? WHERE key = ?",
+                (now, now, key))
+        else:
+            self.conn.execute(
+                "UPDATE pages SET status = 'failed', error = ?, worker = NULL, updated_at = ? WHERE key = ?",
+                (error, now, key))
+
+    def pause(self, hosts=None):
+        """暂停某些主机（不传则暂停整个抓取）；正在抓取的页面完成后工作进程不再领取新页面"""
+        self._set_paused(hosts, 1)
+
+    def resume(self, hosts=None):
+        self._set_paused(hosts, 0)
+
+    def _set_paused(self, hosts, paused):
+        hosts = [host.lower() for host in hosts] if hosts else [ALL_HOSTS]
+        self.conn.executemany(
+            "INSERT INTO hosts (host, paused) VALUES (?, ?) ON CONFLICT (host) DO UPDATE SET paused = excluded.paused",
+            [(host, paused) for host in hosts])
+
+    def is_paused(self, host=ALL_HOSTS):
+        row = self.conn.execute("SELECT paused FROM hosts WHERE host = ?", (host,)).fetchone()
+        return bool(row and row[0])
+
+    def paused_hosts(self):
+        return [row[0] for row in self.conn.execute("SELECT host FROM hosts WHERE paused = 1 ORDER BY host")]
+
+    def release(self, shard):
+        """把分片中仍处于 running 的页面放回队列（工作进程崩溃后调用）"""
+        cursor = self.conn.execute(
+            "UPDATE pages SET status = 'pending', worker = NULL, updated_at = ? WHERE shard = ? AND status = 'running'",
+            (time.time(), shard))
+        return cursor.rowcount
+
+    def release_orphaned(self):
+        """
+        把领取它们的进程已经不存在的 running 页面放回队列（主进程启动时调用）
+        主进程被杀死、机器重启或按 Ctrl-C 中断后，这些页面不会再被任何工作进程完成
+        """
+        workers = [row[0] for row in self.conn.execute("SELECT DISTINCT worker FROM pages WHERE status = 'running'")]
+        gone = [(worker,) for worker in workers if worker is None or not _process_alive(worker)]
+        if not gone:
+            return 0
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        before = self.conn.total_changes
+        self.conn.executemany(
+            "UPDATE pages SET status = 'pending', worker = NULL, updated_at = ? WHERE status = 'running' AND worker IS ?",
+            [(now,) + worker for worker in gone])
+        released = self.conn.total_changes - before
+        self.conn.execute('COMMIT')
+        return released
+
+    def reset(self, source=None):
+        """把所有页面（或某个来源的页面）重新标记为待抓取"""
+        query = ("UPDATE pages SET status = 'pending', attempts = 0, error = NULL, worker = NULL, "
+                 "priority = page_priority(source, 0, done_at, ?)")
+        if source:
+            self.conn.execute(query + " WHERE source = ?", (time.time(), source))
+        else:
+            self.conn.execute(query, (time.time(),))
+
+    def summary(self, since=None):
+        """按来源统计各状态的页面数量；since 为时间戳时只统计此后更新的页面"""
+        query = "SELECT source, status, COUNT(*) FROM pages"
+        params = ()
+        if since is not None:
+            query += " WHERE updated_at >= ?"
+            params = (since,)
+        counts = {}
+        for source, status, count in self.conn.execute(query + " GROUP BY source, status", params):
+            counts.setdefault(source, {})[status] = count
+        return counts
+
+    def failures(self, since=None, limit=20):
+        query = "SELECT url, attempts, error FROM pages WHERE status = 'failed'"
+        params = []
+        if since is not None:
+            query += " AND updated_at >= ?"
+            params.append(since)
+        return self.conn.execute(query + " ORDER BY updated_at DESC LIMIT ?", params + [limit]).fetchall()
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# 嵌入游戏的网站来源，用于判断 CSP frame-ancestors 是否允许嵌入
+SITE_ORIGIN = os.environ.get('SITE_ORIGIN', 'https://localhost')
+
+# 连接失败、超时等传输错误的重试次数和间隔（秒）；重试后仍失败记为 error（状态未知，不隐藏游戏）
+RETRIES = 1
+RETRY_DELAY = 2.0
+
+
+def _host_matches(pattern, origin):
+    """判断 CSP host-source（可带 scheme 和 *. 通配）是否匹配 origin"""
+    origin_parts = urlsplit(origin)
+    if '://' in pattern:
+        scheme, _, pattern = pattern.partition('://')
+        if scheme != origin_parts.scheme:
+            return False
+    host = pattern.split('/')[0].split(':')[0].lower()
+    origin_host = (origin_parts.hostname or '').lower()
+    if host.startswith('*.'):
+        return origin_host.endswith(host[1:])
+    return host == origin_host
+
+
+def frame_ancestors_allows(csp, frame_url, origin=SITE_ORIGIN):
+    """解析 Content-Security-Policy 中的 frame-ancestors，没有该指令时返回 True"""
+    for directive in csp.split(';'):
+        parts = directive.strip().split()
+        if not parts or parts[0].lower() != 'frame-ancestors':
+            continue
+        sources = [s.strip() for s in parts[1:]]
+        if not sources or "'none'" in sources:
+            return False
+        for source in sources:
+            if source == '*':
+                return True
+            if source == "'self'":
+                if urlsplit(frame_url).netloc.lower() == urlsplit(origin).netloc.lower():
+                    return True
+            elif source.endswith(':') and urlsplit(origin).scheme == source[:-1]:
+                return True
+            elif _host_matches(source, origin):
+                return True
+        return False
+    return True
+
+
+def classify(status_code, headers, final_url, origin=SITE_ORIGIN):
+    """根据响应状态和响应头判断嵌入是否可用，返回 (状态, 原因)"""
+    if status_code >= 400:
+        return 'dead', f"HTTP {status_code}"
+    xfo = headers.get('x-frame-options', '').strip().lower()
+    if xfo in ('deny', 'sameorigin') and not (
+            xfo == 'sameorigin' and urlsplit(final_url).netloc.lower() == urlsplit(origin).netloc.lower()):
+        return 'blocked', f"X-Frame-Options: {xfo}"
+    csp = headers.get('content-security-policy', '')
+    if csp and not frame_ancestors_allows(csp, final_url, origin):
+        return 'blocked', 'CSP frame-ancestors'
+    return 'ok', None
+
+
+class EmbedChecker:
+    """使用连接池并发探测 iframe_url，同时限制每个主机的并发数"""
+
+    def __init__(self, concurrency=200, per_host=16, timeout=15.0, origin=SITE_ORIGIN):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.origin = origin
+        self._global = asyncio.Semaphore(concurrency)
+        self._hosts = {}
+
+    def _host_semaphore(self, url):
+        host = urlsplit(url).netloc.lower()
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def _request(self, client, url):
+        """先发 HEAD；服务器不支持 HEAD 时改用只读取响应头的 GET"""
+        response = await client.head(url)
+        if response.status_code in (403, 405, 501):
+            async with client.stream('GET', url) as streamed:
+                return streamed
+        return response
+
+    async def check(self, client, url):
+        # 先取主机槽位再取全局槽位：排队等待繁忙主机的任务不占用全局并发
+        async with self._host_semaphore(url), self._global:
+            for attempt in range(RETRIES + 1):
+                try:
+                    response = await self._request(client, url)
+                    break
+                except Exception as e:
+                    if attempt == RETRIES:
+                        return {'status': 'error', 'reason': f"{type(e).__name__}: {e}",
+                                'checked_at': datetime.now().isoformat()}
+                    await asyncio.sleep(RETRY_DELAY)
+        final_url = str(response.url)
+        status, reason = classify(response.status_code, response.headers, final_url, self.origin)
+        return {
+            'status': status,
+            'reason': reason,
+            'http_status': response.status_code,
+            'redirects': len(response.history),
+            'final_url': final_url if final_url != url else None,
+            'checked_at': datetime.now().isoformat(),
+        }
+
+    async def run(self, urls):
+        """检查一批URL，返回 {url: 结果}"""
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits, follow_redirects=True,
+                                     headers={'User-Agent': USER_AGENT}) as client:
+            unique = list(dict.fromkeys(urls))
+            results = await asyncio.gather(*(self.check(client, url) for url in unique))
+        return dict(zip(unique, results))
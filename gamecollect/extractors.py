@@ -0,0 +1,301 @@
+"""
+各站点的页面解析函数：parse(url, html) -> 游戏数据
+只依赖 HTML 文本，不访问网络，既用于在线抓取，也用于从存档离线重新生成数据。
+简单字段按 data/extraction_specs.json 中的声明式规则提取（见 gamecollect/specs.py）。
+"""
+import logging
+import os
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from gamecollect.head_meta import extract_head, head_game_data, merge_head_fields
+from gamecollect.paths import SCRAPED_DATA_DIR, SOURCE_DIRS
+from gamecollect.specs import default_extractor
+from gamecollect.taxonomy import category_dir_name
+
+logger = logging.getLogger(__name__)
+
+
+def parse_onlinegames(url, html):
+    """解析 onlinegames.io 的游戏页面"""
+    fields = default_extractor().extract('onlinegames', html)
+    game_data = {
+        'url': url,
+        'title': fields['title'],
+        'description': fields['description'],
+        'iframe_url': fields['iframe_url'],
+        'preview_image': fields['preview_image'],
+        'categories': [],
+        'tags': [],
+        'html_content': html,  # 保存完整HTML以供后续分析
+        'scraped_at': datetime.now().isoformat()
+    }
+    # 解析规则没有取到的字段用页面头部的 JSON-LD / OpenGraph 补全
+    merge_head_fields(game_data, extract_head(html).fields)
+    if not game_data['iframe_url']:
+        logger.warning(f"No iframe with id='gameFrame' found on {url}")
+
+    # 分类需要按文本词频推断，仍使用 BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    try:
+        categories, breadcrumb = _onlinegames_categories(soup)
+        game_data['categories'] = categories or game_data['categories']
+        game_data['tags'] = _onlinegames_tags(soup, breadcrumb) or game_data['tags']
+    except Exception as e:
+        logger.error(f"Error getting categories and tags: {str(e)}")
+
+    return game_data
+
+
+def _onlinegames_categories(soup):
+    # 1. 获取侧边栏的所有游戏分类名称（作为有效分类列表）
+    valid_categories = set()
+    sidebar = soup.find('ul', class_='navbar__menu')
+    if sidebar:
+        for link in sidebar.find_all('a', href=True):
+            href = link.get('href', '')
+            if '/t/' in href:
+                category_name = link.text.strip()
+                if category_name and category_name != '2-player':  # 排除2-player作为分类
+                    valid_categories.add(category_name.lower())  # 转为小写以便后续匹配
+
+    # 2. 获取游戏页面的分类（从"Home>"后面的文本）
+    breadcrumb_category = None
+    breadcrumb = soup.find('ol', class_='breadcrumb')
+    if breadcrumb:
+        items = breadcrumb.find_all('li')
+        if len(items) > 1:  # 确保有"Home"之后的项目
+            last_item = items[-1].find('a')
+            if last_item:
+                category = last_item.text.strip()
+                if category != '2-player':  # 排除2-player
+                    breadcrumb_category = category
+
+    # 3. 从游戏描述中提取分类信息
+    description_texts = []
+    final_categories = []
+
+    # 3.1 首先检查面包屑分类
+    if breadcrumb_category and breadcrumb_category.lower() in valid_categories:
+        final_categories.append(breadcrumb_category)
+
+    # 3.2 如果面包屑分类不匹配，则统计文本出现频率
+    if not final_categories:
+        # 收集所有相关文本
+        for desc_selector in ['.game-description', 'meta[name="description"]', 'p', '.game-info', '.game-controls']:
+            for desc in soup.select(desc_selector):
+                text = desc.get('content', '') or desc.text
+                if text:
+                    description_texts.append(text.lower())
+
+        # 获取其他相关文本
+        for section_text in ["More Games Like This", "Game Description", "How to Play", "Controls"]:
+            section = soup.find(string=lambda text: text and section_text in text)
+            if section and section.parent:
+                description_texts.append(section.parent.get_text().lower())
+
+        # 获取Embed URL
+        iframe = soup.find('iframe', id='gameFrame')
+        if iframe:
+            src = iframe.get('src', '').lower()
+            if src:
+                description_texts.append(src)
+
+        # 统计每个有效分类在文本中的出现次数
+        category_counts = {}
+        for category in valid_categories:
+            count = 0
+            category_lower = category.lower()
+
+            for text in description_texts:
+                # 处理特殊分类
+                if category_lower == 'fps':
+                    count += text.count('first person shooter')
+                    count += text.count('fps')
+                elif category_lower == 'strategy':
+                    count += text.count('strategic')
+                    count += text.count('strategy')
+                elif category_lower == 'racing':
+                    count += text.count('race')
+                    count += text.count('racing')
+                    count += text.count('drift')
+                else:
+                    count += text.count(category_lower)
+
+                # 在URL中出现的分类给予更高权重
+                if text.startswith('http') and category_lower in text:
+                    count += 3
+
+            # 检查"Other ** Games"部分
+            other_games_pattern = f"Other {category.title()} Games"
+            if soup.find(string=lambda text: text and other_games_pattern in text):
+                count += 5
+
+            if count > 0:
+                category_counts[category] = count
+
+        # 如果找到了出现次数最多的分类，使用有效分类列表中的原始大小写形式
+        if category_counts:
+            top_category = sorted(category_counts.items(), key=lambda x: x[1], reverse=True)[0][0]
+            original_case = next(c for c in sidebar.find_all('a', href=True)
+                                 if c.text.strip().lower() == top_category)
+            final_categories.append(original_case.text.strip())
+
+    # 3.3 如果前两种方法都没找到分类，检查分类链接
+    if not final_categories:
+        for link in soup.find_all('a', href=True):
+            href = link.get('href', '').lower()
+            if '/t/' in href:
+                # 从URL中提取分类名
+                category = href.split('/t/')[-1].strip('/').replace('-', ' ')
+                if category and category != '2-player' and category in valid_categories:
+                    original_case = next(c for c in sidebar.find_all('a', href=True)
+                                         if c.text.strip().lower() == category)
+                    final_categories.append(original_case.text.strip())
+                    break  # 找到一个匹配的分类就停止
+
+    return final_categories, breadcrumb
+
+
+def _onlinegames_tags(soup, breadcrumb):
+    # 获取游戏标签（从post__tags-share区域）
+    tags = []
+    tags_div = soup.find('div', class_='post__tags-share')
+    if tags_div:
+        tag_list = tags_div.find('ul', class_='post__tag')
+        if tag_list:
+            for tag_item in tag_list.find_all('li'):
+                tag_link = tag_item.find('a')
+                if tag_link and tag_link.text.strip():
+                    tags.append(tag_link.text.strip())
+
+    # 如果游戏支持2个玩家，将"2-player"添加到标签中
+    if '2-player' not in tags:
+        two_player_found = bool(breadcrumb and '2-player' in [li.text.strip() for li in breadcrumb.find_all('li')])
+        if not two_player_found:
+            two_player_found = any('2-player' in link.text.strip() for link in soup.find_all('a', href=True))
+        if two_player_found:
+            tags.append('2-player')
+    return tags
+
+
+def parse_1000webgames(url, html):
+    """解析 1000webgames.com 的游戏页面"""
+    fields = default_extractor().extract('1000webgames', html)
+    return {
+        'url': url,
+        'title': fields['title'],
+        'description': fields['description'],
+        'iframe_url': fields['iframe_url'],
+        'preview_image': fields['preview_image'],
+        'categories': fields['categories'],
+        'tags': fields['tags'],
+        'scraped_at': datetime.now().isoformat()
+    }
+
+
+def parse_html5games(url, html, category=''):
+    """解析 html5games.com 的游戏页面；标题和 iframe 链接都没有时返回 None"""
+    fields = default_extractor().extract('html5games', html)
+    if not fields['title'] and not fields['iframe_url']:
+        return None
+
+    return {
+        'title': fields['title'],
+        'description': fields['description'],
+        'iframe_url': fields['iframe_url'],
+        'preview_image': fields['preview_image'],
+        'categories': [category],  # 保持与现有JSON一致，使用复数形式
+        'url': url,
+        'scraped_at': datetime.now().isoformat()
+    }
+
+
+def parse_gamedistribution(url, html):
+    """解析 gamedistribution.com 的游戏页面"""
+    fields = default_extractor().extract('gamedistribution', html)
+    return {
+        "url": url,
+        "title": fields['title'],
+        "description": fields['description'],
+        "instructions": fields['instructions'],
+        "iframe_url": fields['iframe_url'],
+        "preview_image": fields['preview_image'],
+        "categories": fields['categories'],
+        "tags": fields['tags'],
+        "scraped_at": datetime.now().isoformat()
+    }
+
+
+def parse_jopi(url, html):
+    """解析 jopi.com 的游戏列表页（一页包含所有游戏），返回游戏列表"""
+    soup = BeautifulSoup(html, 'html.parser')
+    games_data = []
+
+    # 使用<hr>标签分割每个游戏块
+    for hr_tag in soup.find_all('hr'):
+        game_data = {}
+
+        # 获取游戏名称 (在<hr>后的第一个h2标签中)
+        h2_tag = hr_tag.find_next('h2')
+        if not h2_tag:
+            continue
+        game_data['name'] = h2_tag.get_text().split('-')[0].strip()
+
+        # 获取游戏图片URL
+        img_tag = hr_tag.find_next('img')
+        if img_tag and img_tag.get('src'):
+            game_data['image_url'] = img_tag['src']
+
+        # 获取iframe地址
+        textarea = hr_tag.find_next('textarea')
+        if textarea:
+            iframe_tag = BeautifulSoup(textarea.string or '', 'html.parser').find('iframe')
+            if iframe_tag and iframe_tag.get('src'):
+                game_data['iframe_url'] = iframe_tag['src']
+
+        # 获取<hr>到<textarea>之间的原始HTML
+        raw_html = ''
+        current = hr_tag
+        while current and not isinstance(current, type(textarea)):
+            raw_html += str(current)
+            current = current.next_element
+        raw_html += str(textarea) if textarea else ''
+        game_data['raw_html'] = raw_html
+
+        if game_data.get('name'):  # 只添加有名称的游戏
+            game_data['scraped_at'] = datetime.now().isoformat()
+            games_data.append(game_data)
+
+    return games_data
+
+
+def extract(record):
+    """对一条存档记录运行对应站点的解析函数，返回游戏数据列表"""
+    if record.kind == 'head':
+        # 只抓取了头部的页面（头部结构化数据已足够）
+        games = [head_game_data(record.url, extract_head(record.body).fields)]
+    elif record.source == 'onlinegames':
+        games = [parse_onlinegames(record.url, record.body)]
+    elif record.source == '1000webgames':
+        games = [parse_1000webgames(record.url, record.body)]
+    elif record.source == 'html5games':
+        games = [parse_html5games(record.url, record.body, record.meta.get('category', ''))]
+    elif record.source == 'gamedistribution':
+        games = [parse_gamedistribution(record.url, record.body)]
+    elif record.source == 'jopi':
+        games = parse_jopi(record.url, record.body)
+    else:
+        raise ValueError(f"No extractor for source {record.source}")
+    return [game for game in games if game]
+
+
+def output_dir_for(source, game_data):
+    """来源对应的 scraped_data 输出目录（html5games 按第一个分类分目录）"""
+    if source == 'html5games':
+        category = (game_data.get('categories') or ['uncategorized'])[0]
+        return os.path.join(SCRAPED_DATA_DIR, 'html5games', category_dir_name(category))
+    if source == 'gamedistribution':
+        return os.path.join(SCRAPED_DATA_DIR, 'gamedistribution', 'puzzle')
+    return os.path.join(SCRAPED_DATA_DIR, SOURCE_DIRS[source])
@@ -0,0 +1,163 @@
+import json
+import os
+from datetime import datetime
+
+from gamecollect.corpus import map_records
+from gamecollect.paths import CATALOG_DIR, route_source
+from gamecollect.records import GameRecord
+from gamecollect.storage import write_json_atomic
+from gamecollect.taxonomy import canonical_categories, load_taxonomy
+
+INDEX_FILE = os.path.join(CATALOG_DIR, 'category_index.json')
+
+# 倒排索引支持的维度：索引中的名称 -> 文档中的字段（分类按规范 id 索引）
+FACET_FIELDS = {'category': 'category_ids', 'tag': 'tags'}
+
+# 嵌入检查（scripts/check_embeds.py）判定为无法加载或不允许嵌入的状态，网站不展示
+HIDDEN_EMBED_STATUSES = ('dead', 'blocked')
+
+
+def delta_encode(ids):
+    """把有序的id数组编码为差值数组（JSON中更紧凑）"""
+    encoded, previous = [], 0
+    for doc_id in ids:
+        encoded.append(doc_id - previous)
+        previous = doc_id
+    return encoded
+
+
+def delta_decode(deltas):
+    """差值数组还原为有序id数组"""
+    ids, current = [], 0
+    for delta in deltas:
+        current += delta
+        ids.append(current)
+    return ids
+
+
+def intersect(*id_lists):
+    """求多个有序id数组的交集（从最短的数组开始逐个合并）"""
+    if not id_lists:
+        return []
+    id_lists = sorted(id_lists, key=len)
+    result = id_lists[0]
+    for other in id_lists[1:]:
+        if not result:
+            break
+        other_set = set(other)
+        result = [doc_id for doc_id in result if doc_id in other_set]
+    return result
+
+
+def preview_thumbnail(record, width=360, fmt='webp'):
+    """记录中本地缩略图的路径（scripts/process_images.py 生成），没有时返回 None"""
+    if record.preview_status in ('broken', 'invalid', 'placeholder'):
+        return '/placeholder.jpg'
+    for thumb in (record.preview or {}).get('thumbnails', []):
+        if thumb['format'] == fmt and thumb['path'].endswith(f"-{width}.{fmt}"):
+            return thumb['path']
+    return None
+
+
+def card_fields(corpus_file, record):
+    """提取索引需要的卡片字段（在进程池中执行），嵌入不可用的游戏不进入索引"""
+    game = GameRecord.from_dict(record, corpus_file.source)
+    if game.embed_status in HIDDEN_EMBED_STATUSES:
+        return None
+    category_ids, categories = canonical_categories(record)
+    return {
+        'source': route_source(corpus_file.rel_dir),
+        'id': game.id or os.path.basename(corpus_file.path)[:-len('.json')],
+        'title': game.title or 'Untitled Game',
+        'preview_image': game.preview_image or '',
+        'thumbnail': preview_thumbnail(game),
+        'categories': categories,
+        'category_ids': category_ids,
+        'tags': game.tags or [],
+    }
+
+
+def build_index(cards=None, workers=None):
+    """
+    构建分类/标签倒排索引
+    同一 (source, id) 的多个文件（如 html5games 各分类目录下的副本）合并为一个文档
+    """
+    if cards is None:
+        cards = map_records(card_fields, workers=workers)
+
+    docs = {}
+    for card in cards:
+        if not card:
+            continue
+        key = (card['source'], card['id'])
+        if key in docs:
+            doc = docs[key]
+            for field in ('categories', 'category_ids', 'tags'):
+                doc[field] += [v for v in card[field] if v not in doc[field]]
+        else:
+            docs[key] = card
+
+    games = [docs[key] for key in sorted(docs)]
+    postings = {facet: {} for facet in FACET_FIELDS}
+    for doc_id, game in enumerate(games):
+        for facet, field in FACET_FIELDS.items():
+            for value in dict.fromkeys(game[field]):
+                postings[facet].setdefault(value, []).append(doc_id)
+
+    index = {
+        'version': 1,
+        'built_at': datetime.now().isoformat(),
+        'games': games,
+    }
+    for facet, values in postings.items():
+        index[facet] = {
+            value: {'count': len(ids), 'ids': delta_encode(ids)}
+            for value, ids in sorted(values.items())
+        }
+    return index
+
+
+def save_index(index, path=INDEX_FILE):
+    write_json_atomic(path, index)
+
+
+def load_index(path=INDEX_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        return FacetIndex(json.load(f))
+
+
+class FacetIndex:
+    """只读的倒排索引查询接口"""
+
+    def __init__(self, data):
+        self.data = data
+        self.games = data['games']
+        self._decoded = {}
+
+    def facet_counts(self, facet):
+        """返回某个维度下每个取值的文档数"""
+        return {value: entry['count'] for value, entry in self.data.get(facet, {}).items()}
+
+    def postings(self, facet, value):
+        """返回某个维度取值对应的有序文档id"""
+        cache_key = (facet, value)
+        if cache_key not in self._decoded:
+            entry = self.data.get(facet, {}).get(value)
+            self._decoded[cache_key] = delta_decode(entry['ids']) if entry else []
+        return self._decoded[cache_key]
+
+    def query(self, categories=(), tags=()):
+        """返回同时满足所有分类和标签条件的游戏，例如 query(['Puzzle'], ['2-player'])"""
+        taxonomy = load_taxonomy()
+        id_lists = [self.postings('category', taxonomy.resolve(c)['id']) for c in categories]
+        id_lists += [self.postings('tag', t) for t in tags]
+        if not id_lists:
+            return list(self.games)
+        return [self.games[doc_id] for doc_id in intersect(*id_lists)]
+
+    def multi_category_games(self, exclude=('2-player',)):
+        """返回属于两个及以上分类（按规范 id 计算）的游戏，直接使用文档表，无需重新扫描JSON"""
+        return [
+            game for game in self.games
+            if len([c for c in game['category_ids'] if c not in exclude]) >= 2
+        ]
@@ -0,0 +1,232 @@
+"""
+只解析 <head> 的结构化数据提取（JSON-LD / OpenGraph / meta）
+流式读取页面，遇到 </head> 或 <body> 立即停止；字段足够时抓取流程可以跳过浏览器渲染和全文解析。
+全文解析会得到头部没有的数据（如 onlinegames 的分类推断、标签和完整 HTML）的来源不使用头部抓取，
+只用头部字段补全全文解析缺少的字段（merge_head_fields）。
+"""
+import codecs
+import json
+import logging
+import re
+from collections import Counter, namedtuple
+from datetime import datetime
+from html.parser import HTMLParser
+
+logger = logging.getLogger(__name__)
+
+# 这些字段都拿到时认为头部信息已经足够（分类只能从全文得到时必须走全文解析，否则会丢失分类）
+REQUIRED_FIELDS = ('title', 'iframe_url', 'preview_image', 'categories')
+
+# 响应头没有声明编码时，从页面开头的 <meta charset> 中识别
+META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+# JSON-LD 中表示游戏页面的类型
+GAME_TYPES = {'VideoGame', 'Game', 'WebApplication', 'SoftwareApplication'}
+
+HeadResult = namedtuple('HeadResult', ['fields', 'sufficient', 'html'])
+
+
+class _HeadDone(Exception):
+    pass
+
+
+class _HeadParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.title = []
+        self.json_ld = []
+        self._in_title = False
+        self._script = None
+
+    def handle_starttag(self, tag, attr_list):
+        if tag == 'body':
+            raise _HeadDone()
+        attrs = dict(attr_list)
+        if tag == 'meta':
+            name = (attrs.get('property') or attrs.get('name') or '').lower()
+            if name and attrs.get('content') and name not in self.meta:
+                self.meta[name] = attrs['content'].strip()
+        elif tag == 'title':
+            self._in_title = True
+        elif tag == 'script' and (attrs.get('type') or '').lower() == 'application/ld+json':
+            self._script = []
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            raise _HeadDone()
+        if tag == 'title':
+            self._in_title = False
+        elif tag == 'script' and self._script is not None:
+            self.json_ld.append(''.join(self._script))
+            self._script = None
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title.append(data)
+        elif self._script is not None:
+            self._script.append(data)
+
+
+def _first(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get('url') or value.get('contentUrl') or value.get('@id')
+    return value.strip() if isinstance(value, str) else ''
+
+
+def _as_list(value):
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(',') if v.strip()]
+    if isinstance(value, list):
+        return [v.strip() for v in value if isinstance(v, str) and v.strip()]
+    return []
+
+
+def _game_objects(data):
+    """展开 JSON-LD（列表、@graph）并找出游戏类型的对象"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _game_objects(item)
+    elif isinstance(data, dict):
+        if '@graph' in data:
+            yield from _game_objects(data['@graph'])
+        types = data.get('@type')
+        types = set(types) if isinstance(types, list) else {types}
+        if types & GAME_TYPES:
+            yield data
+
+
+def _fields(parser):
+    """按 JSON-LD > OpenGraph/Twitter > 普通 meta/title 的优先级合并字段"""
+    game = {}
+    for block in parser.json_ld:
+        try:
+            game = next(_game_objects(json.loads(block)), None) or {}
+        except ValueError:
+            continue
+        if game:
+            break
+
+    meta = parser.meta
+    return {
+        'title': _first(game.get('name')) or meta.get('og:title') or meta.get('twitter:title')
+                 or ''.join(parser.title).strip(),
+        'description': _first(game.get('description')) or meta.get('og:description') or meta.get('description', ''),
+        'preview_image': _first(game.get('image')) or _first(game.get('thumbnailUrl')) or meta.get('og:image')
+                         or meta.get('twitter:image', ''),
+        'iframe_url': _first(game.get('embedUrl')) or meta.get('og:video:secure_url') or meta.get('og:video:url')
+                      or meta.get('og:video') or meta.get('twitter:player', ''),
+        'categories': _as_list(game.get('genre')),
+        'tags': _as_list(game.get('keywords')) or _as_list(meta.get('keywords')),
+    }
+
+
+def _result(parser, html, required=REQUIRED_FIELDS):
+    fields = _fields(parser)
+    return HeadResult(fields, all(fields[f] for f in required), html)
+
+
+def extract_head(html, required=REQUIRED_FIELDS):
+    """从已有的HTML中只解析头部"""
+    parser = _HeadParser()
+    try:
+        parser.feed(html)
+        parser.close()
+    except _HeadDone:
+        pass
+    return _result(parser, html, required)
+
+
+def _decoder(response, first_chunk):
+    """
+    响应头声明了 charset 时使用它；否则（requests 对没有 charset 的 text/html 报告 ISO-8859-1）
+    取 <meta charset>，都没有时按 UTF-8 解码
+    """
+    encoding = None
+    if 'charset=' in response.headers.get('Content-Type', '').lower():
+        encoding = response.encoding
+    if not encoding:
+        match = META_CHARSET.search(first_chunk)
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return codecs.getincrementaldecoder(encoding)(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+def fetch_head(session, url, timeout=15, max_bytes=512 * 1024, required=REQUIRED_FIELDS):
+    """
+    用普通HTTP请求流式读取页面，只读到 </head> 为止
+    请求失败时返回 None；返回结果的 html 是实际读取到的部分，可直接写入存档
+    :param required: 判断头部信息是否足够的字段（全文解析有额外字段的来源可以要求更多）
+    """
+    try:
+        with session.get(url, stream=True, timeout=timeout) as response:
+            if response.status_code >= 400:
+                return None
+            decoder = None
+            parser = _HeadParser()
+            chunks, size = [], 0
+            try:
+                for chunk in response.iter_content(chunk_size=8192):
+                    if decoder is None:
+                        decoder = _decoder(response, chunk)
+                    text = decoder.decode(chunk)
+                    chunks.append(text)
+                    size += len(chunk)
+                    parser.feed(text)
+                    if size >= max_bytes:
+                        break
+            except _HeadDone:
+                pass
+    except Exception as e:
+        logger.warning(f"Head request failed for {url}: {str(e)}")
+        return None
+    return _result(parser, ''.join(chunks), required)
+
+
+def head_game_data(url, fields):
+    """把头部字段转换为与全文解析相同结构的游戏数据"""
+    return {
+        'url': url,
+        'title': fields['title'],
+        'description': fields['description'],
+        'iframe_url': fields['iframe_url'],
+        'preview_image': fields['preview_image'],
+        'categories': fields['categories'],
+        'tags': fields['tags'],
+        'scraped_at': datetime.now().isoformat()
+    }
+
+
+def merge_head_fields(game_data, fields):
+    """用头部字段补全全文解析结果中为空的字段（不覆盖全文解析得到的值）"""
+    for field, value in fields.items():
+        if value and not game_data.get(field):
+            game_data[field] = value
+    return game_data
+
+
+def record_head_stats(stats, site, result):
+    """累计头部提取的命中情况，写入与规则命中统计相同的结构（字段名 _head）"""
+    counter = stats.setdefault(site, {}).setdefault('_head', Counter())
+    counter['pages'] += 1
+    if result is None:
+        counter['failed'] += 1
+        return
+    if result.sufficient:
+        counter['sufficient'] += 1
+    for field, value in result.fields.items():
+        if value:
+            counter[field] += 1
+
+
+def format_head_stats(stats, site):
+    counter = stats.get(site, {}).get('_head')
+    if not counter or not counter.get('pages'):
+        return f"{site}: no head-tier requests"
+    pages = counter['pages']
+    fields = ', '.join(f"{field} {counter.get(field, 0) / pages:.0%}" for field in REQUIRED_FIELDS + ('description',))
+    return f"{site}: head tier sufficient for {counter.get('sufficient', 0)}/{pages} pages ({fields})"
@@ -0,0 +1,154 @@
+import asyncio
+import io
+import json
+import logging
+import os
+from datetime import datetime
+
+import httpx
+from PIL import Image
+
+from gamecollect.images import MAX_IMAGE_BYTES, ORIGINALS_DIR, USER_AGENT
+from gamecollect.paths import CATALOG_DIR
+from gamecollect.phash import BKTree, dhash, luminance_stddev, phash
+
+logger = logging.getLogger(__name__)
+
+HASH_INDEX_FILE = os.path.join(CATALOG_DIR, 'image_hashes.json')
+REPORT_FILE = os.path.join(CATALOG_DIR, 'image_report.json')
+
+# 小于该尺寸或灰度几乎没有变化的图片视为占位图
+PLACEHOLDER_MIN_SIZE = 32
+PLACEHOLDER_MAX_STDDEV = 4.0
+# 同一张（近似）图片被这么多不同标题使用时，视为来源网站的通用占位图
+PLACEHOLDER_SHARED_TITLES = 5
+# pHash 汉明距离不超过该值视为近似重复
+DUPLICATE_DISTANCE = 6
+
+
+def load_hash_index(path=HASH_INDEX_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def analyze_image(data):
+    """计算感知哈希并判断是否为占位图"""
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            result = {
+                'width': img.width,
+                'height': img.height,
+                'phash': f"{phash(img):016x}",
+                'dhash': f"{dhash(img):016x}",
+            }
+            too_small = min(img.size) < PLACEHOLDER_MIN_SIZE
+            result['status'] = 'placeholder' if too_small or luminance_stddev(img) < PLACEHOLDER_MAX_STDDEV else 'ok'
+            return result
+    except Exception as e:
+        return {'status': 'invalid', 'error': str(e)}
+
+
+def cached_original(preview, url):
+    """如果预览图已被图片管线镜像过，直接读取缓存的原图"""
+    if not preview or preview.get('source_url') != url or not preview.get('sha256'):
+        return None
+    path = os.path.join(ORIGINALS_DIR, preview['sha256'][:2], preview['sha256'])
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class _TooLarge(Exception):
+    pass
+
+
+async def _download(client, url):
+    """流式下载，超过 MAX_IMAGE_BYTES 时中止；返回 (HTTP 状态码, 内容)，状态码 >= 400 时内容为 None"""
+    async with client.stream('GET', url) as response:
+        if response.status_code >= 400:
+            return response.status_code, None
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > MAX_IMAGE_BYTES:
+            raise _TooLarge(f"image too large ({length} bytes)")
+        data = bytearray()
+        async for chunk in response.aiter_bytes():
+            data += chunk
+            if len(data) > MAX_IMAGE_BYTES:
+                raise _TooLarge(f"image too large (more than {MAX_IMAGE_BYTES} bytes)")
+        return response.status_code, bytes(data)
+
+
+async def _check_one(client, semaphore, url, preview):
+    data = cached_original(preview, url)
+    http_status = None
+    if data is None:
+        async with semaphore:
+            try:
+                http_status, data = await _download(client, url)
+            except _TooLarge as e:
+                return {'status': 'invalid', 'error': str(e)}
+            except Exception as e:
+                return {'status': 'broken', 'error': str(e)}
+        if data is None:
+            return {'status': 'broken', 'http_status': http_status}
+    result = await asyncio.get_running_loop().run_in_executor(None, analyze_image, data)
+    if http_status is not None:
+        result['http_status'] = http_status
+    return result
+
+
+async def check_images(entries, concurrency=16, timeout=20.0):
+    """
+    :param entries: {key: (url, preview)}
+    :return: {key: 检查结果}
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits, follow_redirects=True,
+                                 headers={'User-Agent': USER_AGENT}) as client:
+        keys = list(entries)
+        results = await asyncio.gather(*(_check_one(client, semaphore, *entries[key]) for key in keys))
+    checked_at = datetime.now().isoformat()
+    for key, result in zip(keys, results):
+        result['url'] = entries[key][0]
+        result['checked_at'] = checked_at
+    return dict(zip(keys, results))
+
+
+def build_tree(index):
+    tree = BKTree()
+    for key, entry in index.items():
+        if entry.get('phash'):
+            tree.add(int(entry['phash'], 16), key)
+    return tree
+
+
+def find_duplicates(index, tree, keys, titles, max_distance=DUPLICATE_DISTANCE):
+    """
+    在 BK 树中查找 keys 的近似重复图片
+    :return: (重复组列表, 被多个不同标题共用的占位图 key 集合)
+    """
+    groups, shared_placeholders, seen = [], set(), set()
+    for key in keys:
+        entry = index.get(key) or {}
+        if key in seen or not entry.get('phash'):
+            continue
+        matches = tree.search(int(entry['phash'], 16), max_distance)
+        group = [(distance, other) for distance, other in matches if other != key]
+        if not group:
+            continue
+        members = [key] + [other for _, other in group]
+        seen.update(members)
+        groups.append({
+            'games': members,
+            'max_distance': max(distance for distance, _ in group),
+        })
+        distinct_titles = {titles.get(member, '').lower() for member in members}
+        if len(distinct_titles) >= PLACEHOLDER_SHARED_TITLES:
+            shared_placeholders.update(members)
+    return groups, shared_placeholders
+
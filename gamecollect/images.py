@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from PIL import Image, ImageOps
+
+from gamecollect import blurhash
+from gamecollect.paths import CATALOG_DIR, PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+# 原图按内容哈希缓存（不对外发布），缩略图输出到 public 下由 Next.js 直接提供
+ORIGINALS_DIR = os.path.join(CATALOG_DIR, 'image_cache')
+THUMBS_DIR = os.path.join(PROJECT_ROOT, 'public', 'media', 'thumbs')
+THUMBS_URL = '/media/thumbs'
+
+# 游戏网格卡片的显示宽度及其2倍图
+THUMB_WIDTHS = (180, 360)
+THUMB_FORMATS = (('webp', {'quality': 80, 'method': 6}), ('avif', {'quality': 55}))
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def thumbnail_name(digest, width, fmt):
+    return f"{digest[:16]}-{width}.{fmt}"
+
+
+def make_thumbnails(data, digest):
+    """
+    从原图生成各尺寸的 WebP/AVIF 缩略图和 BlurHash（CPU密集，在线程池中执行）
+    已存在的缩略图文件不会重复生成；当前 Pillow 不支持 AVIF 时跳过该格式
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img).convert('RGB')
+        width, height = img.size
+
+        small = img.copy()
+        small.thumbnail((32, 32))
+        hash_value = blurhash.encode(list(small.getdata()), small.width, small.height)
+
+        os.makedirs(THUMBS_DIR, exist_ok=True)
+        thumbnails = []
+        for target_width in THUMB_WIDTHS:
+            scale = min(1.0, target_width / width)
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            resized = None
+            for fmt, options in THUMB_FORMATS:
+                name = thumbnail_name(digest, target_width, fmt)
+                path = os.path.join(THUMBS_DIR, name)
+                if not os.path.exists(path):
+                    if resized is None:
+                        resized = img.resize(size, Image.LANCZOS)
+                    try:
+                        resized.save(path, fmt.upper(), **options)
+                    except (KeyError, OSError, ValueError) as e:
+                        logger.debug(f"Skipping {fmt} thumbnail: {str(e)}")
+                        if os.path.exists(path):
+                            os.remove(path)
+                        continue
+                thumbnails.append({
+                    'width': size[0],
+                    'height': size[1],
+                    'format': fmt,
+                    'path': f"{THUMBS_URL}/{name}",
+                })
+
+    return {
+        'sha256': digest,
+        'width': width,
+        'height': height,
+        'blurhash': hash_value,
+        'thumbnails': thumbnails,
+    }
+
+
+class ImagePipeline:
+    """并发抓取预览图，按内容哈希去重并生成缩略图"""
+
+    def __init__(self, concurrency=16, timeout=20.0, cpu_workers=None):
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=cpu_workers or os.cpu_count() or 1)
+        # 内容哈希 -> 正在处理/已处理的任务，保证同一张图只处理一次
+        self._by_digest = {}
+        self.stats = {'fetched': 0, 'failed': 0, 'deduplicated': 0}
+
+    async def fetch(self, client, url):
+        """流式下载，超过 MAX_IMAGE_BYTES 时立即中止，不把整个响应读入内存"""
+        async with self.semaphore, client.stream('GET', url) as response:
+            response.raise_for_status()
+            length = response.headers.get('Content-Length')
+            if length and length.isdigit() and int(length) > MAX_IMAGE_BYTES:
+                raise ValueError(f"image too large ({length} bytes)")
+            data = bytearray()
+            async for chunk in response.aiter_bytes():
+                data += chunk
+                if len(data) > MAX_IMAGE_BYTES:
+                    raise ValueError(f"image too large (more than {MAX_IMAGE_BYTES} bytes)")
+            return bytes(data)
+
+    async def process(self, client, url):
+        """下载并处理一张图片，失败时返回 None"""
+        try:
+            data = await self.fetch(client, url)
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.warning(f"Failed to fetch image {url}: {str(e)}")
+            return None
+        self.stats['fetched'] += 1
+
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._by_digest:
+            self.stats['deduplicated'] += 1
+        else:
+            self._save_original(digest, data)
+            loop = asyncio.get_running_loop()
+            self._by_digest[digest] = loop.run_in_executor(self.executor, make_thumbnails, data, digest)
+        try:
+            preview = dict(await self._by_digest[digest])
+        except Exception as e:
+            self.stats['failed'] += 1
+            logger.warning(f"Failed to process image {url}: {str(e)}")
+            return None
+        preview['source_url'] = url
+        return preview
+
+    def _save_original(self, digest, data):
+        path = os.path.join(ORIGINALS_DIR, digest[:2], digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+
+    async def run(self, urls):
+        """处理一批URL，返回 {url: preview 或 None}"""
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits, follow_redirects=True,
+                                     headers={'User-Agent': USER_AGENT}) as client:
+            unique = list(dict.fromkeys(urls))
+            results = await asyncio.gather(*(self.process(client, url) for url in unique))
+        return dict(zip(unique, results))
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,44 @@
+import hashlib
+import re
+import unicodedata
+from urllib.parse import urlsplit
+
+from gamecollect.urls import canonicalize
+
+
+def slugify(text, max_length=60):
+    """把标题转换为小写、连字符分隔的 ASCII slug"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    slug = re.sub(r'[^a-zA-Z0-9]+', '-', text).strip('-').lower()
+    return slug[:max_length].rstrip('-') or 'game'
+
+
+def key_hash(value, length=10):
+    """生成固定长度的十六进制短哈希"""
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=16).hexdigest()[:length]
+
+
+def identity_of(game_data):
+    """取记录的身份标识：优先页面URL，其次 iframe 地址，最后是标题"""
+    url = game_data.get('url')
+    if url:
+        return canonicalize(url)
+    iframe_url = game_data.get('iframe_url')
+    if iframe_url:
+        return canonicalize(iframe_url)
+    return slugify(game_data.get('title') or game_data.get('name') or '')
+
+
+def url_key_hash(source, url):
+    """只根据来源和页面URL计算键中的哈希部分（用于抓取前判断是否已存在）"""
+    return key_hash(f"{source}|{canonicalize(url)}")
+
+
+def game_key(source, game_data):
+    """
+    生成稳定的记录键: <标题slug>-<来源+身份哈希>
+    同一来源的同一游戏无论抓取多少次都得到相同的键
+    """
+    title = game_data.get('title') or game_data.get('name') or ''
+    slug = slugify(title) if title else slugify(urlsplit(game_data.get('url', '')).path)
+    return f"{slug}-{key_hash(f'{source}|{identity_of(game_data)}')}"
@@ -0,0 +1,212 @@
+"""
+爬虫使用的异步结构化日志
+调用方只把日志记录放入队列（QueueHandler），由后台线程（QueueListener）格式化并写出：
+文件为 JSON Lines（按大小轮转），每行带抓取和页面的关联 id；控制台输出普通文本，可以只保留 WARNING 以上。
+每条日志语句（文件 + 行号）的低级别日志按令牌桶限流，逐条链接/字段/文件的日志不会拖慢抓取，
+被丢弃的条数记在该语句下一条放行的日志中。
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from gamecollect.paths import PROJECT_ROOT
+
+LOG_DIR = os.path.join(PROJECT_ROOT, 'logs')
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# 单个日志文件的大小上限和保留的历史文件数
+MAX_BYTES = 20 * 1024 * 1024
+BACKUP_COUNT = 5
+# 每条日志语句每秒放行的低级别日志数，以及允许的突发条数
+RATE = 5.0
+BURST = 20
+
+# 通过环境变量调整，不需要改动各个爬虫脚本的参数
+ENV_CONSOLE_LEVEL = 'GAMECOLLECT_CONSOLE_LEVEL'
+ENV_CRAWL_ID = 'GAMECOLLECT_CRAWL_ID'
+
+crawl_id_var = contextvars.ContextVar('crawl_id', default=None)
+page_id_var = contextvars.ContextVar('page_id', default=None)
+page_url_var = contextvars.ContextVar('page_url', default=None)
+
+
+def new_id():
+    return uuid.uuid4().hex[:12]
+
+
+def set_crawl_id(crawl_id=None):
+    """设置当前抓取的 id（工作进程沿用主进程的 id），返回该 id"""
+    crawl_id = crawl_id or new_id()
+    crawl_id_var.set(crawl_id)
+    return crawl_id
+
+
+def set_page(url):
+    """开始处理一个新页面：之后输出的日志带上新的页面 id 和该 URL（用于逐页循环的开头）"""
+    page_id_var.set(new_id())
+    page_url_var.set(url)
+
+
+@contextmanager
+def page_context(url):
+    """在该上下文中输出的日志都带上同一个页面 id 和页面 URL"""
+    tokens = (page_id_var.set(new_id()), page_url_var.set(url))
+    try:
+        yield
+    finally:
+        page_id_var.reset(tokens[0])
+        page_url_var.reset(tokens[1])
+
+
+class ContextFilter(logging.Filter):
+    """在调用方线程中把关联 id 写入日志记录（后台线程看不到调用方的 contextvars）"""
+
+    def filter(self, record):
+        record.crawl_id = crawl_id_var.get()
+        record.page_id = page_id_var.get()
+        record.page_url = page_url_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    按日志语句（文件 + 行号）限流：每秒补充 rate 个令牌，最多积累 burst 个
+    WARNING 及以上的日志总是放行
+    """
+
+    def __init__(self, rate=RATE, burst=BURST):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated, dropped = self.buckets.get(key, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self.buckets[key] = (tokens, now, dropped + 1)
+                return False
+            self.buckets[key] = (tokens - 1, now, 0)
+        if dropped:
+            record.suppressed = dropped
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志一行 JSON"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'process': record.processName,
+            'msg': record.getMessage(),
+        }
+        for field in ('crawl_id', 'page_id', 'page_url', 'suppressed'):
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """控制台的普通文本格式，被限流丢弃过日志时在末尾注明条数"""
+
+    def format(self, record):
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', None)
+        return f"{text} (+{suppressed} similar suppressed)" if suppressed else text
+
+
+class ContextQueueHandler(QueueHandler):
+    """
+    在调用方线程中合并消息参数、把异常格式化为 exc_text 后放入队列
+    QueueHandler 默认会把异常堆栈并入 msg，这里保留为单独的字段，JSON 日志写入 exc
+    """
+
+    _exc_formatter = logging.Formatter()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener = None
+
+
+def setup_logging(name, level=logging.INFO, console_level=None, console_format=CONSOLE_FORMAT, log_dir=LOG_DIR,
+                  max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, rate=RATE, burst=BURST, crawl_id=None):
+    """
+    配置根日志：QueueHandler -> 后台 QueueListener -> logs/<name>.jsonl（轮转）+ 控制台
+    多进程抓取时每个进程使用不同的 name，避免多个进程轮转同一个文件；name 中路径分隔符等字符替换为 _
+    :param console_level: 控制台的最低级别，默认取环境变量 GAMECOLLECT_CONSOLE_LEVEL，否则为 level
+    :param crawl_id: 抓取 id，默认取环境变量 GAMECOLLECT_CRAWL_ID，否则新生成
+    :return: 本次抓取的 id
+    """
+    global _listener
+    stop_logging()
+    os.makedirs(log_dir, exist_ok=True)
+    file_name = re.sub(r'[^\w.-]+', '_', name)
+    file_handler = RotatingFileHandler(os.path.join(log_dir, f"{file_name}.jsonl"), maxBytes=max_bytes,
+                                       backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(console_level or os.environ.get(ENV_CONSOLE_LEVEL) or level)
+    console_handler.setFormatter(ConsoleFormatter(console_format))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = ContextQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(RateLimitFilter(rate, burst))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    _listener = (os.getpid(), listener)
+    return set_crawl_id(crawl_id or os.environ.get(ENV_CRAWL_ID))
+
+
+def stop_logging():
+    """
+    写出队列中剩余的日志（进程退出时自动调用）
+    fork 出的子进程继承的是父进程的监听器（后台线程不在子进程中运行），只丢弃不停止
+    """
+    global _listener
+    if _listener is not None and _listener[0] == os.getpid():
+        _listener[1].stop()
+    _listener = None
+
+
+atexit.register(stop_logging)
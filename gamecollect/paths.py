@@ -0,0 +1,32 @@
+import os
+
+# 项目根目录（gamecollect 包的上一级）
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRAPED_DATA_DIR = os.path.join(PROJECT_ROOT, 'scraped_data')
+# 离线构建产物（索引、分片等）的输出目录
+CATALOG_DIR = os.path.join(PROJECT_ROOT, 'catalog')
+
+# 来源名称 -> scraped_data 下的相对目录（onlinegames 的数据历史上直接放在根目录）
+SOURCE_DIRS = {
+    'onlinegames': '',
+    '1000webgames': '1000webgames',
+    'html5games': 'html5games',
+    'gamedistribution': 'gamedistribution',
+    'jopi': 'jopi',
+}
+
+
+def source_for_dir(rel_dir):
+    """根据 scraped_data 下的相对目录推断来源名称"""
+    rel_dir = rel_dir.replace(os.sep, '/').strip('/')
+    if rel_dir in ('', '.'):
+        return 'onlinegames'
+    return rel_dir.split('/')[0]
+
+
+def route_source(rel_dir):
+    """网站路由 /game/[source]/[id] 中使用的来源名（根目录文件为 root）"""
+    rel_dir = rel_dir.replace(os.sep, '/').strip('/')
+    if rel_dir in ('', '.'):
+        return 'root'
+    return rel_dir.split('/')[0]
@@ -0,0 +1,90 @@
+import math
+
+from PIL import Image
+
+# 感知哈希（64位）与 BK 树，用于查找相似/重复的预览图
+
+
+def dhash(img, size=8):
+    """差值哈希：比较相邻像素的明暗"""
+    gray = img.convert('L').resize((size + 1, size), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    value = 0
+    for y in range(size):
+        row = y * (size + 1)
+        for x in range(size):
+            value = (value << 1) | (pixels[row + x] > pixels[row + x + 1])
+    return value
+
+
+_DCT_SIZE = 32
+_DCT_COS = [[math.cos((2 * x + 1) * u * math.pi / (2 * _DCT_SIZE)) for x in range(_DCT_SIZE)] for u in range(8)]
+
+
+def phash(img):
+    """DCT 感知哈希：取 32x32 灰度图的左上 8x8 低频系数，与中位数比较"""
+    gray = img.convert('L').resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    rows = [pixels[y * _DCT_SIZE:(y + 1) * _DCT_SIZE] for y in range(_DCT_SIZE)]
+    # 可分离的二维 DCT，只计算需要的 8x8 低频部分
+    row_dct = [[sum(c * p for c, p in zip(_DCT_COS[u], row)) for u in range(8)] for row in rows]
+    coeffs = [
+        sum(_DCT_COS[v][y] * row_dct[y][u] for y in range(_DCT_SIZE))
+        for v in range(8) for u in range(8)
+    ]
+    median = sorted(coeffs[1:])[31]
+    value = 0
+    for c in coeffs:
+        value = (value << 1) | (c > median)
+    return value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def luminance_stddev(img):
+    """灰度标准差，用于识别纯色/近似纯色的占位图"""
+    gray = img.convert('L').resize((32, 32))
+    pixels = list(gray.getdata())
+    mean = sum(pixels) / len(pixels)
+    return math.sqrt(sum((p - mean) ** 2 for p in pixels) / len(pixels))
+
+
+class BKTree:
+    """按汉明距离组织的 BK 树，近邻查询只访问满足三角不等式的分支"""
+
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    def add(self, value, item):
+        self.size += 1
+        if self.root is None:
+            self.root = (value, [item], {})
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value, max_distance):
+        """返回 [(distance, item)]，按距离排序"""
+        results = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= max_distance:
+                results.extend((distance, item) for item in items)
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return sorted(results, key=lambda r: r[0])
@@ -0,0 +1,267 @@
+"""
+热门游戏统计
+网站把 play/click 事件追加到 catalog/events/<日期>.log（每行：时间戳\t事件\t来源\t游戏id），
+这里增量读取新增的日志行，用 count-min sketch 累计按时间衰减的热度，同时保留热度最高的候选游戏，
+最后结合分类索引生成全站和各分类的热门列表（catalog/popular.json）。
+内存占用只取决于 sketch 大小和候选数量，与事件数量无关。
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+import tempfile
+import time
+from array import array
+from datetime import datetime, timezone
+
+from gamecollect.paths import CATALOG_DIR
+from gamecollect.storage import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+EVENTS_DIR = os.path.join(CATALOG_DIR, 'events')
+STATE_FILE = os.path.join(CATALOG_DIR, 'popularity_state.bin')
+POPULAR_FILE = os.path.join(CATALOG_DIR, 'popular.json')
+
+# 各类事件的权重：真正开始游戏比点击卡片更能说明热度
+EVENT_WEIGHTS = {'play': 1.0, 'click': 0.2}
+
+HALF_LIFE_HOURS = 72
+SKETCH_WIDTH = 1 << 16
+SKETCH_DEPTH = 4
+CANDIDATES = 20000
+
+# 前向衰减：计数按 2^((t - landmark) / half_life) 放大写入，指数过大时整体缩小并移动 landmark
+MAX_EXPONENT = 500
+
+
+def event_log_path(ts=None, events_dir=EVENTS_DIR):
+    day = datetime.fromtimestamp(ts if ts is not None else time.time(), tz=timezone.utc)
+    return os.path.join(events_dir, f"{day:%Y%m%d}.log")
+
+
+def format_event(event, source, game_id, ts=None):
+    ts = ts if ts is not None else time.time()
+    return f"{ts:.3f}\t{event}\t{source}\t{game_id}\n"
+
+
+def append_event(event, source, game_id, ts=None, events_dir=EVENTS_DIR):
+    """追加一条事件（O_APPEND 单次写入，多个进程同时写也不会交错）"""
+    if event not in EVENT_WEIGHTS:
+        raise ValueError(f"Unknown event type: {event}")
+    line = format_event(event, source, game_id, ts).encode('utf-8')
+    path = event_log_path(ts, events_dir)
+    os.makedirs(events_dir, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+class CountMinSketch:
+    """固定大小的 count-min sketch，估计值只会偏大"""
+
+    def __init__(self, width=SKETCH_WIDTH, depth=SKETCH_DEPTH, counters=None):
+        self.width = width
+        self.depth = depth
+        self.counters = counters if counters is not None else array('d', bytes(8 * width * depth))
+
+    def _cells(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=4 * self.depth).digest()
+        for row in range(self.depth):
+            yield row * self.width + int.from_bytes(digest[4 * row:4 * row + 4], 'little') % self.width
+
+    def add(self, key, value):
+        """累加并返回新的估计值（只增加当前最小的格子，降低高估）"""
+        cells = list(self._cells(key))
+        estimate = min(self.counters[cell] for cell in cells) + value
+        for cell in cells:
+            if self.counters[cell] < estimate:
+                self.counters[cell] = estimate
+        return estimate
+
+    def estimate(self, key):
+        return min(self.counters[cell] for cell in self._cells(key))
+
+    def scale(self, factor):
+        for i in range(len(self.counters)):
+            self.counters[i] *= factor
+
+
+class PopularityTracker:
+    """
+    按时间衰减的热度统计
+    sketch 保存所有游戏的近似热度，candidates 只保留热度最高的一批游戏（定期裁剪）
+    """
+
+    def __init__(self, half_life_hours=HALF_LIFE_HOURS, capacity=CANDIDATES, sketch=None):
+        self.half_life = half_life_hours * 3600
+        self.capacity = capacity
+        self.sketch = sketch or CountMinSketch()
+        self.landmark = None
+        self.candidates = {}
+        self.min_candidate = 0.0
+        self.offsets = {}
+        self.events = 0
+
+    def _weight(self, ts):
+        if self.landmark is None:
+            self.landmark = ts
+        exponent = (ts - self.landmark) / self.half_life
+        if exponent > MAX_EXPONENT:
+            self._rebase(ts)
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def _rebase(self, ts):
+        factor = 2.0 ** (-(ts - self.landmark) / self.half_life)
+        self.sketch.scale(factor)
+        self.candidates = {key: value * factor for key, value in self.candidates.items()}
+        self.min_candidate *= factor
+        self.landmark = ts
+
+    def add(self, key, ts, weight=1.0):
+        estimate = self.sketch.add(key, weight * self._weight(ts))
+        self.events += 1
+        if key in self.candidates or len(self.candidates) < 2 * self.capacity:
+            self.candidates[key] = estimate
+        elif estimate > self.min_candidate:
+            self.candidates[key] = estimate
+        if len(self.candidates) >= 2 * self.capacity:
+            self._prune()
+
+    def _prune(self):
+        kept = sorted(self.candidates.items(), key=lambda item: item[1], reverse=True)[:self.capacity]
+        self.candidates = dict(kept)
+        self.min_candidate = kept[-1][1] if kept else 0.0
+
+    def scores(self, now=None):
+        """当前时刻的热度（按衰减折算），从高到低"""
+        if self.landmark is None:
+            return []
+        now = now if now is not None else time.time()
+        decay = 2.0 ** (-(now - self.landmark) / self.half_life)
+        return sorted(((key, value * decay) for key, value in self.candidates.items()),
+                      key=lambda item: item[1], reverse=True)
+
+    def ingest_file(self, path):
+        """从上次读到的位置继续读取一个事件日志，只处理完整的行；返回新处理的事件数"""
+        name = os.path.basename(path)
+        offset = self.offsets.get(name, 0)
+        count = 0
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # 写入中的最后一行留到下次
+                offset += len(line)
+                try:
+                    ts, event, source, game_id = line.decode('utf-8').rstrip('\n').split('\t')
+                    weight = EVENT_WEIGHTS[event]
+                    ts = float(ts)
+                except (ValueError, KeyError):
+                    continue
+                if not math.isfinite(ts):
+                    continue
+                self.add(f"{source}/{game_id}", ts, weight)
+                count += 1
+        self.offsets[name] = offset
+        return count
+
+    def ingest(self, events_dir=EVENTS_DIR):
+        if not os.path.isdir(events_dir):
+            return 0
+        names = sorted(name for name in os.listdir(events_dir) if name.endswith('.log'))
+        # 已删除的旧日志不再需要记录读取位置
+        self.offsets = {name: offset for name, offset in self.offsets.items() if name in names}
+        return sum(self.ingest_file(os.path.join(events_dir, name)) for name in names)
+
+    def save(self, path=STATE_FILE):
+        header = json.dumps({
+            'half_life': self.half_life,
+            'capacity': self.capacity,
+            'width': self.sketch.width,
+            'depth': self.sketch.depth,
+            'landmark': self.landmark,
+            'events': self.events,
+            'offsets': self.offsets,
+            'candidates': self.candidates,
+        }).encode('utf-8')
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(struct.pack('<Q', len(header)))
+                f.write(header)
+                self.sketch.counters.tofile(f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path=STATE_FILE, half_life_hours=HALF_LIFE_HOURS, capacity=CANDIDATES):
+        """读取上次的统计状态；不存在或参数变化时从头开始"""
+        if not os.path.exists(path):
+            return cls(half_life_hours, capacity)
+        with open(path, 'rb') as f:
+            (size,) = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(size))
+            if header['half_life'] != half_life_hours * 3600:
+                logger.warning("Half-life changed, rebuilding popularity from the event logs")
+                return cls(half_life_hours, capacity)
+            counters = array('d')
+            counters.fromfile(f, header['width'] * header['depth'])
+        tracker = cls(half_life_hours, capacity, CountMinSketch(header['width'], header['depth'], counters))
+        tracker.landmark = header['landmark']
+        tracker.events = header['events']
+        tracker.offsets = header['offsets']
+        tracker.candidates = header['candidates']
+        if len(tracker.candidates) >= capacity:
+            tracker.min_candidate = min(tracker.candidates.values())
+        return tracker
+
+
+def build_popular(tracker, games, limit=24, now=None):
+    """
+    生成全站和各分类的热门列表
+    games 为分类索引中的游戏卡片（catalog/category_index.json），不在索引中的游戏（如嵌入失效）被忽略
+    """
+    cards = {f"{game['source']}/{game['id']}": game for game in games}
+    popular = []
+    by_category = {}
+    for key, score in tracker.scores(now):
+        game = cards.get(key)
+        if game is None:
+            continue
+        entry = {
+            'source': game['source'],
+            'id': game['id'],
+            'title': game['title'],
+            'preview_image': game.get('preview_image') or '',
+            'thumbnail': game.get('thumbnail'),
+            'score': round(score, 3),
+        }
+        if len(popular) < limit:
+            popular.append(entry)
+        for category_id in game.get('category_ids', []):
+            ranked = by_category.setdefault(category_id, [])
+            if len(ranked) < limit:
+                ranked.append(entry)
+    return {
+        'version': 1,
+        'built_at': datetime.now().isoformat(),
+        'half_life_hours': tracker.half_life / 3600,
+        'events': tracker.events,
+        'all': popular,
+        'categories': dict(sorted(by_category.items())),
+    }
+
+
+def save_popular(data, path=POPULAR_FILE):
+    write_json_atomic(path, data)
@@ -0,0 +1,157 @@
+"""
+统一的游戏记录模型
+各来源的记录结构不一致（jopi 使用 name/image_url，html5games 旧记录使用单数的 category），
+入库和读取时都先通过对应来源的适配器转换为 GameRecord，再校验，写出时只保留有值的字段。
+编码/解码优先使用 orjson；分类、标签等高度重复的字符串会被驻留以减少内存占用。
+"""
+import json
+import sys
+from dataclasses import dataclass, fields
+
+try:
+    import orjson
+except ImportError:  # orjson 不可用时退回标准库
+    orjson = None
+
+
+class RecordError(ValueError):
+    """记录不符合模型（缺少标题、字段类型错误等）"""
+
+
+# 字符串列表字段，其中的值在整个语料中大量重复
+LIST_FIELDS = ('categories', 'category_ids', 'category_icons', 'source_categories', 'tags')
+# 字典字段（离线任务写入的结构化结果）
+DICT_FIELDS = ('preview', 'embed_detail')
+# 必须是 http(s) 链接的字段
+URL_FIELDS = ('url', 'iframe_url')
+
+
+@dataclass(slots=True)
+class GameRecord:
+    title: str
+    id: str | None = None
+    url: str | None = None
+    description: str | None = None
+    instructions: str | None = None
+    iframe_url: str | None = None
+    preview_image: str | None = None
+    categories: list[str] | None = None
+    category_ids: list[str] | None = None
+    category_icons: list[str] | None = None
+    source_categories: list[str] | None = None
+    tags: list[str] | None = None
+    scraped_at: str | None = None
+    first_seen_at: str | None = None
+    # 由离线任务写入的字段
+    related: list[str] | None = None
+    preview: dict | None = None
+    preview_status: str | None = None
+    embed_status: str | None = None
+    embed_checked_at: str | None = None
+    embed_detail: dict | None = None
+    # 原始页面内容（体积大，只有部分来源保存）
+    raw_html: str | None = None
+    html_content: str | None = None
+    # 模型之外的字段原样保留，保证读写往返不丢数据
+    extra: dict | None = None
+
+    @classmethod
+    def from_dict(cls, data, source=None):
+        """按来源适配旧结构后构造记录（不校验）"""
+        data = ADAPTERS.get(source, _adapt_common)(dict(data))
+        values = {}
+        for name in FIELD_NAMES:
+            if name in data:
+                values[name] = data.pop(name)
+        for name in LIST_FIELDS:
+            # 类型不对的值原样保留，由 validate 报错
+            if isinstance(values.get(name), list):
+                values[name] = [sys.intern(v) if type(v) is str else v for v in values[name]]
+        return cls(title=values.pop('title', ''), extra=data or None, **values)
+
+    def to_dict(self):
+        """写入文件的字典：省略值为 None 的字段，模型之外的字段放在最后"""
+        data = {}
+        for name in FIELD_NAMES:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def validate(self):
+        """检查必填字段和字段类型，不符合时抛出 RecordError"""
+        if not isinstance(self.title, str) or not self.title.strip():
+            raise RecordError(f"Record {self.id or self.url} has no title")
+        for name in FIELD_NAMES:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            expected = FIELD_TYPES[name]
+            if not isinstance(value, expected):
+                raise RecordError(f"Field {name} of {self.title!r} should be {expected.__name__}, "
+                                  f"got {type(value).__name__}")
+            if name in LIST_FIELDS and not all(isinstance(v, str) for v in value):
+                raise RecordError(f"Field {name} of {self.title!r} should only contain strings")
+        for name in URL_FIELDS:
+            value = getattr(self, name)
+            if value and not value.startswith(('http://', 'https://', '//')):
+                raise RecordError(f"Field {name} of {self.title!r} is not an http(s) URL: {value}")
+        return self
+
+
+FIELD_NAMES = tuple(f.name for f in fields(GameRecord) if f.name != 'extra')
+FIELD_TYPES = {
+    name: list if name in LIST_FIELDS or name == 'related' else dict if name in DICT_FIELDS else str
+    for name in FIELD_NAMES
+}
+
+
+def _adapt_common(data):
+    """
+    所有来源通用：只有单数 category 的旧记录据此补上 categories 列表（category 本身保留在 extra 中，
+    html5games 各分类目录下的副本用它记录所在分类）；写成单个字符串的列表字段按逗号拆分为列表
+    """
+    category = data.get('category')
+    if category and not data.get('categories'):
+        data['categories'] = [category] if isinstance(category, str) else list(category)
+    for name in LIST_FIELDS:
+        if isinstance(data.get(name), str):
+            data[name] = [v.strip() for v in data[name].split(',') if v.strip()]
+    return data
+
+
+def _adapt_jopi(data):
+    """jopi 列表页使用 name / image_url"""
+    if 'name' in data:
+        name = data.pop('name')
+        data.setdefault('title', name)
+    if 'image_url' in data:
+        image_url = data.pop('image_url')
+        data.setdefault('preview_image', image_url)
+    return _adapt_common(data)
+
+
+ADAPTERS = {
+    'jopi': _adapt_jopi,
+}
+
+
+def encode(record, indent=False):
+    """GameRecord（或字典）编码为 UTF-8 JSON"""
+    data = record.to_dict() if isinstance(record, GameRecord) else record
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, ensure_ascii=False, indent=2 if indent else None).encode('utf-8')
+
+
+def decode(content, source=None):
+    """从 JSON（bytes 或 str）解码为 GameRecord"""
+    data = orjson.loads(content) if orjson is not None else json.loads(content)
+    return GameRecord.from_dict(data, source)
+
+
+def load_record(path, source=None):
+    with open(path, 'rb') as f:
+        return decode(f.read(), source)
@@ -0,0 +1,229 @@
+"""
+相关游戏推荐
+把标题、简介、分类和标签转换为 TF-IDF 稀疏向量（余弦相似度），通过倒排表只比较有共同特征的游戏，
+出现在太多游戏中的特征（如大分类）不参与候选生成，避免两两比较整个目录。
+结果以 "来源/id" 列表写入每条记录的 related 字段；再次构建时只重新计算内容变化的游戏。
+增量构建沿用上次全量构建时的文档频率（IDF），新旧分数才可比：增量结果与用同一 IDF 全量计算的结果完全相同，
+与 --full 的差别只来自这期间 IDF 的变化（主要是排在末位的邻居互换）。上次全量构建以来变化的游戏
+超过 max_drift 时自动全量重建。
+"""
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+
+from gamecollect.corpus import load_json, map_records
+from gamecollect.paths import CATALOG_DIR, route_source
+from gamecollect.records import GameRecord
+from gamecollect.storage import write_json_atomic
+from gamecollect.taxonomy import canonical_categories
+
+RELATED_STATE = os.path.join(CATALOG_DIR, 'related.json')
+
+# 各字段特征的权重（词频乘以该权重）
+FIELD_WEIGHTS = {'title': 3.0, 'category': 2.0, 'tag': 2.0, 'description': 1.0}
+
+# 出现在超过该比例游戏中的特征只参与打分，不用于生成候选
+MAX_BLOCK_DF = 0.2
+
+# 上次全量构建以来新增、修改和删除的游戏累计超过该比例时全量重建（重新计算 IDF）
+MAX_DRIFT = 0.05
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'for', 'from', 'game', 'games', 'has', 'have',
+    'in', 'is', 'it', 'its', 'of', 'on', 'or', 'play', 'that', 'the', 'this', 'to', 'with', 'you', 'your',
+}
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokens(text):
+    return [t for t in _TOKEN.findall((text or '').lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def related_document(corpus_file, record):
+    """提取计算相似度需要的特征（在进程池中执行）"""
+    source = route_source(corpus_file.rel_dir)
+    game = GameRecord.from_dict(record, corpus_file.source)
+    game_id = game.id or os.path.basename(corpus_file.path)[:-len('.json')]
+    category_ids, _ = canonical_categories(record)
+    features = Counter()
+    for token in tokens(game.title):
+        features[f"t:{token}"] += FIELD_WEIGHTS['title']
+    for token in tokens(game.description):
+        features[f"d:{token}"] += FIELD_WEIGHTS['description']
+    for category_id in category_ids:
+        features[f"c:{category_id}"] += FIELD_WEIGHTS['category']
+    for tag in game.tags or []:
+        features[f"g:{tag.lower()}"] += FIELD_WEIGHTS['tag']
+    return {
+        'key': f"{source}/{game_id}",
+        'path': corpus_file.path,
+        'features': dict(features),
+        'related': game.related,
+    }
+
+
+class SimilarityIndex:
+    """
+    归一化的 TF-IDF 向量 + 倒排表
+    df / total 为计算 IDF 和高频特征使用的文档频率和文档总数，默认由 docs 统计；
+    增量构建时传入上次保存的值，其中没有的（新出现的）特征使用当前的文档频率
+    """
+
+    def __init__(self, docs, max_block_df=MAX_BLOCK_DF, df=None, total=None):
+        self.keys = [doc['key'] for doc in docs]
+        self.positions = {key: i for i, key in enumerate(self.keys)}
+        current = Counter(feature for doc in docs for feature in doc['features'])
+        if df is None:
+            df, total = dict(current), len(docs)
+        else:
+            df = {**current, **df}
+        self.df, self.total = df, total
+        idf = {feature: math.log((1 + total) / (1 + count)) + 1 for feature, count in df.items()}
+
+        self.vectors = []
+        for doc in docs:
+            vector = {f: (1 + math.log(tf)) * idf[f] for f, tf in doc['features'].items() if tf > 0}
+            norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+            self.vectors.append({f: w / norm for f, w in vector.items()})
+
+        # 只为足够有区分度的特征建立倒排表，高频特征在打分时单独补上
+        block_limit = max(2, int(max_block_df * total))
+        self.frequent = {feature for feature, count in df.items() if count > block_limit}
+        self.postings = defaultdict(list)
+        for i, vector in enumerate(self.vectors):
+            for feature, weight in vector.items():
+                if feature not in self.frequent:
+                    self.postings[feature].append((i, weight))
+
+    def scores(self, i):
+        """与第 i 个游戏有共同（非高频）特征的游戏及其余弦相似度"""
+        vector = self.vectors[i]
+        result = defaultdict(float)
+        for feature, weight in vector.items():
+            for j, other_weight in self.postings.get(feature, ()):
+                result[j] += weight * other_weight
+        result.pop(i, None)
+        frequent = [(f, w) for f, w in vector.items() if f in self.frequent]
+        if frequent:
+            for j in result:
+                other = self.vectors[j]
+                result[j] += sum(w * other.get(f, 0.0) for f, w in frequent)
+        return result
+
+    def neighbors(self, i, k):
+        scores = self.scores(i)
+        return [(self.keys[j], round(score, 4)) for j, score in heapq.nlargest(k, scores.items(), key=lambda x: x[1])]
+
+
+def load_state(path=RELATED_STATE):
+    if not os.path.exists(path):
+        return {'version': 2, 'k': None, 'games': {}}
+    return load_json(path)
+
+
+def update_related(state, docs, k=12, full=False, max_drift=MAX_DRIFT):
+    """
+    增量更新相关游戏列表
+    内容变化（或新增）的游戏重新计算邻居，并把它们插入到其他游戏的列表中；
+    列表里引用了已变化或已删除游戏的其他游戏也会重新计算
+    :param max_drift: 上次全量构建以来变化的游戏占比超过该值时全量重建
+    :return: (新状态, {'full': bool, 'recomputed': n, 'patched': n, 'unchanged': n, 'deleted': n})
+    """
+    # 旧版本的状态没有保存文档频率，无法增量更新
+    full = full or state.get('k') != k or state.get('version') != 2
+    previous = {} if full else state.get('games', {})
+    changed = {doc['key'] for doc in docs
+               if previous.get(doc['key'], {}).get('fingerprint') != doc['fingerprint']}
+    deleted = set(previous) - {doc['key'] for doc in docs}
+    drift = 0 if full else state.get('drift', 0) + len(changed) + len(deleted)
+    if not full and drift > max_drift * max(state.get('total', 0), 1):
+        full, previous, drift = True, {}, 0
+        changed, deleted = {doc['key'] for doc in docs}, set()
+
+    if full:
+        index = SimilarityIndex(docs)
+    else:
+        index = SimilarityIndex(docs, df=state['df'], total=state['total'])
+    games = {}
+    for doc in docs:
+        if doc['key'] not in changed:
+            entry = previous[doc['key']]
+            games[doc['key']] = {'fingerprint': doc['fingerprint'], 'neighbors': [tuple(n) for n in entry['neighbors']]}
+
+    # 引用了变化或删除游戏的列表需要整体重算（旧分数已经失效）
+    stale = {key for key, entry in games.items() if any(n[0] in changed or n[0] in deleted for n in entry['neighbors'])}
+    recompute = changed | stale
+    patched = set()
+    for key in recompute:
+        i = index.positions[key]
+        doc = docs[i]
+        games[key] = {'fingerprint': doc['fingerprint'], 'neighbors': index.neighbors(i, k)}
+
+    # 相似度是对称的：把变化的游戏插入到未重算的游戏的列表中（全部重算时跳过）
+    for key in (changed if len(recompute) < len(docs) else ()):
+        for j, score in index.scores(index.positions[key]).items():
+            other = index.keys[j]
+            if other in recompute:
+                continue
+            neighbors = games[other]['neighbors']
+            if len(neighbors) < k or score > neighbors[-1][1]:
+                neighbors = sorted(neighbors + [(key, round(score, 4))], key=lambda n: n[1], reverse=True)[:k]
+                games[other]['neighbors'] = neighbors
+                patched.add(other)
+
+    stats = {
+        'full': full,
+        'recomputed': len(recompute),
+        'patched': len(patched),
+        'unchanged': len(games) - len(recompute) - len(patched),
+        'deleted': len(deleted),
+    }
+    state = {'version': 2, 'k': k, 'total': index.total, 'drift': drift, 'df': index.df, 'games': games}
+    return state, stats
+
+
+def save_state(state, path=RELATED_STATE):
+    write_json_atomic(path, state)
+
+
+def write_related(docs, state):
+    """把相关游戏写入记录文件（只写入有变化的文件），返回写入的文件数"""
+    written = 0
+    for doc in docs:
+        related = [key for key, _ in state['games'][doc['key']]['neighbors']]
+        for path in doc['paths']:
+            if path == doc['path'] and doc['related'] == related:
+                continue
+            record = load_json(path)
+            if record.get('related') == related:
+                continue
+            record['related'] = related
+            write_json_atomic(path, record)
+            written += 1
+    return written
+
+
+def collect_documents(workers=None):
+    """读取语料，同一 (source, id) 的多个文件（html5games 各分类目录下的副本）合并为一个文档"""
+    docs = {}
+    for doc in map_records(related_document, workers=workers):
+        if not doc:
+            continue
+        existing = docs.get(doc['key'])
+        if existing:
+            existing['paths'].append(doc['path'])
+            for feature, weight in doc['features'].items():
+                existing['features'].setdefault(feature, weight)
+        else:
+            doc['paths'] = [doc['path']]
+            docs[doc['key']] = doc
+    for doc in docs.values():
+        # 特征的指纹，用于判断内容是否变化
+        content = json.dumps(sorted(doc['features'].items()))
+        doc['fingerprint'] = hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+    return [docs[key] for key in sorted(docs)]
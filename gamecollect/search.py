@@ -0,0 +1,141 @@
+import hashlib
+import os
+import re
+import sqlite3
+
+from gamecollect.corpus import map_records
+from gamecollect.paths import CATALOG_DIR, route_source
+from gamecollect.records import GameRecord
+from gamecollect.taxonomy import canonical_categories
+
+SEARCH_DB = os.path.join(CATALOG_DIR, 'search.sqlite3')
+
+# bm25 列权重：title, description, instructions, tags
+COLUMN_WEIGHTS = (10.0, 2.0, 1.0, 4.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    rowid INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    source TEXT NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    preview_image TEXT,
+    fingerprint TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS games_fts USING fts5(
+    title, description, instructions, tags,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+
+def search_document(corpus_file, record):
+    """提取参与全文检索的字段及其内容指纹（在进程池中执行）"""
+    source = route_source(corpus_file.rel_dir)
+    game = GameRecord.from_dict(record, corpus_file.source)
+    game_id = game.id or os.path.basename(corpus_file.path)[:-len('.json')]
+    _, categories = canonical_categories(record)
+    doc = {
+        'key': f"{source}/{game_id}",
+        'source': source,
+        'id': game_id,
+        'title': game.title or '',
+        'preview_image': game.preview_image or '',
+        'description': game.description or '',
+        'instructions': game.instructions or '',
+        'tags': ' '.join(list(game.tags or []) + categories),
+    }
+    content = '\x1f'.join(doc[f] for f in ('title', 'preview_image', 'description', 'instructions', 'tags'))
+    doc['fingerprint'] = hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+    return doc
+
+
+def connect(path=SEARCH_DB):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def update_index(conn, docs):
+    """
+    增量更新索引：只重写指纹变化的文档，删除语料中已不存在的文档
+    :return: {'inserted': n, 'updated': n, 'deleted': n, 'unchanged': n}
+    """
+    stats = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+    existing = {key: (rowid, fp) for rowid, key, fp in conn.execute('SELECT rowid, key, fingerprint FROM games')}
+    seen = set()
+    with conn:
+        for doc in docs:
+            if not doc or doc['key'] in seen:
+                continue
+            seen.add(doc['key'])
+            current = existing.get(doc['key'])
+            if current and current[1] == doc['fingerprint']:
+                stats['unchanged'] += 1
+                continue
+            if current:
+                conn.execute('DELETE FROM games_fts WHERE rowid = ?', (current[0],))
+                conn.execute(
+                    'UPDATE games SET title = ?, preview_image = ?, fingerprint = ? WHERE rowid = ?',
+                    (doc['title'], doc['preview_image'], doc['fingerprint'], current[0]))
+                rowid = current[0]
+                stats['updated'] += 1
+            else:
+                cursor = conn.execute(
+                    'INSERT INTO games (key, source, id, title, preview_image, fingerprint) VALUES (?, ?, ?, ?, ?, ?)',
+                    (doc['key'], doc['source'], doc['id'], doc['title'], doc['preview_image'], doc['fingerprint']))
+                rowid = cursor.lastrowid
+                stats['inserted'] += 1
+            conn.execute(
+                'INSERT INTO games_fts (rowid, title, description, instructions, tags) VALUES (?, ?, ?, ?, ?)',
+                (rowid, doc['title'], doc['description'], doc['instructions'], doc['tags']))
+        for key, (rowid, _) in existing.items():
+            if key not in seen:
+                conn.execute('DELETE FROM games_fts WHERE rowid = ?', (rowid,))
+                conn.execute('DELETE FROM games WHERE rowid = ?', (rowid,))
+                stats['deleted'] += 1
+    return stats
+
+
+def build_index(path=SEARCH_DB, workers=None):
+    """从 scraped_data 增量更新搜索索引"""
+    conn = connect(path)
+    try:
+        return update_index(conn, map_records(search_document, workers=workers))
+    finally:
+        conn.close()
+
+
+def to_match_query(text):
+    """把用户输入转换为 FTS5 查询：各词为 AND 关系，最后一个词做前缀匹配"""
+    terms = re.findall(r'\w+', text.lower())
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def search(conn, text, limit=10, source=None):
+    """按 bm25 相关度返回前 limit 个结果"""
+    match = to_match_query(text)
+    if not match:
+        return []
+    sql = (
+        'SELECT g.source, g.id, g.title, g.preview_image, bm25(games_fts, ?, ?, ?, ?) AS score '
+        'FROM games_fts JOIN games g ON g.rowid = games_fts.rowid '
+        'WHERE games_fts MATCH ?'
+    )
+    params = list(COLUMN_WEIGHTS) + [match]
+    if source:
+        sql += ' AND g.source = ?'
+        params.append(source)
+    sql += ' ORDER BY score LIMIT ?'
+    params.append(limit)
+    return [
+        {'source': s, 'id': i, 'title': t, 'preview_image': p, 'score': -score}
+        for s, i, t, p, score in conn.execute(sql, params)
+    ]
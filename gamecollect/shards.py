@@ -0,0 +1,136 @@
+"""
+按分类分页的静态卡片分片
+从分类倒排索引生成 public/shards/<分类id>/<页码>.<哈希>.json，每个分片只包含卡片字段，
+同时生成 .gz 和 .br 预压缩版本，以及记录所有分片及其哈希的 manifest.json。
+文件名带内容哈希，可以长期缓存；manifest 最后写入，读取方总能看到完整的一组分片。
+上一版 manifest 引用的分片保留到下一次构建，已经加载旧 manifest 的页面仍能继续加载后续页。
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from gamecollect.paths import PROJECT_ROOT
+from gamecollect.storage import write_json_atomic
+
+try:
+    import brotli
+except ImportError:  # 没有安装 brotli 时只生成 gzip 版本
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+SHARDS_DIR = os.path.join(PROJECT_ROOT, 'public', 'shards')
+MANIFEST_FILE = os.path.join(SHARDS_DIR, 'manifest.json')
+SHARDS_URL = '/shards'
+
+# "All games" 对应的分片名
+ALL_GAMES = 'all'
+PAGE_SIZE = 48
+
+
+def card(game):
+    """分片中的卡片只保留列表展示需要的字段"""
+    return {
+        'source': game['source'],
+        'id': game['id'],
+        'title': game['title'],
+        'image': game.get('thumbnail') or game.get('preview_image') or '',
+    }
+
+
+def _write_bytes(path, data):
+    if os.path.exists(path):
+        return  # 文件名包含内容哈希，已存在的文件内容必然相同
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_shard(shards_dir, name, page, cards):
+    """写入一个分片及其压缩版本，返回 manifest 中的条目"""
+    body = json.dumps(cards, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(body).hexdigest()
+    filename = f"{page}.{digest[:12]}.json"
+    directory = os.path.join(shards_dir, name)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename)
+
+    _write_bytes(path, body)
+    # mtime=0 保证相同内容生成相同的 gzip 文件
+    gz = gzip.compress(body, compresslevel=9, mtime=0)
+    _write_bytes(path + '.gz', gz)
+    entry = {
+        'path': f"{SHARDS_URL}/{name}/{filename}",
+        'sha256': digest,
+        'count': len(cards),
+        'bytes': len(body),
+        'gzip_bytes': len(gz),
+    }
+    if brotli is not None:
+        br = brotli.compress(body, quality=11)
+        _write_bytes(path + '.br', br)
+        entry['br_bytes'] = len(br)
+    return entry
+
+
+def build_shards(index, shards_dir=SHARDS_DIR, page_size=PAGE_SIZE):
+    """
+    按分类（以及全部游戏）生成分页分片
+    index 为 gamecollect.facets.FacetIndex；返回 manifest
+    """
+    if brotli is None:
+        logger.warning("brotli is not installed, only gzip variants will be generated")
+    games = index.games
+    lists = {ALL_GAMES: list(range(len(games)))}
+    for category_id in index.facet_counts('category'):
+        lists[category_id] = index.postings('category', category_id)
+
+    categories = {}
+    for name, doc_ids in sorted(lists.items()):
+        cards = [card(games[doc_id]) for doc_id in doc_ids]
+        pages = [write_shard(shards_dir, name, page + 1, cards[start:start + page_size])
+                 for page, start in enumerate(range(0, len(cards), page_size))]
+        categories[name] = {'count': len(cards), 'pages': pages}
+
+    return {
+        'version': 1,
+        'built_at': datetime.now().isoformat(),
+        'page_size': page_size,
+        'categories': categories,
+    }
+
+
+def remove_stale(manifest, previous=None, shards_dir=SHARDS_DIR):
+    """删除当前和上一版 manifest 都不再引用的分片，返回删除的文件数"""
+    keep = set()
+    for current in (manifest, previous or {'categories': {}}):
+        for entry in current['categories'].values():
+            for page in entry['pages']:
+                path = os.path.join(shards_dir, *page['path'][len(SHARDS_URL) + 1:].split('/'))
+                keep.update((path, path + '.gz', path + '.br'))
+    removed = 0
+    for directory, _, filenames in os.walk(shards_dir):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if path == os.path.join(shards_dir, 'manifest.json') or path in keep:
+                continue
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def load_manifest(path=MANIFEST_FILE):
+    """读取当前的 manifest，不存在或无法读取时返回 None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    write_json_atomic(path, manifest)
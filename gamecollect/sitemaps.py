@@ -0,0 +1,160 @@
+"""
+基于 robots.txt / sitemap 的URL发现
+从 robots.txt 找到 sitemap，递归展开 sitemap 索引（支持 .gz），用 iterparse 流式解析，
+只把新出现或 lastmod 有更新的游戏页面登记到抓取状态库。位置既可以是URL，也可以是本地文件路径。
+"""
+import gzip
+import io
+import logging
+import os
+import re
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlsplit
+
+import requests
+
+from gamecollect.urls import canonicalize
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+SitemapEntry = namedtuple('SitemapEntry', ['url', 'lastmod'])
+
+# 各来源的站点地址和游戏详情页的URL规则
+SITEMAP_SOURCES = {
+    'onlinegames': {'base_url': 'https://www.onlinegames.io', 'game_pattern': r'^https?://(www\.)?onlinegames\.io/(?!t/)[^/?#]+/?$'},
+    '1000webgames': {'base_url': 'https://1000webgames.com', 'game_pattern': r'/play-'},
+    'html5games': {'base_url': 'https://html5games.com', 'game_pattern': r'/Game/'},
+    'gamedistribution': {'base_url': 'https://gamedistribution.com', 'game_pattern': r'/games/[^/?#]+/?$'},
+}
+
+
+def parse_lastmod(value):
+    """把 W3C 日期时间（如 2024-05-01 或 2024-05-01T10:00:00Z）转换为 UTC 时间戳"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _is_local(location):
+    return location.startswith('file://') or not urlsplit(location).scheme
+
+
+def open_location(location, session=None, timeout=30):
+    """打开URL或本地文件，返回二进制流；gzip 内容自动解压"""
+    if _is_local(location):
+        path = location[len('file://'):] if location.startswith('file://') else location
+        raw = open(path, 'rb')
+    else:
+        session = session or requests.Session()
+        response = session.get(location, stream=True, timeout=timeout, headers={'User-Agent': USER_AGENT})
+        response.raise_for_status()
+        response.raw.decode_content = True  # 处理 Content-Encoding: gzip
+        raw = io.BufferedReader(response.raw)
+    # 按内容判断是否为 gzip（.gz 文件可能已被服务器按 Content-Encoding 解压）
+    if raw.peek(2)[:2] == b'\x1f\x8b':
+        return gzip.GzipFile(fileobj=raw)
+    return raw
+
+
+def robots_sitemaps(base_url, session=None):
+    """读取 robots.txt 中声明的 sitemap，没有声明时使用 /sitemap.xml"""
+    robots_url = urljoin(base_url.rstrip('/') + '/', 'robots.txt')
+    sitemaps = []
+    try:
+        session = session or requests.Session()
+        response = session.get(robots_url, timeout=15, headers={'User-Agent': USER_AGENT})
+        if response.status_code < 400:
+            for line in response.text.splitlines():
+                name, _, value = line.partition(':')
+                if name.strip().lower() == 'sitemap' and value.strip():
+                    sitemaps.append(value.strip())
+    except Exception as e:
+        logger.warning(f"Could not read {robots_url}: {str(e)}")
+    return sitemaps or [urljoin(base_url.rstrip('/') + '/', 'sitemap.xml')]
+
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def iter_sitemap(location, session=None, state=None, max_depth=3, completed=None):
+    """
+    流式解析一个 sitemap（或 sitemap 索引），产出 SitemapEntry
+    传入 state 时，lastmod 没有变化的子 sitemap 会被跳过
+    :param completed: 列表，完整读取的子 sitemap 以 SitemapEntry 追加到其中；调用方登记完页面后
+                      再用 state.set_sitemap_lastmod 保存，否则中途崩溃时这些页面会被当作已处理而跳过
+    """
+    stream = open_location(location, session)
+    children = []
+    try:
+        loc = lastmod = None
+        for event, element in ET.iterparse(stream, events=('end',)):
+            name = _local_name(element.tag)
+            if name == 'loc':
+                loc = (element.text or '').strip()
+            elif name == 'lastmod':
+                lastmod = parse_lastmod(element.text)
+            elif name in ('url', 'sitemap'):
+                if loc:
+                    if name == 'url':
+                        yield SitemapEntry(loc, lastmod)
+                    else:
+                        children.append(SitemapEntry(loc, lastmod))
+                loc = lastmod = None
+                element.clear()  # 释放已处理的节点，保持内存占用恒定
+    finally:
+        stream.close()
+
+    for child in children:
+        if max_depth <= 0:
+            logger.warning(f"Sitemap nesting too deep, skipping {child.url}")
+            continue
+        if state is not None and child.lastmod is not None:
+            seen = state.sitemap_lastmod(child.url)
+            if seen is not None and child.lastmod <= seen:
+                logger.info(f"Sitemap unchanged since last run, skipping {child.url}")
+                continue
+        child_location = child.url
+        if _is_local(location) and not _is_local(child.url):
+            # 本地测试数据中的子 sitemap 按文件名在同一目录下查找
+            local_copy = os.path.join(os.path.dirname(location), os.path.basename(urlsplit(child.url).path))
+            if os.path.exists(local_copy):
+                child_location = local_copy
+        try:
+            yield from iter_sitemap(child_location, session, state, max_depth - 1, completed)
+        except Exception as e:
+            logger.error(f"Error reading sitemap {child.url}: {str(e)}")
+            continue
+        if completed is not None:
+            completed.append(child)
+
+
+def discover(source, state=None, sitemaps=None, session=None, completed=None):
+    """
+    发现某个来源的游戏页面，返回 [SitemapEntry]（按URL去重）
+    :param completed: 见 iter_sitemap；页面登记到 state 之后再保存其中子 sitemap 的 lastmod
+    """
+    config = SITEMAP_SOURCES[source]
+    pattern = re.compile(config['game_pattern'])
+    session = session or requests.Session()
+    entries = {}
+    for location in sitemaps or robots_sitemaps(config['base_url'], session):
+        try:
+            for entry in iter_sitemap(location, session, state, completed=completed):
+                url = canonicalize(entry.url)
+                if pattern.search(url):
+                    entries[url] = SitemapEntry(url, entry.lastmod)
+        except Exception as e:
+            logger.error(f"Error reading sitemap {location}: {str(e)}")
+    logger.info(f"Discovered {len(entries)} {source} game pages from sitemaps")
+    return list(entries.values())
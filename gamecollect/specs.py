@@ -0,0 +1,291 @@
+"""
+声明式站点解析规则（data/extraction_specs.json）
+每个字段是一组按优先级排列的候选规则，编译后在一次 HTMLParser 遍历中同时匹配所有候选，
+取优先级最高的命中结果，并按站点记录每个字段命中的是第几条规则，便于清理失效的规则。
+
+规则支持的键:
+    tag / id / class / attrs(精确匹配) / attr_contains(不区分大小写的子串，"$字段" 表示引用另一字段的结果)
+    within       祖先元素需要满足的规则（相当于 CSS 后代选择器）
+    after_label  前一个同级元素的直接文本包含该标签（相当于 XPath following-sibling）
+    attr         取属性值；不指定时取元素文本
+    url          相对地址按站点 base_url 补全
+    strip        从结果中删除的子串
+    all          收集所有命中结果（列表字段，所有规则的结果合并）
+"""
+import json
+import os
+from collections import Counter
+from functools import lru_cache
+from html.parser import HTMLParser
+
+from gamecollect.paths import CATALOG_DIR, PROJECT_ROOT
+from gamecollect.storage import write_json_atomic
+from gamecollect.urls import resolve
+
+SPECS_FILE = os.path.join(PROJECT_ROOT, 'data', 'extraction_specs.json')
+STATS_FILE = os.path.join(CATALOG_DIR, 'extraction_stats.json')
+
+# 没有结束标签的元素
+VOID_TAGS = frozenset(('area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+                       'param', 'source', 'track', 'wbr'))
+
+
+class Matcher:
+    """单个元素条件（不含 within）"""
+
+    def __init__(self, rule):
+        self.tag = rule.get('tag')
+        self.id = rule.get('id')
+        self.class_name = rule.get('class')
+        self.attrs = rule.get('attrs') or {}
+        self.attr_contains = {k: v.lower() for k, v in (rule.get('attr_contains') or {}).items()
+                              if not v.startswith('$')}
+        # 引用其他字段的条件要等整页解析完成后才能判断
+        self.deferred = {k: v[1:] for k, v in (rule.get('attr_contains') or {}).items() if v.startswith('$')}
+        self.after_label = rule.get('after_label')
+
+    def matches(self, tag, attrs, previous_text):
+        if self.tag and tag != self.tag:
+            return False
+        if self.id and attrs.get('id') != self.id:
+            return False
+        if self.class_name and self.class_name not in (attrs.get('class') or '').split():
+            return False
+        for name, value in self.attrs.items():
+            if attrs.get(name) != value:
+                return False
+        for name, value in self.attr_contains.items():
+            if value not in (attrs.get(name) or '').lower():
+                return False
+        for name in self.deferred:
+            if not attrs.get(name):
+                return False
+        if self.after_label and self.after_label not in previous_text:
+            return False
+        return True
+
+
+class Rule:
+    def __init__(self, field, index, spec, within_id):
+        self.field = field
+        self.index = index
+        self.matcher = Matcher(spec)
+        self.within_id = within_id
+        self.attr = spec.get('attr')
+        self.url = spec.get('url', False)
+        self.strip = spec.get('strip') or []
+        self.all = spec.get('all', False)
+
+
+class CompiledSite:
+    """把一个站点的所有字段规则编译为按标签分派的匹配表"""
+
+    def __init__(self, spec):
+        self.base_url = (spec.get('base_url') or '').rstrip('/')
+        self.fields = list(spec['fields'])
+        self.list_fields = set()
+        self.within = []  # within 条件列表，下标即 within_id
+        self.rules_by_tag = {}
+        self.untagged_rules = []
+        self._dispatch = {}
+        for field, candidates in spec['fields'].items():
+            for index, rule_spec in enumerate(candidates):
+                within_id = None
+                if rule_spec.get('within'):
+                    within_id = len(self.within)
+                    self.within.append(Matcher(rule_spec['within']))
+                rule = Rule(field, index, rule_spec, within_id)
+                if rule.all:
+                    self.list_fields.add(field)
+                if rule.matcher.tag:
+                    self.rules_by_tag.setdefault(rule.matcher.tag, []).append(rule)
+                else:
+                    self.untagged_rules.append(rule)
+
+    def rules_for(self, tag):
+        """某个标签需要检查的规则（带标签的规则 + 只按 class/id 等匹配的规则）"""
+        rules = self._dispatch.get(tag)
+        if rules is None:
+            rules = self._dispatch[tag] = self.rules_by_tag.get(tag, []) + self.untagged_rules
+        return rules
+
+    def finish_value(self, rule, value):
+        value = value.strip()
+        for fragment in rule.strip:
+            value = value.replace(fragment, '')
+        if rule.url and value and self.base_url:
+            value = resolve(value, self.base_url + '/')
+        return value.strip()
+
+
+class _Frame:
+    __slots__ = ('tag', 'within', 'text', 'previous_text', 'captures')
+
+    def __init__(self, tag, within):
+        self.tag = tag
+        self.within = within
+        self.text = []  # 元素自身的直接文本
+        self.previous_text = ''  # 上一个已关闭的子元素的直接文本
+        self.captures = []
+
+
+class _SinglePassParser(HTMLParser):
+    def __init__(self, site):
+        super().__init__(convert_charrefs=True)
+        self.site = site
+        self.stack = [_Frame(None, frozenset())]
+        self.active = []  # 正在收集文本的规则 [rule, parts]
+        self.best = {}  # 单值字段 -> (规则下标, 值)
+        self.lists = {field: [] for field in site.list_fields}
+        self.list_hits = {field: Counter() for field in site.list_fields}
+        self.deferred = []  # (rule, attrs, value)
+
+    def _record(self, rule, value, attrs=None):
+        value = self.site.finish_value(rule, value)
+        if not value:
+            return
+        if rule.matcher.deferred:
+            self.deferred.append((rule, attrs, value))
+        elif rule.all:
+            if value not in self.lists[rule.field]:
+                self.lists[rule.field].append(value)
+            self.list_hits[rule.field][rule.index] += 1
+        elif rule.field not in self.best or rule.index < self.best[rule.field][0]:
+            self.best[rule.field] = (rule.index, value)
+
+    def _wanted(self, rule):
+        if rule.all or rule.matcher.deferred:
+            return True
+        best = self.best.get(rule.field)
+        return best is None or rule.index < best[0]
+
+    def handle_starttag(self, tag, attr_list):
+        attrs = dict(attr_list)
+        parent = self.stack[-1]
+        within = parent.within
+        matched_within = [i for i, matcher in enumerate(self.site.within)
+                          if matcher.matches(tag, attrs, parent.previous_text)]
+        if matched_within:
+            within = within | frozenset(matched_within)
+
+        frame = None if tag in VOID_TAGS else _Frame(tag, within)
+        for rule in self.site.rules_for(tag):
+            if rule.within_id is not None and rule.within_id not in parent.within:
+                continue
+            if not self._wanted(rule) or not rule.matcher.matches(tag, attrs, parent.previous_text):
+                continue
+            if rule.attr:
+                self._record(rule, attrs.get(rule.attr) or '', attrs)
+            elif frame is not None:
+                capture = [rule, [], attrs]
+                frame.captures.append(capture)
+                self.active.append(capture)
+
+        if frame is None:
+            parent.previous_text = ''
+        else:
+            self.stack.append(frame)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self._close()
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS or not any(frame.tag == tag for frame in self.stack[1:]):
+            return
+        while len(self.stack) > 1:
+            if self._close() == tag:
+                break
+
+    def _close(self):
+        frame = self.stack.pop()
+        for capture in frame.captures:
+            self.active.remove(capture)
+            rule, parts, attrs = capture
+            self._record(rule, ''.join(parts), attrs)
+        self.stack[-1].previous_text = ''.join(frame.text)
+        return frame.tag
+
+    def handle_data(self, data):
+        self.stack[-1].text.append(data)
+        for capture in self.active:
+            capture[1].append(data)
+
+    def _deferred_ok(self, rule, attrs):
+        for name, field in rule.matcher.deferred.items():
+            reference = self.best.get(field)
+            if not reference or reference[1].lower() not in (attrs.get(name) or '').lower():
+                return False
+        return True
+
+    def results(self):
+        while len(self.stack) > 1:
+            self._close()
+        for rule, attrs, value in self.deferred:
+            if self._deferred_ok(rule, attrs) and (rule.field not in self.best or rule.index < self.best[rule.field][0]):
+                self.best[rule.field] = (rule.index, value)
+        values, hits = {}, {}
+        for field in self.site.fields:
+            if field in self.site.list_fields:
+                values[field] = self.lists[field]
+                hits[field] = sorted(self.list_hits[field])
+            else:
+                index, values[field] = self.best.get(field, (None, ''))
+                hits[field] = index
+        return values, hits
+
+
+class SpecExtractor:
+    """按站点规则提取字段，并累计每个字段各条规则的命中次数"""
+
+    def __init__(self, specs=None):
+        if specs is None:
+            with open(SPECS_FILE, 'r', encoding='utf-8') as f:
+                specs = json.load(f)
+        self.sites = {name: CompiledSite(spec) for name, spec in specs['sites'].items()}
+        self.stats = {}
+
+    def extract(self, site, html):
+        """单次遍历提取站点的所有字段，返回 {字段: 值}（列表字段返回列表，未命中为空）"""
+        parser = _SinglePassParser(self.sites[site])
+        parser.feed(html)
+        parser.close()
+        values, hits = parser.results()
+
+        site_stats = self.stats.setdefault(site, {})
+        for field, hit in hits.items():
+            counter = site_stats.setdefault(field, Counter())
+            counter['pages'] += 1
+            if hit is None or hit == []:
+                counter['miss'] += 1
+            else:
+                for index in (hit if isinstance(hit, list) else [hit]):
+                    counter[str(index)] += 1
+        return values
+
+
+@lru_cache(maxsize=None)
+def default_extractor():
+    return SpecExtractor()
+
+
+def merge_stats(target, stats):
+    """合并两份命中统计（target 原地更新）"""
+    for site, fields in stats.items():
+        for field, counts in fields.items():
+            counter = target.setdefault(site, {}).setdefault(field, Counter())
+            counter.update(counts)
+    return target
+
+
+def load_stats(path=STATS_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_stats(stats, path=STATS_FILE):
+    write_json_atomic(path, {site: {field: dict(counts) for field, counts in fields.items()}
+                             for site, fields in stats.items()})
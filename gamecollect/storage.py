@@ -0,0 +1,106 @@
+import glob
+import json
+import logging
+import os
+import tempfile
+
+from gamecollect.changes import log_change
+from gamecollect.keys import game_key, url_key_hash
+from gamecollect.records import GameRecord, load_record
+from gamecollect.taxonomy import apply_taxonomy
+from gamecollect.urls import canonicalize
+
+try:
+    import orjson
+except ImportError:  # orjson 不可用时退回标准库
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# 比较记录内容时忽略的字段（每次抓取都会变化）
+VOLATILE_FIELDS = ('scraped_at', 'first_seen_at')
+
+# 由离线任务写入记录的字段，重新抓取时沿用已有记录中的值
+DERIVED_FIELDS = ('related',)
+
+
+def write_json_atomic(filepath, data):
+    """先写临时文件再原子替换，避免并发或中断时留下半个文件"""
+    if isinstance(data, GameRecord):
+        data = data.to_dict()
+    directory = os.path.dirname(filepath)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.tmp')
+    try:
+        if orjson is not None:
+            # 与 json.dump(indent=2, ensure_ascii=False) 的输出格式一致
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        # mkstemp 创建的文件权限为 0600，这里恢复为普通文件权限
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, filepath)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _stable_view(game_data):
+    return {k: v for k, v in game_data.items() if k not in VOLATILE_FIELDS}
+
+
+def upsert_game(output_dir, source, game_data):
+    """
+    以稳定键写入游戏记录（存在则更新）
+    game_data 可以是 GameRecord 或任意来源结构的字典，入库前先转换为统一模型并校验
+    :return: (文件路径, 'inserted' | 'updated' | 'unchanged')
+    :raises RecordError: 记录不符合模型（如没有标题）
+    """
+    if not isinstance(game_data, GameRecord):
+        game_data = GameRecord.from_dict(game_data, source)
+    # 入库时统一规范化分类
+    record = apply_taxonomy(game_data.validate().to_dict())
+    if record.get('url'):
+        record['url'] = canonicalize(record['url'])
+    key = game_key(source, record)
+    # 标题变化只改变键中的 slug 部分：沿用已保存的文件名，避免产生重复记录
+    existing_path = _find_by_hash(output_dir, key.rsplit('-', 1)[1])
+    if existing_path:
+        key = os.path.basename(existing_path)[:-len('.json')]
+    record['id'] = key
+    filepath = os.path.join(output_dir, f"{key}.json")
+
+    existing = None
+    if os.path.exists(filepath):
+        try:
+            existing = load_record(filepath, source).to_dict()
+        except Exception as e:
+            logger.warning(f"Existing record {filepath} is unreadable, overwriting: {str(e)}")
+
+    if existing is None:
+        record.setdefault('first_seen_at', record.get('scraped_at'))
+        status = 'inserted'
+    else:
+        record['first_seen_at'] = existing.get('first_seen_at') or existing.get('scraped_at') or record.get('scraped_at')
+        for field in DERIVED_FIELDS:
+            if field in existing and field not in record:
+                record[field] = existing[field]
+        status = 'unchanged' if _stable_view(existing) == _stable_view(record) else 'updated'
+
+    write_json_atomic(filepath, record)
+    if status != 'unchanged':
+        log_change(output_dir, record)
+    return filepath, status
+
+
+def _find_by_hash(output_dir, hash_part):
+    matches = glob.glob(os.path.join(glob.escape(output_dir), f"*-{hash_part}.json"))
+    return min(matches) if matches else None
+
+
+def find_game_file(output_dir, source, url):
+    """按页面URL查找已保存的记录文件，找不到返回 None"""
+    return _find_by_hash(output_dir, url_key_hash(source, url))
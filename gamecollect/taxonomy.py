@@ -0,0 +1,98 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+from gamecollect.keys import slugify
+from gamecollect.paths import PROJECT_ROOT
+
+# 分类体系文件，Python 工具和 Next.js API 共用
+TAXONOMY_FILE = os.path.join(PROJECT_ROOT, 'data', 'taxonomy.json')
+
+# 规范分类与已有分类目录名不一致的（scraped_data/html5games 下的目录在引入分类体系前已经存在，不能改名）
+LEGACY_DIR_NAMES = {
+    'sports': 'sport',
+    'girl': 'girls',
+}
+
+
+def alias_key(name):
+    """别名匹配键：只保留小写字母和数字（'Jump & Run'、'jump_run' 都得到 'jumprun'）"""
+    return re.sub(r'[^a-z0-9]', '', (name or '').lower())
+
+
+class Taxonomy:
+    """规范分类表及别名解析"""
+
+    def __init__(self, data):
+        self.default_icon = data.get('default_icon', 'gamepad')
+        self.categories = {}
+        self._aliases = {}
+        for entry in data['categories']:
+            self.categories[entry['id']] = entry
+            for name in [entry['id'], entry['name']] + entry.get('aliases', []):
+                self._aliases[alias_key(name)] = entry
+
+    def resolve(self, name):
+        """把任意写法的分类名解析为规范分类；未收录的分类按其 slug 生成临时条目"""
+        entry = self._aliases.get(alias_key(name))
+        if entry:
+            return entry
+        return {'id': slugify(name), 'name': name.strip(), 'icon': self.default_icon, 'aliases': []}
+
+    def resolve_all(self, names):
+        """解析并去重（保持原顺序）"""
+        if isinstance(names, str):
+            names = [names]
+        resolved = {}
+        for name in names or []:
+            if name and name.strip():
+                entry = self.resolve(name)
+                resolved.setdefault(entry['id'], entry)
+        return list(resolved.values())
+
+    def icon(self, name):
+        return self.resolve(name)['icon']
+
+    def apply(self, record):
+        """
+        在入库时把分类规范化写入记录：
+        categories 为规范名称，category_ids 为规范 id（同时用作 URL slug），
+        category_icons 为对应图标，source_categories 保留来源网站的原始写法
+        """
+        raw = record.get('source_categories')
+        if raw is None:
+            raw = record.get('categories') or record.get('category') or []
+            if isinstance(raw, str):
+                raw = [raw]
+            record['source_categories'] = list(raw)
+        entries = self.resolve_all(raw)
+        record['categories'] = [entry['name'] for entry in entries]
+        record['category_ids'] = [entry['id'] for entry in entries]
+        record['category_icons'] = [entry['icon'] for entry in entries]
+        return record
+
+
+@lru_cache(maxsize=None)
+def load_taxonomy(path=TAXONOMY_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        return Taxonomy(json.load(f))
+
+
+def apply_taxonomy(record):
+    """对记录应用默认分类体系"""
+    return load_taxonomy().apply(record)
+
+
+def category_dir_name(name):
+    """任意写法的分类名对应的目录名（如 html5games/jump_run），沿用已有的目录名"""
+    category_id = load_taxonomy().resolve(name)['id']
+    return LEGACY_DIR_NAMES.get(category_id, category_id.replace('-', '_'))
+
+
+def canonical_categories(record):
+    """返回记录的规范分类 (ids, names)；旧记录没有预计算字段时现场解析"""
+    if 'category_ids' in record:
+        return record['category_ids'], record['categories']
+    entries = load_taxonomy().resolve_all(record.get('categories') or record.get('category') or [])
+    return [e['id'] for e in entries], [e['name'] for e in entries]
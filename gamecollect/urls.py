@@ -0,0 +1,106 @@
+"""
+URL 规范化
+各来源拼接URL的方式不一致（直接拼接 base_url、urljoin、href 原样保存），同一游戏可能以多种写法出现。
+所有登记到抓取队列和保存到目录的页面URL都经过 canonicalize，键和去重都基于规范化后的URL。
+"""
+import hashlib
+import re
+from functools import lru_cache
+from urllib.parse import parse_qsl, quote, urlencode, urljoin, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# 只用于统计来源、不影响页面内容的查询参数（ref 在部分站点是真正的页面参数，不在此列）
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref_src',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+# 路径中保留不转义的字符（RFC 3986 unreserved + sub-delims + ':@/'）
+_PATH_SAFE = "/:@!$&'()*+,;=-._~"
+_MULTIPLE_SLASHES = re.compile(r'/{2,}')
+# 百分号编码（以及后面不是两位十六进制数的孤立 %）
+_PERCENT_ESCAPE = re.compile(r'%([0-9A-Fa-f]{2})?')
+_UNRESERVED = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+
+
+def resolve(url, base=None):
+    """把相对地址（/path、path、//host/path）按 base 补全为绝对地址，不做其它改写"""
+    url = (url or '').strip()
+    if not base:
+        return url
+    return urljoin(base, url)
+
+
+def _is_tracking(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _normalize_escape(match):
+    """unreserved 字符的编码还原为字符，其余编码（如 %2F）保留并统一为大写，孤立的 % 编码为 %25"""
+    if match.group(1) is None:
+        return '%25'
+    char = chr(int(match.group(1), 16))
+    return char if char in _UNRESERVED else f"%{match.group(1).upper()}"
+
+
+def _remove_dot_segments(path):
+    segments = []
+    for segment in path.split('/'):
+        if segment == '..':
+            if len(segments) > 1:
+                segments.pop()
+        elif segment != '.':
+            segments.append(segment)
+    return '/'.join(segments)
+
+
+@lru_cache(maxsize=65536)
+def _canonicalize(url):
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower() or 'https'
+    host = (parts.hostname or '').rstrip('.')
+    if ':' in host:  # hostname 去掉了 IPv6 地址的方括号
+        host = f"[{host}]"
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    if parts.username:
+        netloc = f"{parts.username}{':' + parts.password if parts.password else ''}@{netloc}"
+
+    # 统一百分号编码（%7e -> ~，%2f -> %2F，空格 -> %20），合并多余的斜杠，去掉 . 和 .. 以及结尾斜杠
+    # 保留字符的编码不还原：%2F 与 / 指向不同的资源
+    path = quote(_PERCENT_ESCAPE.sub(_normalize_escape, parts.path), safe=_PATH_SAFE + '%')
+    path = _remove_dot_segments(_MULTIPLE_SLASHES.sub('/', path))
+    path = path.rstrip('/') or '/'
+
+    # 去掉跟踪参数，其余参数保持原有顺序和写法
+    query = parts.query
+    params = parse_qsl(query, keep_blank_values=True)
+    if any(_is_tracking(name) for name, _ in params):
+        query = urlencode([(name, value) for name, value in params if not _is_tracking(name)])
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+def canonicalize(url, base=None):
+    """
+    页面URL的规范形式：补全相对地址，scheme/host 小写，去掉默认端口、片段、跟踪参数和结尾斜杠，
+    统一路径的百分号编码。对已经是规范形式的URL不做任何改动，因此不会改变已有记录的键。
+    没有 base 无法补全的相对地址原样返回（去掉首尾空白）。
+    """
+    url = resolve(url, base)
+    if url.startswith('//'):
+        url = 'https:' + url
+    if not url or not urlsplit(url).netloc:
+        return url
+    return _canonicalize(url)
+
+
+def url_hash(url, base=None):
+    """规范化URL的 64 位整数哈希（用于分片和内存中的索引）"""
+    digest = hashlib.blake2b(canonicalize(url, base).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
@@ -1,5 +1,4 @@
 import os
-import json
 import time
 import logging
 from selenium import webdriver
@@ -7,24 +6,19 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from urllib.parse import urljoin
 import requests
-from datetime import datetime
 import urllib3
 import ssl
 
+from gamecollect.archive import ArchiveWriter
+from gamecollect.extractors import parse_gamedistribution
+from gamecollect.logs import set_page, setup_logging
+from gamecollect.storage import upsert_game
+from gamecollect.urls import canonicalize
+
 # 禁用SSL警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('gamedistribution_scraper.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 class GameDistributionScraper:
@@ -33,6 +27,7 @@ class GameDistributionScraper:
         self.driver = None
         self.output_dir = os.path.join("scraped_data", "gamedistribution", "puzzle")
         os.makedirs(self.output_dir, exist_ok=True)
+        self.archive = ArchiveWriter('gamedistribution')
 
     def setup_driver(self):
         """设置Chrome浏览器驱动"""
@@ -114,7 +109,7 @@ class GameDistributionScraper:
             for link in game_links:
                 href = link.get_attribute('href')
                 if href and '/games/' in href and not href.endswith('/games/'):
-                    full_url = urljoin("https://gamedistribution.com", href)
+                    full_url = canonicalize(href, "https://gamedistribution.com")
                     if full_url not in urls:  # 去重
                         urls.append(full_url)
             
@@ -142,62 +137,20 @@ class GameDistributionScraper:
             logger.error(f"滚动加载更多时出错: {str(e)}")
 
     def get_game_data(self, game_url):
-        """获取单个游戏的详细信息"""
+        """获取单个游戏的详细信息：等待页面渲染，写入原始存档后解析"""
         try:
             self.driver.get(game_url)
             time.sleep(2)  # 等待页面加载
 
-            # 获取游戏标题
-            title = self.wait_for_element(By.CSS_SELECTOR, "h1").text
-
-            # 获取游戏描述
-            description = ""
-            desc_element = self.wait_for_element(By.XPATH, "//div[contains(text(), 'DESCRIPTION')]/following-sibling::div")
-            if desc_element:
-                description = desc_element.text
-
-            # 获取游戏说明
-            instructions = ""
-            inst_element = self.wait_for_element(By.XPATH, "//div[contains(text(), 'INSTRUCTIONS')]/following-sibling::div")
-            if inst_element:
-                instructions = inst_element.text
-
-            # 获取嵌入代码
-            iframe_url = ""
-            embed_element = self.wait_for_element(By.XPATH, "//div[contains(text(), 'EMBED')]/following-sibling::div//iframe")
-            if embed_element:
-                iframe_url = embed_element.get_attribute('src')
-
-            # 获取标签
-            tags = []
-            tag_elements = self.driver.find_elements(By.CSS_SELECTOR, "div.Tags div")
-            tags = [tag.text for tag in tag_elements if tag.text]
+            # 等待标题和嵌入代码区域出现
+            self.wait_for_element(By.CSS_SELECTOR, "h1")
+            self.wait_for_element(By.XPATH, "//div[contains(text(), 'EMBED')]/following-sibling::div//iframe")
 
-            # 获取类别
-            categories = []
-            genre_elements = self.driver.find_elements(By.CSS_SELECTOR, "div.Genres div")
-            categories = [genre.text for genre in genre_elements if genre.text]
+            # 保存原始页面，修改解析规则后可用 scripts/reprocess_archive.py 重新生成数据
+            html = self.driver.page_source
+            self.archive.write(game_url, html)
 
-            # 获取预览图片
-            preview_image = ""
-            img_element = self.wait_for_element(By.CSS_SELECTOR, "div.THUMBNAILS img")
-            if img_element:
-                preview_image = img_element.get_attribute('src')
-
-            # 构建游戏数据
-            game_data = {
-                "url": game_url,
-                "title": title,
-                "description": description,
-                "instructions": instructions,
-                "iframe_url": iframe_url,
-                "preview_image": preview_image,
-                "categories": categories,
-                "tags": tags,
-                "scraped_at": datetime.now().isoformat()
-            }
-
-            return game_data
+            return parse_gamedistribution(game_url, html)
         except Exception as e:
             logger.error(f"获取游戏数据时出错 {game_url}: {str(e)}")
             return None
@@ -208,15 +161,9 @@ class GameDistributionScraper:
             if not game_data or not game_data.get('title'):
                 return False
 
-            # 生成文件名
-            filename = f"game_{game_data['title'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            filepath = os.path.join(self.output_dir, filename)
-
-            # 保存JSON文件
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(game_data, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f"保存游戏数据到文件: {filepath}")
+            # 以稳定键保存（重复抓取时更新同一文件）
+            filepath, status = upsert_game(self.output_dir, 'gamedistribution', game_data)
+            logger.info(f"保存游戏数据到文件: {filepath} ({status})")
             return True
         except Exception as e:
             logger.error(f"保存游戏数据时出错: {str(e)}")
@@ -247,6 +194,7 @@ class GameDistributionScraper:
 
             # 爬取每个游戏的数据
             for url in game_urls:
+                set_page(url)
                 try:
                     logger.info(f"正在爬取游戏: {url}")
                     game_data = self.get_game_data(url)
@@ -262,8 +210,10 @@ class GameDistributionScraper:
         finally:
             if self.driver:
                 self.driver.quit()
+            self.archive.close()
             logger.info("爬虫完成")
 
 if __name__ == "__main__":
+    setup_logging('gamedistribution')
     scraper = GameDistributionScraper()
     scraper.run() 
\ No newline at end of file
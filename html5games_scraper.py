@@ -1,32 +1,28 @@
 import os
-import json
 import time
 from datetime import datetime
-import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from urllib.parse import urljoin
 import logging
 import traceback
-import requests
-from bs4 import BeautifulSoup
 import random # Added for random delay
-from playwright.sync_api import sync_playwright
 
-# Set up logging
-logging.basicConfig(
-    filename='html5games_scraper.log',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    encoding='utf-8',  # 使用UTF-8编码
-    filemode='a'  # 追加模式
-)
+from gamecollect.archive import ArchiveWriter
+from gamecollect.extractors import parse_html5games
+from gamecollect.logs import set_page, setup_logging as setup_structured_logging
+from gamecollect.storage import find_game_file, upsert_game
+from gamecollect.taxonomy import category_dir_name
+from gamecollect.urls import canonicalize
 
 logger = logging.getLogger(__name__)  # 创建 logger 实例
 
-logger.info("\n" + "="*50 + "\n开始运行 html5games.com 爬虫\n" + "="*50)
+
+def setup_logging():
+    """配置日志（只在直接运行时调用；被 gamecollect.crawl 导入时不改动全局日志配置）"""
+    setup_structured_logging('html5games')
+
 
 # Categories to scrape with their URL slugs
 CATEGORIES = {
@@ -38,9 +34,11 @@ CATEGORIES = {
     'Jump & Run': 'Jump-Run'  # 注意：URL中可能使用连字符
 }
 
-# Create output directory if it doesn't exist
+# 输出目录（WebGameScraper 初始化时创建）
 OUTPUT_DIR = 'scraped_data/html5games'
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+# 原始页面存档（首次写入时才创建文件）
+archive = ArchiveWriter('html5games')
 
 class WebGameScraper:
     def __init__(self):
@@ -48,7 +46,8 @@ class WebGameScraper:
         self.base_dir = 'scraped_data/html5games'
         os.makedirs(self.base_dir, exist_ok=True)
         
-        # 初始化Playwright
+        # 初始化Playwright（浏览器相关的依赖只在真正抓取时导入）
+        from playwright.sync_api import sync_playwright
         self.playwright = sync_playwright().start()
         self.browser = self.playwright.chromium.launch(
             headless=False,  # 显示浏览器窗口以便调试
@@ -86,18 +85,12 @@ class WebGameScraper:
             category = game_data.get('categories', ['uncategorized'])[0]
             
             # 创建分类目录
-            category_dir = os.path.join(self.base_dir, category.lower().replace(' & ', '_').replace(' ', '_'))
+            category_dir = os.path.join(self.base_dir, category_dir_name(category))
             os.makedirs(category_dir, exist_ok=True)
             
-            # 生成文件名
-            safe_title = "".join(c for c in game_data['title'] if c.isalnum() or c in (' ', '-', '_')).strip()
-            filename = f"game_{safe_title}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            filepath = os.path.join(category_dir, filename)
-            
-            # 保存数据
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(game_data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Saved game data to: {filepath}")
+            # 以稳定键保存（重复抓取时更新同一文件）
+            filepath, status = upsert_game(category_dir, 'html5games', game_data)
+            logger.info(f"Saved game data to: {filepath} ({status})")
             return True
             
         except Exception as e:
@@ -117,6 +110,8 @@ class WebGameScraper:
 
 def setup_driver(headless=True):
     """Set up and return the undetected ChromeDriver."""
+    import undetected_chromedriver as uc
+
     try:
         # 设置Chrome选项
         options = uc.ChromeOptions()
@@ -226,114 +221,27 @@ def get_game_data(driver, game_url, category, retry_with_visible=True):
             if ready_state != "complete":
                 time.sleep(5)  # 增加等待时间
             
-            # 获取游戏标题
-            title = None
-            for selector in ['.game-title', '.game-name', 'h1', '.title']:
+            # 等待嵌入代码和预览图区域渲染（找不到也继续，由解析结果决定是否重试）
+            for selector in ('div.textarea-autogrow', 'figure[style*="width: 180px"]'):
                 try:
-                    element = WebDriverWait(current_driver, 5).until(
+                    WebDriverWait(current_driver, 10).until(
                         EC.presence_of_element_located((By.CSS_SELECTOR, selector))
                     )
-                    if element and element.is_displayed():
-                        title = element.text.strip()
-                        if title:
-                            logger.info(f"找到游戏标题: {title}")
-                            break
-                except:
-                    continue
+                except TimeoutException:
+                    logger.warning(f"等待 {selector} 超时")
             
-            if not title:
-                logger.warning("未找到游戏标题")
-                if retry_count < max_retries - 1:
-                    retry_count += 1
-                    time.sleep(5)  # 等待5秒后重试
-                    continue
+            # 保存原始页面，修改解析规则后可用 scripts/reprocess_archive.py 重新生成数据
+            html = current_driver.page_source
+            archive.write(game_url, html, meta={'category': category})
             
-            # 获取游戏描述
-            description = ""
-            for selector in ['.game-description', '.description', '.game-info p', 'meta[name="description"]']:
-                try:
-                    element = current_driver.find_element(By.CSS_SELECTOR, selector)
-                    if selector == 'meta[name="description"]':
-                        description = element.get_attribute('content').strip()
-                    else:
-                        description = element.text.strip()
-                    if description:
-                        logger.info("找到游戏描述")
-                        break
-                except:
-                    continue
-            
-            # 获取游戏链接
-            iframe_url = ""
-            try:
-                # 等待textarea-autogrow区域加载
-                autogrow_div = WebDriverWait(current_driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'div.textarea-autogrow'))
-                )
-                
-                # 尝试不同方式获取链接
-                try:
-                    textarea = autogrow_div.find_element(By.CSS_SELECTOR, 'textarea.aff-iliate-link')
-                    iframe_url = textarea.get_attribute('value') or textarea.text
-                except:
-                    try:
-                        shadow_div = autogrow_div.find_element(By.CSS_SELECTOR, 'div.shadow')
-                        iframe_url = shadow_div.text
-                    except:
-                        pass
-                
-                if iframe_url:
-                    logger.info(f"找到游戏iframe链接: {iframe_url}")
-                else:
-                    logger.warning("未找到游戏链接")
-                    
-            except Exception as e:
-                logger.error(f"获取游戏iframe链接时出错: {str(e)}")
-            
-            # 获取游戏预览图片
-            preview_image = ""
-            try:
-                # 等待图片区域加载
-                WebDriverWait(current_driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'figure[style*="width: 180px"]'))
-                )
-                
-                # 查找180px宽度的figure中的img
-                figures = current_driver.find_elements(By.CSS_SELECTOR, 'figure[style*="width: 180px"]')
-                for figure in figures:
-                    try:
-                        img = figure.find_element(By.TAG_NAME, 'img')
-                        preview_image = img.get_attribute('src')
-                        if preview_image:
-                            logger.info(f"找到游戏预览图片: {preview_image}")
-                            break
-                    except:
-                        continue
-                
-                # 如果没找到180px的图片，尝试其他尺寸
-                if not preview_image:
-                    figures = current_driver.find_elements(By.CSS_SELECTOR, 'figure img')
-                    if figures:
-                        preview_image = figures[0].get_attribute('src')
-                        if preview_image:
-                            logger.info(f"找到备选预览图片: {preview_image}")
-                
-            except Exception as e:
-                logger.error(f"获取游戏预览图片时出错: {str(e)}")
+            game_data = parse_html5games(game_url, html, category)
             
             # 如果获取到了必要的数据，返回结果
-            if title or iframe_url:
-                # 创建游戏数据
-                game_data = {
-                    'title': title,
-                    'description': description,
-                    'iframe_url': iframe_url,
-                    'preview_image': preview_image,  # 添加预览图片字段
-                    'categories': [category],  # 保持与现有JSON一致，使用复数形式
-                    'url': game_url,
-                    'scraped_at': datetime.now().isoformat()
-                }
-                
+            if game_data and game_data['title']:
+                logger.info(f"找到游戏: {game_data['title']} (iframe: {game_data['iframe_url'] or '无'})")
+                return game_data
+            logger.warning("未找到游戏标题")
+            if retry_count == max_retries - 1:
                 return game_data
             
             # 如果数据不完整且还有重试机会，继续重试
@@ -389,8 +297,6 @@ def get_game_links(driver, url):
                 if not href:
                     # 如果href为空，尝试获取相对路径
                     href = element.get_attribute('pathname')
-                    if href:
-                        href = base_url + href
                 
                 if href:
                     # 获取游戏名称用于日志
@@ -400,9 +306,8 @@ def get_game_links(driver, url):
                     except:
                         game_name = "未知游戏"
                     
-                    # 确保链接是完整的URL
-                    if href.startswith('/'):
-                        href = base_url + href
+                    # 补全相对路径并规范化，避免同一游戏以不同写法重复出现
+                    href = canonicalize(href, base_url)
                     
                     game_urls.add(href)
                     logger.info(f"找到游戏链接: [{game_name}] -> {href}")
@@ -585,6 +490,7 @@ def scrape_category(driver, category, category_slug):
 
 def main():
     """主函数"""
+    logger.info("\n" + "="*50 + "\n开始运行 html5games.com 爬虫\n" + "="*50)
     try:
         # 初始化 ChromeDriver
         driver = setup_driver(headless=True)
@@ -609,6 +515,7 @@ def main():
                 
                 # 处理每个游戏链接
                 for link in game_links:
+                    set_page(link)
                     try:
                         # 检查是否已经处理过该游戏
                         if is_game_processed(link, category_name):
@@ -640,19 +547,12 @@ def main():
 def is_game_processed(game_url, category):
     """检查游戏是否已经处理过"""
     try:
-        category_dir = os.path.join(OUTPUT_DIR, category.lower().replace(' & ', '_').replace(' ', '_'))
+        category_dir = os.path.join(OUTPUT_DIR, category_dir_name(category))
         if not os.path.exists(category_dir):
             return False
             
-        # 获取所有已处理的游戏文件
-        processed_files = os.listdir(category_dir)
-        for file in processed_files:
-            if file.endswith('.json'):
-                with open(os.path.join(category_dir, file), 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if data.get('url') == game_url:
-                        return True
-        return False
+        # 文件名包含URL哈希，直接按键查找，无需逐个读取JSON
+        return find_game_file(category_dir, 'html5games', game_url) is not None
     except Exception as e:
         logger.error(f"检查游戏处理状态时出错: {str(e)}")
         return False
@@ -663,4 +563,5 @@ def mark_game_processed(game_url, category):
     pass
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    setup_logging()
+    main()
@@ -0,0 +1,35 @@
+import { categoryId } from '@/lib/taxonomy'
+
+// 分类分页分片（scripts/build_category_index.py 生成到 public/shards），与 gamecollect/shards.py 保持一致
+export const SHARDS_MANIFEST_URL = '/shards/manifest.json'
+export const ALL_GAMES = 'all'
+
+export interface ShardCard {
+  source: string
+  id: string
+  title: string
+  image: string
+}
+
+export interface ShardPage {
+  path: string
+  sha256: string
+  count: number
+}
+
+export interface ShardManifest {
+  page_size: number
+  categories: { [name: string]: { count: number; pages: ShardPage[] } }
+}
+
+// 分类名 -> 分片名（规范分类 id，"All games" 对应 all）
+export function shardListName(categoryName: string): string {
+  if (categoryName === 'All games') {
+    return ALL_GAMES
+  }
+  return categoryId(categoryName)
+}
+
+export function gameHref(card: { source: string; id: string }): string {
+  return `/game/${encodeURIComponent(card.source)}/${encodeURIComponent(card.id)}`
+}
@@ -4,6 +4,10 @@ interface Game {
   title: string
   description: string
   preview_image: string
+  preview?: {
+    blurhash: string
+    thumbnails: { width: number; height: number; format: string; path: string }[]
+  }
   categories: string[]
   url: string
   iframe_url: string
@@ -0,0 +1,49 @@
+import taxonomy from '@/data/taxonomy.json'
+
+// 规范分类体系，与 Python 端 gamecollect/taxonomy.py 共用 data/taxonomy.json
+export interface TaxonomyCategory {
+  id: string
+  name: string
+  icon: string
+  aliases: string[]
+}
+
+// 别名匹配键：只保留小写字母和数字，与 gamecollect.taxonomy.alias_key 保持一致
+function aliasKey(name: string): string {
+  return name.toLowerCase().replace(/[^a-z0-9]/g, '')
+}
+
+const aliasIndex = new Map<string, TaxonomyCategory>()
+for (const category of taxonomy.categories as TaxonomyCategory[]) {
+  for (const name of [category.id, category.name, ...category.aliases]) {
+    aliasIndex.set(aliasKey(name), category)
+  }
+}
+
+export function resolveCategory(name: string): TaxonomyCategory | undefined {
+  return aliasIndex.get(aliasKey(name))
+}
+
+// 与 gamecollect.keys.slugify 保持一致
+export function slugify(text: string, maxLength = 60): string {
+  const ascii = text.normalize('NFKD').replace(/[^\x00-\x7f]/g, '')
+  const slug = ascii.replace(/[^a-zA-Z0-9]+/g, '-').replace(/^-+|-+$/g, '').toLowerCase()
+  return slug.slice(0, maxLength).replace(/-+$/, '') || 'game'
+}
+
+// 分类名 -> 规范分类 id；未收录的分类与 Taxonomy.resolve 一样使用其 slug
+export function categoryId(name: string): string {
+  return resolveCategory(name)?.id ?? slugify(name)
+}
+
+export function canonicalCategoryName(name: string): string {
+  return resolveCategory(name)?.name ?? name
+}
+
+// 记录的规范分类：入库时已预计算（有 category_ids）的直接使用，旧记录按分类体系解析
+export function recordCategories(record: { categories?: string[]; category_ids?: string[] }): string[] {
+  if (record.category_ids) {
+    return record.categories || []
+  }
+  return Array.from(new Set((record.categories || []).map(canonicalCategoryName)))
+}
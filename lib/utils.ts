@@ -4,3 +4,32 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
 }
+
+interface PreviewThumbnail {
+  width: number
+  height: number
+  format: string
+  path: string
+}
+
+// 被 scripts/check_preview_images.py 标记为失效或占位的预览图不再显示
+const UNUSABLE_PREVIEW_STATUSES = ['broken', 'invalid', 'placeholder']
+
+// 嵌入检查（scripts/check_embeds.py）判定为无法加载或禁止嵌入的游戏不在网站上展示
+const HIDDEN_EMBED_STATUSES = ['dead', 'blocked']
+
+export function isEmbeddable(game: { embed_status?: string }): boolean {
+  return !game.embed_status || !HIDDEN_EMBED_STATUSES.includes(game.embed_status)
+}
+
+// 优先使用本地镜像的缩略图（scripts/process_images.py 生成），没有时退回远程预览图
+export function thumbnailSrc(
+  game: { preview_image?: string; preview_status?: string; preview?: { thumbnails?: PreviewThumbnail[] } },
+  width = 360,
+): string | undefined {
+  if (game.preview_status && UNUSABLE_PREVIEW_STATUSES.includes(game.preview_status)) {
+    return undefined
+  }
+  const thumbnail = game.preview?.thumbnails?.find(t => t.format === 'webp' && t.path.endsWith(`-${width}.webp`))
+  return thumbnail?.path || game.preview_image
+}
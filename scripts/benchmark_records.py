@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.corpus import iter_files
+from gamecollect.records import decode, encode, orjson
+
+
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对比普通字典与 GameRecord 在整个语料上的内存占用和编解码耗时')
+    parser.add_argument('--repeat', type=int, default=5, help='每项计时重复的次数（取最快一次）')
+    args = parser.parse_args()
+
+    files = list(iter_files())
+    blobs = []
+    for corpus_file in files:
+        with open(corpus_file.path, 'rb') as f:
+            blobs.append((corpus_file.source, f.read()))
+    if not blobs:
+        print("No records found")
+        return
+    print(f"{len(blobs)} records, {sum(len(b) for _, b in blobs) / 1e6:.1f} MB of JSON "
+          f"(orjson {'available' if orjson is not None else 'not installed'})")
+
+    dict_size, dicts = measure_memory(lambda: [json.loads(blob) for _, blob in blobs])
+    record_size, records = measure_memory(lambda: [decode(blob, source) for source, blob in blobs])
+    print(f"memory: dict {dict_size / len(blobs):.0f} B/record, GameRecord {record_size / len(blobs):.0f} B/record")
+
+    results = [
+        ('decode', timed(lambda: [json.loads(blob) for _, blob in blobs], args.repeat),
+         timed(lambda: [decode(blob, source) for source, blob in blobs], args.repeat)),
+        ('encode', timed(lambda: [json.dumps(d, ensure_ascii=False, indent=2).encode('utf-8') for d in dicts], args.repeat),
+         timed(lambda: [encode(r, indent=True) for r in records], args.repeat)),
+    ]
+    for name, baseline, typed in results:
+        print(f"{name}: json+dict {baseline * 1000:.1f} ms, GameRecord {typed * 1000:.1f} ms")
+    print(f"validate: {timed(lambda: [r.validate() for r in records], args.repeat) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
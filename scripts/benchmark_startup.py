@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动时不允许导入的重量级依赖（只应在需要它们的子命令中导入）
+HEAVY_MODULES = (
+    'undetected_chromedriver', 'selenium', 'playwright', 'requests', 'httpx', 'bs4',
+    'PIL', 'pyarrow', 'brotli',
+)
+
+# 被测的启动路径：CLI 帮助，以及数据任务共用的库模块
+TARGETS = {
+    'cli --help': ['-m', 'gamecollect', '--help'],
+    'import cli': ['-c', 'import gamecollect.cli'],
+    'import records': ['-c', 'import gamecollect.records'],
+}
+
+
+def imported_modules(args):
+    """用 -X importtime 列出一次启动导入的所有模块"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=PROJECT_ROOT,
+                            capture_output=True, text=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            modules.add(line.rsplit('|', 1)[1].strip())
+    return modules
+
+
+def wall_time(args, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=PROJECT_ROOT, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查命令行启动耗时，以及启动时是否导入了重量级依赖')
+    parser.add_argument('--repeat', type=int, default=10, help='每个启动路径运行的次数（取中位数）')
+    parser.add_argument('--budget-ms', type=float, default=150.0, help='启动耗时上限（毫秒，含解释器启动）')
+    args = parser.parse_args()
+
+    baseline = wall_time(['-c', 'pass'], args.repeat)
+    print(f"{'python -c pass':<16}{baseline * 1000:8.1f} ms")
+    failures = []
+    for name, target in TARGETS.items():
+        elapsed = wall_time(target, args.repeat)
+        heavy = sorted(m for m in imported_modules(target) if m.split('.')[0] in HEAVY_MODULES or m in HEAVY_MODULES)
+        print(f"{name:<16}{elapsed * 1000:8.1f} ms  (+{(elapsed - baseline) * 1000:.1f} ms)"
+              + (f"  heavy imports: {', '.join(heavy)}" if heavy else ''))
+        if elapsed * 1000 > args.budget_ms:
+            failures.append(f"{name} took {elapsed * 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        if heavy:
+            failures.append(f"{name} imports {', '.join(heavy)}")
+
+    if failures:
+        print("\nStartup regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nStartup OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.facets import INDEX_FILE, FacetIndex, build_index, load_index, save_index
+from gamecollect.shards import MANIFEST_FILE, PAGE_SIZE, build_shards, load_manifest, remove_stale, save_manifest
+
+
+def parse_query(text):
+    """解析形如 "category:Puzzle AND tag:2-player" 的查询（不带前缀时视为分类）"""
+    categories, tags = [], []
+    for term in text.split(' AND '):
+        term = term.strip()
+        if term.startswith('tag:'):
+            tags.append(term[len('tag:'):])
+        elif term:
+            categories.append(term[len('category:'):] if term.startswith('category:') else term)
+    return categories, tags
+
+
+def main():
+    parser = argparse.ArgumentParser(description='构建分类/标签倒排索引并支持交集查询')
+    parser.add_argument('--query', help='查询已构建的索引，例如 "Puzzle AND tag:2-player"')
+    parser.add_argument('--workers', type=int, default=None, help='并行进程数')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='每个分类分片的游戏数')
+    parser.add_argument('--no-shards', action='store_true', help='不生成网站使用的分类分页分片')
+    args = parser.parse_args()
+
+    if args.query:
+        index = load_index()
+        categories, tags = parse_query(args.query)
+        games = index.query(categories, tags)
+        for game in games:
+            print(f"{game['source']}/{game['id']}: {game['title']}")
+        print(f"\nTotal: {len(games)}")
+        return
+
+    index = build_index(workers=args.workers)
+    save_index(index)
+    print(f"Indexed {len(index['games'])} games, {len(index['category'])} categories, {len(index['tag'])} tags")
+    print(f"Index written to: {INDEX_FILE}")
+
+    if args.no_shards:
+        return
+    previous = load_manifest()
+    manifest = build_shards(FacetIndex(index), page_size=args.page_size)
+    save_manifest(manifest)
+    # 保留上一版的分片，已经打开的页面使用的旧 manifest 仍然有效
+    removed = remove_stale(manifest, previous)
+    pages = sum(len(entry['pages']) for entry in manifest['categories'].values())
+    print(f"Wrote {pages} shards for {len(manifest['categories'])} lists ({removed} stale files removed)")
+    print(f"Manifest written to: {MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import argparse
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.facets import INDEX_FILE, load_index
+from gamecollect.popularity import (EVENTS_DIR, HALF_LIFE_HOURS, POPULAR_FILE, STATE_FILE, PopularityTracker,
+                                    build_popular, save_popular)
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='增量汇总游玩/点击事件，生成全站和各分类的热门游戏列表')
+    parser.add_argument('--events', default=EVENTS_DIR, help='事件日志目录')
+    parser.add_argument('--half-life-hours', type=float, default=HALF_LIFE_HOURS, help='热度衰减的半衰期（小时）')
+    parser.add_argument('--limit', type=int, default=24, help='每个列表的游戏数')
+    parser.add_argument('--rebuild', action='store_true', help='忽略已保存的统计状态，从全部日志重新计算')
+    args = parser.parse_args()
+
+    if not os.path.exists(INDEX_FILE):
+        logger.error(f"Category index not found, run scripts/build_category_index.py first: {INDEX_FILE}")
+        return
+
+    start = time.perf_counter()
+    if args.rebuild:
+        tracker = PopularityTracker(args.half_life_hours)
+    else:
+        tracker = PopularityTracker.load(STATE_FILE, args.half_life_hours)
+    ingested = tracker.ingest(args.events)
+    tracker.save(STATE_FILE)
+    logger.info(f"Ingested {ingested} new events ({tracker.events} total, "
+                f"{len(tracker.candidates)} candidates) in {time.perf_counter() - start:.1f}s")
+
+    popular = build_popular(tracker, load_index().games, args.limit)
+    save_popular(popular)
+    logger.info(f"Wrote {len(popular['all'])} popular games and {len(popular['categories'])} category lists "
+                f"to {POPULAR_FILE}")
+
+
+if __name__ == "__main__":
+    main()
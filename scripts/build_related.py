@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.related import MAX_DRIFT, RELATED_STATE, collect_documents, load_state, save_state, update_related, write_related
+
+
+def main():
+    parser = argparse.ArgumentParser(description='计算每个游戏的相关游戏并写入记录（只重新计算内容变化的游戏）')
+    parser.add_argument('-k', '--neighbors', type=int, default=12, help='每个游戏保留的相关游戏数')
+    parser.add_argument('--full', action='store_true', help='忽略上次的结果，全部重新计算')
+    parser.add_argument('--max-drift', type=float, default=MAX_DRIFT,
+                        help='上次全量构建以来变化的游戏超过该比例时全量重建（更新 IDF）')
+    parser.add_argument('--dry-run', action='store_true', help='只计算，不写入记录和状态文件')
+    parser.add_argument('--workers', type=int, default=None, help='读取语料的并行进程数')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    docs = collect_documents(workers=args.workers)
+    state, stats = update_related(load_state(), docs, k=args.neighbors, full=args.full,
+                                  max_drift=args.max_drift)
+    print(f"Computed related games for {len(docs)} games in {time.perf_counter() - start:.2f}s: {stats}")
+    if args.dry_run:
+        return
+
+    written = write_related(docs, state)
+    save_state(state)
+    print(f"Updated {written} record files, state written to: {RELATED_STATE}")
+
+
+if __name__ == "__main__":
+    main()
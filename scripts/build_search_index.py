@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.search import SEARCH_DB, build_index, connect, search
+
+
+def main():
+    parser = argparse.ArgumentParser(description='增量构建全文搜索索引（每次抓取后运行）并支持查询')
+    parser.add_argument('--query', help='查询已构建的索引')
+    parser.add_argument('-k', '--limit', type=int, default=10, help='返回结果数')
+    parser.add_argument('--workers', type=int, default=None, help='并行进程数')
+    args = parser.parse_args()
+
+    if args.query:
+        conn = connect()
+        start = time.perf_counter()
+        results = search(conn, args.query, limit=args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for result in results:
+            print(f"{result['score']:8.3f}  {result['source']}/{result['id']}: {result['title']}")
+        print(f"\n{len(results)} results in {elapsed:.1f} ms")
+        return
+
+    start = time.perf_counter()
+    stats = build_index(workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"Search index updated in {elapsed:.2f}s: {stats}")
+    print(f"Index written to: {SEARCH_DB}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import os
+import sys
+import asyncio
+import argparse
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.catalog_service import CatalogService
+from gamecollect.facets import INDEX_FILE
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='目录查询服务：内存索引 + 分页/字段投影/ETag，索引更新后自动重新加载')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--index', default=INDEX_FILE, help='分类索引文件（scripts/build_category_index.py 生成）')
+    parser.add_argument('--reload-interval', type=float, default=2.0, help='检查索引文件是否更新的间隔（秒）')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.index):
+        logger.error(f"Category index not found, run scripts/build_category_index.py first: {args.index}")
+        return
+    service = CatalogService(args.index, args.reload_interval)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
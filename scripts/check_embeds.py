@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import asyncio
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.corpus import iter_records, load_json
+from gamecollect.embed_check import EmbedChecker
+from gamecollect.storage import write_json_atomic
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def is_stale(record, max_age):
+    checked_at = record.get('embed_checked_at')
+    if not checked_at:
+        return True
+    try:
+        return datetime.now() - datetime.fromisoformat(checked_at) > max_age
+    except ValueError:
+        return True
+
+
+def run_once(args):
+    """检查所有过期（或从未检查过）的 iframe_url，并把结果写回记录"""
+    max_age = timedelta(hours=args.max_age_hours)
+    pending = {}
+    for corpus_file, record in iter_records():
+        url = record.get('iframe_url')
+        if url and url.startswith(('http://', 'https://')) and is_stale(record, max_age):
+            pending.setdefault(url, []).append(corpus_file.path)
+    if not pending:
+        logger.info("All embeds are fresh")
+        return
+
+    logger.info(f"Checking {len(pending)} embed URLs")
+    start = time.perf_counter()
+    checker = EmbedChecker(concurrency=args.concurrency, per_host=args.per_host, timeout=args.timeout)
+    results = asyncio.run(checker.run(list(pending)))
+    elapsed = time.perf_counter() - start
+
+    counts = {}
+    for url, result in results.items():
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+        for path in pending[url]:
+            # 重新读取，避免覆盖检查期间其他工具写入的字段
+            record = load_json(path)
+            record['embed_status'] = result['status']
+            record['embed_checked_at'] = result['checked_at']
+            record['embed_detail'] = {k: v for k, v in result.items() if k not in ('status', 'checked_at') and v is not None}
+            write_json_atomic(path, record)
+    logger.info(f"Checked {len(results)} embeds in {elapsed:.1f}s: {counts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='并发检查游戏 iframe_url 是否可加载、可嵌入')
+    parser.add_argument('--max-age-hours', type=float, default=24, help='超过该时间的检查结果视为过期')
+    parser.add_argument('--concurrency', type=int, default=200, help='总并发连接数')
+    parser.add_argument('--per-host', type=int, default=16, help='单个主机的并发连接数')
+    parser.add_argument('--timeout', type=float, default=15.0, help='单个请求超时（秒）')
+    parser.add_argument('--interval-minutes', type=float, default=None, help='按该间隔持续运行，定期重新检查过期记录')
+    args = parser.parse_args()
+
+    while True:
+        run_once(args)
+        if not args.interval_minutes:
+            break
+        time.sleep(args.interval_minutes * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import sys
+import asyncio
+import argparse
+import logging
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.corpus import iter_records, load_json
+from gamecollect.image_check import (
+    HASH_INDEX_FILE, REPORT_FILE, build_tree, check_images, find_duplicates, load_hash_index,
+)
+from gamecollect.paths import route_source
+from gamecollect.storage import write_json_atomic
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def record_key(corpus_file, record):
+    game_id = record.get('id') or os.path.basename(corpus_file.path)[:-len('.json')]
+    return f"{route_source(corpus_file.rel_dir)}/{game_id}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='增量检查预览图：失效链接、占位图和近似重复图片')
+    parser.add_argument('--concurrency', type=int, default=16, help='同时检查的图片数')
+    parser.add_argument('--recheck', action='store_true', help='重新检查所有记录，而不仅是新增/变化的')
+    args = parser.parse_args()
+
+    index = load_hash_index()
+    files, titles, pending = {}, {}, {}
+    for corpus_file, record in iter_records():
+        url = record.get('preview_image') or record.get('image_url')
+        if not url or not url.startswith(('http://', 'https://')):
+            continue
+        key = record_key(corpus_file, record)
+        files.setdefault(key, []).append(corpus_file.path)
+        titles[key] = record.get('title') or record.get('name') or ''
+        if args.recheck or index.get(key, {}).get('url') != url:
+            pending[key] = (url, record.get('preview'))
+
+    # 语料中已删除的记录同步移出索引
+    for key in set(index) - set(files):
+        del index[key]
+
+    logger.info(f"Checking {len(pending)} new or changed preview images ({len(files)} total)")
+    if pending:
+        index.update(asyncio.run(check_images(pending, concurrency=args.concurrency)))
+
+    groups, shared_placeholders = find_duplicates(index, build_tree(index), list(pending), titles)
+    for key in shared_placeholders:
+        if index[key]['status'] == 'ok':
+            index[key]['status'] = 'placeholder'
+            index[key]['shared'] = True
+    write_json_atomic(HASH_INDEX_FILE, index)
+
+    # 把检查状态写回记录，网站据此对失效图片使用占位图
+    updated = 0
+    for key in pending.keys() | shared_placeholders:
+        status = index[key]['status']
+        for path in files.get(key, []):
+            corpus_record = load_json(path)
+            if corpus_record.get('preview_status') != status:
+                corpus_record['preview_status'] = status
+                write_json_atomic(path, corpus_record)
+                updated += 1
+
+    problems = {status: sorted(k for k in pending.keys() | shared_placeholders if index[k]['status'] == status)
+                for status in ('broken', 'invalid', 'placeholder')}
+    report = {
+        'checked_at': datetime.now().isoformat(),
+        'checked': len(pending),
+        'total': len(files),
+        **problems,
+        'near_duplicates': groups,
+    }
+    write_json_atomic(REPORT_FILE, report)
+    logger.info(
+        f"broken={len(problems['broken'])} invalid={len(problems['invalid'])} "
+        f"placeholder={len(problems['placeholder'])} duplicate_groups={len(groups)}; "
+        f"updated {updated} records. Report: {REPORT_FILE}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import queue
+import argparse
+import logging
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.crawl import ADAPTERS, CATEGORY_REQUIRED_SOURCES, Shard, in_bucket, run_shard, shard_name, source_categories
+from gamecollect.crawl_state import CRAWL_STATE_DB, CrawlState
+from gamecollect.logs import setup_logging, stop_logging
+from gamecollect.sitemaps import SITEMAP_SOURCES, discover
+
+LOG_FORMAT = '%(asctime)s - %(processName)s - %(levelname)s - %(message)s'
+
+logger = logging.getLogger(__name__)
+
+
+def plan_shards(sources, shard_by, buckets):
+    """按来源、分类或URL哈希把抓取任务切分成分片"""
+    shards = []
+    for source in sources:
+        categories = source_categories(source)
+        if categories and (shard_by == 'category' or source in CATEGORY_REQUIRED_SOURCES):
+            # 需要分类的来源先按分类切分，按哈希分片时再在每个分类内切分
+            category_buckets = buckets if shard_by == 'hash' else 1
+            shards += [Shard(source, category, bucket, category_buckets)
+                       for category in categories for bucket in range(category_buckets)]
+        elif shard_by == 'hash':
+            shards += [Shard(source, None, bucket, buckets) for bucket in range(buckets)]
+        else:
+            shards.append(Shard(source, None, 0, 1))
+    return shards
+
+
+def discover_from_sitemaps(shards, state_path, sitemaps=None):
+    """
+    用 sitemap 为各分片登记页面（只有几次 XML 请求，不需要浏览器）
+    新出现或 lastmod 有更新的页面才会排队；返回按分片统计的排队数量
+    """
+    state = CrawlState(state_path)
+    queued = {}
+    for source in dict.fromkeys(shard.source for shard in shards):
+        completed = []
+        entries = discover(source, state, sitemaps, completed=completed)
+        for shard in (s for s in shards if s.source == source):
+            name = shard_name(shard)
+            shard_entries = [(entry.url, entry.lastmod) for entry in entries if in_bucket(shard, entry.url)]
+            queued[name] = state.add_entries(source, name, shard_entries)
+            logger.info(f"[{name}] {len(shard_entries)} pages in sitemaps, {queued[name]} new or changed")
+        # 页面都登记之后才记下子 sitemap 的 lastmod，中途崩溃时下次会重新读取
+        for sitemap in completed:
+            state.set_sitemap_lastmod(sitemap.url, sitemap.lastmod)
+    state.close()
+    return queued
+
+
+def worker_main(shard, state_path, results, discover=True, crawl_id=None, console_level=None):
+    """工作进程：独立的日志文件（沿用主进程的抓取 id）和浏览器，结果通过队列交回"""
+    setup_logging(f"crawl-{shard_name(shard)}", console_level=console_level, console_format=LOG_FORMAT,
+                  crawl_id=crawl_id)
+    try:
+        results.put((shard_name(shard), run_shard(shard, state_path, discover)))
+    finally:
+        # 工作进程退出时不执行 atexit，需要主动写出队列中的日志
+        stop_logging()
+
+
+def supervise(shards, workers, max_restarts, state_path, discover=True, crawl_id=None, console_level=None):
+    """运行所有分片，同时最多 workers 个进程；异常退出的进程释放其页面后重启"""
+    results = multiprocessing.Queue()
+    state = CrawlState(state_path)
+    pending = list(shards)
+    running = {}
+    restarts = {shard_name(shard): 0 for shard in shards}
+    stats = {}
+
+    while pending or running:
+        while pending and len(running) < workers:
+            shard = pending.pop(0)
+            name = shard_name(shard)
+            process = multiprocessing.Process(target=worker_main, name=name,
+                                              args=(shard, state_path, results, discover, crawl_id, console_level))
+            process.start()
+            running[name] = (process, shard)
+            logger.info(f"Started worker {name} (pid {process.pid})")
+
+        try:
+            name, shard_stats = results.get(timeout=1)
+            stats[name] = shard_stats
+        except queue.Empty:
+            pass
+
+        for name, (process, shard) in list(running.items()):
+            if process.is_alive():
+                continue
+            process.join()
+            del running[name]
+            if process.exitcode == 0:
+                continue
+            released = state.release(name)
+            if restarts[name] < max_restarts:
+                restarts[name] += 1
+                logger.warning(f"Worker {name} exited with code {process.exitcode}, "
+                               f"requeued {released} pages, restarting ({restarts[name]}/{max_restarts})")
+                pending.append(shard)
+            else:
+                logger.error(f"Worker {name} exited with code {process.exitcode}, giving up")
+
+    # 收集最后退出的进程的结果
+    while True:
+        try:
+            name, shard_stats = results.get(timeout=0.5)
+            stats[name] = shard_stats
+        except queue.Empty:
+            break
+    state.close()
+    return stats, restarts
+
+
+def print_summary(started, stats, restarts, state_path):
+    state = CrawlState(state_path)
+    print(f"\n抓取完成，用时 {time.time() - started:.1f}s")
+    print(f"{'shard':<36}{'discovered':>12}{'done':>8}{'failed':>8}{'restarts':>10}")
+    for name in sorted(restarts):
+        shard_stats = stats.get(name, {})
+        print(f"{name:<36}{shard_stats.get('discovered', '-'):>12}{shard_stats.get('done', '-'):>8}"
+              f"{shard_stats.get('failed', '-'):>8}{restarts[name]:>10}")
+    print("\n本次运行的页面状态:")
+    for source, counts in sorted(state.summary(since=started).items()):
+        print(f"  {source}: " + ', '.join(f"{status}={count}" for status, count in sorted(counts.items())))
+    failures = state.failures(since=started)
+    if failures:
+        print("\n最近的失败页面:")
+        for url, attempts, error in failures:
+            print(f"  {url} (attempts={attempts}): {error}")
+    state.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多进程分片抓取：每个工作进程拥有自己的浏览器，共享抓取状态库')
+    parser.add_argument('--sources', nargs='+', choices=sorted(ADAPTERS), default=sorted(ADAPTERS))
+    parser.add_argument('--shard-by', choices=('source', 'category', 'hash'), default='category',
+                        help='分片方式；category 对没有分类列表的来源退化为按来源，html5games 总是先按分类切分')
+    parser.add_argument('--buckets', type=int, default=os.cpu_count() or 1, help='按URL哈希分片时每个来源的分片数')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='同时运行的工作进程数')
+    parser.add_argument('--max-restarts', type=int, default=2, help='每个分片崩溃后的最大重启次数')
+    parser.add_argument('--refresh', action='store_true', help='重新抓取已完成的页面')
+    parser.add_argument('--state', default=CRAWL_STATE_DB, help='抓取状态库路径')
+    parser.add_argument('--discovery', choices=('listing', 'sitemap'), default='listing',
+                        help='URL发现方式：listing 用浏览器扫描列表页，sitemap 读取 robots.txt/sitemap')
+    parser.add_argument('--sitemap', action='append', help='指定 sitemap 的URL或本地文件（代替 robots.txt，可重复）')
+    parser.add_argument('--discover-only', action='store_true', help='只做 sitemap 发现并登记页面，不启动工作进程')
+    parser.add_argument('--pause', nargs='*', metavar='HOST', help='暂停这些主机（不指定主机则暂停整个抓取）后退出')
+    parser.add_argument('--resume', nargs='*', metavar='HOST', help='恢复这些主机（不指定主机则恢复整个抓取）后退出')
+    parser.add_argument('--quiet', action='store_true', help='控制台只显示 WARNING 及以上（完整日志见 logs/*.jsonl）')
+    args = parser.parse_args()
+    console_level = 'WARNING' if args.quiet else None
+    crawl_id = setup_logging('crawl-supervisor', console_level=console_level, console_format=LOG_FORMAT)
+
+    if args.pause is not None or args.resume is not None:
+        # 暂停/恢复对正在运行的工作进程立即生效：它们在下一次领取页面时检查
+        state = CrawlState(args.state)
+        if args.pause is not None:
+            state.pause(args.pause)
+        if args.resume is not None:
+            state.resume(args.resume)
+        logger.info(f"Paused hosts: {', '.join(state.paused_hosts()) or 'none'}")
+        state.close()
+        return
+
+    started = time.time()
+    state = CrawlState(args.state)
+    # 上次运行被中断时留在 running 状态的页面重新排队
+    released = state.release_orphaned()
+    if released:
+        logger.warning(f"Requeued {released} pages left running by an interrupted crawl")
+    if args.refresh:
+        for source in args.sources:
+            state.reset(source)
+    state.close()
+
+    use_sitemaps = args.discovery == 'sitemap' or args.discover_only
+    if use_sitemaps:
+        unsupported = [source for source in args.sources if source not in SITEMAP_SOURCES]
+        if unsupported:
+            parser.error(f"sitemap discovery is not configured for: {', '.join(unsupported)}")
+        # sitemap 中的页面没有分类信息：按分类分片时退化为按来源，必须有分类的来源跳过
+        skipped = [source for source in args.sources if source in CATEGORY_REQUIRED_SOURCES]
+        if skipped:
+            logger.warning(f"Sitemap pages carry no category, skipping {', '.join(skipped)} (use --discovery listing)")
+        sources = [source for source in args.sources if source not in CATEGORY_REQUIRED_SOURCES]
+        shard_by = 'source' if args.shard_by == 'category' else args.shard_by
+        shards = plan_shards(sources, shard_by, args.buckets)
+        discover_from_sitemaps(shards, args.state, args.sitemap)
+        if args.discover_only:
+            return
+    else:
+        shards = plan_shards(args.sources, args.shard_by, args.buckets)
+
+    logger.info(f"Running {len(shards)} shards with {args.workers} workers (crawl {crawl_id})")
+    stats, restarts = supervise(shards, args.workers, args.max_restarts, args.state, discover=not use_sitemaps,
+                                crawl_id=crawl_id, console_level=console_level)
+    print_summary(started, stats, restarts, args.state)
+
+
+if __name__ == "__main__":
+    main()
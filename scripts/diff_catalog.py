@@ -0,0 +1,62 @@
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.catalog_diff import (DIFFS_DIR, SNAPSHOTS_DIR, SORT_CHUNK_LINES, corpus_lines, diff_streams,
+                                      iter_keyed, latest_snapshot, new_snapshot_path, snapshot_lines,
+                                      write_report, write_snapshot)
+from gamecollect.paths import SCRAPED_DATA_DIR
+from gamecollect.storage import write_json_atomic
+
+
+def open_lines(path, args):
+    """快照文件直接读取；目录（scraped_data 结构）先外部排序"""
+    if os.path.isdir(path):
+        return corpus_lines(path, workers=args.workers, chunk_lines=args.chunk_lines)
+    return snapshot_lines(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比较两次抓取之间的目录（按稳定键归并），输出新增/删除/字段变化报告')
+    parser.add_argument('old', nargs='?', help='旧快照（.jsonl.gz）或语料目录，默认最近一次保存的快照')
+    parser.add_argument('new', nargs='?', help='新快照或语料目录，默认当前的 scraped_data')
+    parser.add_argument('--output', help='报告路径（JSON Lines），默认 catalog/diffs/<时间>.jsonl')
+    parser.add_argument('--snapshot-only', action='store_true', help='只保存当前语料的快照，不做比较')
+    parser.add_argument('--no-save', action='store_true', help='比较当前语料后不保存为新快照')
+    parser.add_argument('--chunk-lines', type=int, default=SORT_CHUNK_LINES, help='外部排序时每个内存块的行数')
+    parser.add_argument('--workers', type=int, default=None, help='读取语料的并行进程数')
+    args = parser.parse_args()
+
+    new = args.new or SCRAPED_DATA_DIR
+    if args.snapshot_only:
+        path = new_snapshot_path()
+        count = write_snapshot(corpus_lines(new, workers=args.workers, chunk_lines=args.chunk_lines), path)
+        print(f"Saved snapshot of {count} records to {path}")
+        return
+
+    old = args.old or latest_snapshot()
+    if old is None:
+        print(f"No previous snapshot in {SNAPSHOTS_DIR}, run with --snapshot-only first")
+        return
+
+    # 当前语料先保存为新快照，下一次运行以它为基准
+    if not args.no_save and os.path.isdir(new) and args.new is None:
+        path = new_snapshot_path()
+        count = write_snapshot(open_lines(new, args), path)
+        print(f"Saved snapshot of {count} records to {path}")
+        new = path
+
+    output = args.output or os.path.join(DIFFS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+    changes = diff_streams(iter_keyed(open_lines(old, args)), iter_keyed(open_lines(new, args)))
+    summary = write_report(changes, output)
+    summary.update({'old': old, 'new': new, 'report': output})
+    write_json_atomic(os.path.splitext(output)[0] + '.summary.json', summary)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
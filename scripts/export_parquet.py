@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect import columnar
+from gamecollect.columnar import (PARQUET_DIR, REPORT_COLUMNS, collect_rows, coverage_report, export_parquet, load_table,
+                                  multi_category_report, staleness_report)
+
+REPORTS = ('coverage', 'staleness', 'multi')
+
+
+def print_coverage(table):
+    print(f"{'source':<18}{'category':<22}{'games':>7}{'iframe':>9}{'preview':>9}")
+    for row in coverage_report(table):
+        print(f"{row['source']:<18}{row['category']:<22}{row['games']:>7}{row['iframe']:>9.1%}{row['preview']:>9.1%}")
+
+
+def print_staleness(table):
+    for source, counts in staleness_report(table).items():
+        print(f"{source}: " + ', '.join(f"{bucket} {count}" for bucket, count in counts.items()))
+
+
+def print_multi(table):
+    report = multi_category_report(table)
+    print("games by number of categories: " +
+          ', '.join(f"{count} -> {games}" for count, games in report['distribution'].items()))
+    for source, share in sorted(report['share_by_source'].items()):
+        print(f"  {source}: {share:.1%} in more than one category")
+    for example in report['examples']:
+        print(f"  {example['source']}/{example['id']}: {', '.join(example['category_ids'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把目录导出为按来源/分类分区的 Parquet，并运行内置统计报表')
+    parser.add_argument('--output', default=PARQUET_DIR, help='Parquet 数据集目录')
+    parser.add_argument('--workers', type=int, default=None, help='并行进程数')
+    parser.add_argument('--report', choices=REPORTS + ('all',), action='append',
+                        help='导出后运行的报表（可重复指定）')
+    parser.add_argument('--report-only', action='store_true', help='不重新导出，直接对已有数据集运行报表')
+    args = parser.parse_args()
+
+    if columnar.pa is None:
+        print("pyarrow is not installed: pip install pyarrow")
+        return
+
+    if not args.report_only:
+        start = time.perf_counter()
+        rows = collect_rows(workers=args.workers)
+        export_parquet(rows, args.output)
+        print(f"Exported {len(rows)} games to {args.output} in {time.perf_counter() - start:.1f}s")
+
+    reports = REPORTS if not args.report or 'all' in args.report else args.report
+    start = time.perf_counter()
+    table = load_table(args.output, REPORT_COLUMNS)
+    for name in reports:
+        print(f"\n== {name} ==")
+        {'coverage': print_coverage, 'staleness': print_staleness, 'multi': print_multi}[name](table)
+    print(f"\nReports computed in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
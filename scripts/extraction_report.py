@@ -0,0 +1,50 @@
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.head_meta import format_head_stats
+from gamecollect.specs import SPECS_FILE, STATS_FILE, load_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='查看各站点解析规则的命中率，找出从未命中的规则')
+    parser.add_argument('--stats', default=STATS_FILE, help='命中统计文件（由 scripts/reprocess_archive.py 生成）')
+    parser.add_argument('--site', help='只显示某个站点')
+    args = parser.parse_args()
+
+    stats = load_stats(args.stats)
+    if not stats:
+        print(f"没有命中统计，请先运行 scripts/reprocess_archive.py ({args.stats})")
+        return
+    with open(SPECS_FILE, 'r', encoding='utf-8') as f:
+        specs = json.load(f)
+
+    dead = []
+    for site, site_spec in specs['sites'].items():
+        if (args.site and site != args.site) or site not in stats:
+            continue
+        print(f"\n== {site} ==")
+        print(format_head_stats(stats, site))
+        for field, candidates in site_spec['fields'].items():
+            counts = stats[site].get(field, {})
+            pages = counts.get('pages', 0)
+            if not pages:
+                continue
+            print(f"{field}: {pages} pages, miss {counts.get('miss', 0) / pages:.1%}")
+            for index, rule in enumerate(candidates):
+                hits = counts.get(str(index), 0)
+                print(f"  [{index}] {hits / pages:6.1%}  {json.dumps(rule, ensure_ascii=False)}")
+                if not hits:
+                    dead.append((site, field, index))
+
+    if dead:
+        print("\n从未命中的规则（可以考虑删除）:")
+        for site, field, index in dead:
+            print(f"  {site}.{field}[{index}]")
+
+
+if __name__ == "__main__":
+    main()
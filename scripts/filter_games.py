@@ -1,40 +1,27 @@
 import os
-import json
+import sys
 from datetime import datetime
 
 # 获取脚本的绝对路径
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
-SCRAPED_DATA_DIR = os.path.join(PROJECT_ROOT, 'scraped_data')
+sys.path.insert(0, PROJECT_ROOT)
+
+from gamecollect.facets import INDEX_FILE, FacetIndex, build_index, load_index
+
 OUTPUT_FILE = os.path.join(PROJECT_ROOT, f'multi_category_games_{datetime.now().strftime("%Y%m%d_%H%M%S")}.txt')
 
+
 def filter_games():
-    # 只获取scraped_data根目录下的json文件
-    json_files = [f for f in os.listdir(SCRAPED_DATA_DIR) 
-                 if f.endswith('.json') and os.path.isfile(os.path.join(SCRAPED_DATA_DIR, f))]
-    
-    multi_category_games = []
+    # 优先使用预先构建的分类索引，没有时再从语料构建
+    if os.path.exists(INDEX_FILE):
+        index = load_index()
+    else:
+        print(f"Index {INDEX_FILE} not found, building it from scraped_data")
+        index = FacetIndex(build_index())
     
-    for json_file in json_files:
-        file_path = os.path.join(SCRAPED_DATA_DIR, json_file)
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                game_data = json.load(f)
-                
-            # 获取categories并排除"2-player"
-            categories = [cat for cat in game_data.get('categories', []) if cat != '2-player']
-                
-            # 检查剩余categories是否有2个或更多元素
-            if len(categories) >= 2:
-                multi_category_games.append({
-                    'filename': json_file,
-                    'title': game_data.get('title', 'Unknown'),
-                    'categories': categories,
-                    'tags': game_data.get('tags', [])
-                })
-        except Exception as e:
-            print(f"Error processing {json_file}: {str(e)}")
-            continue
+    # 获取categories（排除"2-player"）有2个或更多元素的游戏
+    multi_category_games = index.multi_category_games(exclude=('2-player',))
     
     # 将结果写入文件
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
@@ -42,9 +29,10 @@ def filter_games():
         f.write("=" * 80 + "\n\n")
         
         for game in multi_category_games:
-            f.write(f"Filename: {game['filename']}\n")
+            categories = [name for cat_id, name in zip(game['category_ids'], game['categories']) if cat_id != '2-player']
+            f.write(f"Game: {game['source']}/{game['id']}\n")
             f.write(f"Title: {game['title']}\n")
-            f.write(f"Categories: {', '.join(game['categories'])}\n")
+            f.write(f"Categories: {', '.join(categories)}\n")
             f.write(f"Tags: {', '.join(game['tags'])}\n")
             f.write("-" * 80 + "\n\n")
         
@@ -54,4 +42,4 @@ def filter_games():
     print(f"Results have been written to: {OUTPUT_FILE}")
 
 if __name__ == "__main__":
-    filter_games() 
\ No newline at end of file
+    filter_games() 
@@ -1,5 +1,4 @@
 import os
-import json
 from bs4 import BeautifulSoup
 from datetime import datetime
 import logging
@@ -11,23 +10,28 @@ from playwright.sync_api import sync_playwright
 # 获取脚本的绝对路径
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PROJECT_ROOT)
+
+from gamecollect.archive import ArchiveWriter
+from gamecollect.extractors import parse_onlinegames
+from gamecollect.head_meta import extract_head, format_head_stats, record_head_stats
+from gamecollect.logs import set_page, setup_logging as setup_structured_logging
+from gamecollect.storage import upsert_game
+from gamecollect.urls import canonicalize
 
-# 设置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(PROJECT_ROOT, 'scraper.log'), encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)  # 使用 stdout 而不是默认的 stderr
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# 设置控制台输出编码
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout.reconfigure(encoding='utf-8')
-if sys.stderr.encoding != 'utf-8':
-    sys.stderr.reconfigure(encoding='utf-8')
+
+def setup_logging():
+    """配置日志和控制台编码（只在直接运行时调用；被 gamecollect.crawl 导入时不改动全局配置）"""
+    setup_structured_logging('onlinegames')
+
+    # 设置控制台输出编码
+    if sys.stdout.encoding != 'utf-8':
+        sys.stdout.reconfigure(encoding='utf-8')
+    if sys.stderr.encoding != 'utf-8':
+        sys.stderr.reconfigure(encoding='utf-8')
+
 
 class GameScraper:
     def __init__(self):
@@ -41,10 +45,14 @@ class GameScraper:
             viewport={'width': 1920, 'height': 1080},
             user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         )
+        self.archive = ArchiveWriter('onlinegames')
+        self.head_stats = {}
         
     def __del__(self):
         """清理资源"""
         try:
+            if hasattr(self, 'archive'):
+                self.archive.close()
             if hasattr(self, 'context'):
                 self.context.close()
             if hasattr(self, 'browser'):
@@ -154,7 +162,7 @@ class GameScraper:
                     if link:
                         href = link.get('href', '')
                         # 构建完整URL
-                        full_url = href if href.startswith('http') else f"https://www.onlinegames.io{href}"
+                        full_url = canonicalize(href, "https://www.onlinegames.io")
                         if full_url not in game_links:
                             game_links.append(full_url)
                             # 获取游戏标题用于日志
@@ -179,251 +187,21 @@ class GameScraper:
             return []
 
     def scrape_game_details(self, url):
-        """抓取游戏详情"""
+        """抓取游戏详情：渲染页面、写入原始存档，再离线解析"""
         try:
             logger.info(f"Scraping game details from {url}")
             
-            # 获取页面内容
+            # 分类推断、标签和 html_content 都需要渲染后的完整页面，不使用只读头部的抓取方式
+            # （头部字段在 parse_onlinegames 中用于补全缺少的字段）
             html = self.get_page_content(url, wait_for_selector='iframe#gameFrame')
             if not html:
                 return None
             
-            # 保存 HTML 以便调试
-            debug_file = os.path.join(PROJECT_ROOT, f'debug_game_{datetime.now().strftime("%Y%m%d_%H%M%S")}.html')
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(html)
-            logger.info(f"Saved game page HTML to {debug_file}")
-            
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # 获取游戏信息
-            game_data = {
-                'url': url,
-                'title': '',
-                'description': '',
-                'iframe_url': '',
-                'preview_image': '',
-                'categories': [],
-                'tags': [],
-                'html_content': html,  # 保存完整HTML以供后续分析
-                'scraped_at': datetime.now().isoformat()
-            }
-            
-            # 获取标题
-            for title_selector in ['h1', '.game-title', 'title']:
-                try:
-                    title = soup.select_one(title_selector)
-                    if title:
-                        game_data['title'] = title.text.strip()
-                        logger.info(f"Found title: {game_data['title']}")
-                        break
-                except Exception as e:
-                    logger.error(f"Error getting title with selector {title_selector}: {str(e)}")
-                    continue
-            
-            # 获取描述
-            for desc_selector in ['.game-description', 'meta[name="description"]', 'p']:
-                try:
-                    description = soup.select_one(desc_selector)
-                    if description:
-                        content = description.get('content', '') or description.text
-                        if content:
-                            game_data['description'] = content.strip()
-                            logger.info(f"Found description: {game_data['description'][:100]}...")
-                            break
-                except Exception as e:
-                    logger.error(f"Error getting description with selector {desc_selector}: {str(e)}")
-                    continue
-            
-            # 获取 iframe URL
-            try:
-                iframe = soup.find('iframe', id='gameFrame')
-                if iframe:
-                    src = iframe.get('src', '')
-                    if src:
-                        game_data['iframe_url'] = src if src.startswith('http') else f"https://www.onlinegames.io{src}"
-                        logger.info(f"Found iframe URL: {game_data['iframe_url']}")
-                else:
-                    logger.warning("No iframe with id='gameFrame' found")
-            except Exception as e:
-                logger.error(f"Error extracting iframe URL: {str(e)}")
-            
-            # 获取预览图片
-            try:
-                for img_selector in ['.game-image img', '.game-preview img', 'meta[property="og:image"]']:
-                    img = soup.select_one(img_selector)
-                    if img:
-                        src = img.get('content', '') or img.get('src', '')
-                        if src:
-                            game_data['preview_image'] = src if src.startswith('http') else f"https://www.onlinegames.io{src}"
-                            logger.info(f"Found preview image: {game_data['preview_image']}")
-                            break
-            except Exception as e:
-                logger.error(f"Error getting preview image: {str(e)}")
-            
-            # 获取分类和标签
-            try:
-                # 1. 获取侧边栏的所有游戏分类名称（作为有效分类列表）
-                valid_categories = set()
-                sidebar = soup.find('ul', class_='navbar__menu')
-                if sidebar:
-                    for link in sidebar.find_all('a', href=True):
-                        href = link.get('href', '')
-                        if '/t/' in href:
-                            category_name = link.text.strip()
-                            if category_name and category_name != '2-player':  # 排除2-player作为分类
-                                valid_categories.add(category_name.lower())  # 转为小写以便后续匹配
-                logger.info(f"Found valid categories from sidebar: {valid_categories}")
-
-                # 2. 获取游戏页面的分类（从"Home>"后面的文本）
-                breadcrumb_category = None
-                breadcrumb = soup.find('ol', class_='breadcrumb')
-                if breadcrumb:
-                    items = breadcrumb.find_all('li')
-                    if len(items) > 1:  # 确保有"Home"之后的项目
-                        last_item = items[-1].find('a')
-                        if last_item:
-                            category = last_item.text.strip()
-                            if category != '2-player':  # 排除2-player
-                                breadcrumb_category = category
-                logger.info(f"Found breadcrumb category: {breadcrumb_category}")
-
-                # 3. 从游戏描述中提取分类信息
-                description_texts = []
-                final_categories = []
-                
-                # 3.1 首先检查面包屑分类
-                if breadcrumb_category:
-                    bc_lower = breadcrumb_category.lower()
-                    if bc_lower in valid_categories:
-                        final_categories.append(breadcrumb_category)
-                        logger.info(f"Found category from breadcrumb: {breadcrumb_category}")
-                
-                # 3.2 如果面包屑分类不匹配，则统计文本出现频率
-                if not final_categories:
-                    # 收集所有相关文本
-                    for desc_selector in ['.game-description', 'meta[name="description"]', 'p', '.game-info', '.game-controls']:
-                        elements = soup.select(desc_selector)
-                        for desc in elements:
-                            text = desc.get('content', '') or desc.text
-                            if text:
-                                description_texts.append(text.lower())
-                    
-                    # 获取其他相关文本
-                    for section_text in ["More Games Like This", "Game Description", "How to Play", "Controls"]:
-                        section = soup.find(string=lambda text: text and section_text in text)
-                        if section:
-                            parent = section.parent
-                            if parent:
-                                text = parent.get_text().lower()
-                                description_texts.append(text)
-                    
-                    # 获取Embed URL
-                    iframe = soup.find('iframe', id='gameFrame')
-                    if iframe:
-                        src = iframe.get('src', '').lower()
-                        if src:
-                            description_texts.append(src)
-                    
-                    # 统计每个有效分类在文本中的出现次数
-                    category_counts = {}
-                    for category in valid_categories:
-                        count = 0
-                        category_lower = category.lower()
-                        
-                        for text in description_texts:
-                            # 处理特殊分类
-                            if category_lower == 'fps':
-                                count += text.count('first person shooter')
-                                count += text.count('fps')
-                            elif category_lower == 'strategy':
-                                count += text.count('strategic')
-                                count += text.count('strategy')
-                            elif category_lower == 'racing':
-                                count += text.count('race')
-                                count += text.count('racing')
-                                count += text.count('drift')
-                            else:
-                                count += text.count(category_lower)
-                            
-                            # 在URL中出现的分类给予更高权重
-                            if text.startswith('http'):
-                                if category_lower in text:
-                                    count += 3  # URL中出现给予额外权重
-                        
-                        # 检查"Other ** Games"部分
-                        other_games_pattern = f"Other {category.title()} Games"
-                        if soup.find(string=lambda text: text and other_games_pattern in text):
-                            count += 5  # 给予额外权重
-                        
-                        if count > 0:
-                            category_counts[category] = count
-                    
-                    # 如果找到了出现次数最多的分类
-                    if category_counts:
-                        # 按出现次数降序排序
-                        sorted_categories = sorted(category_counts.items(), key=lambda x: x[1], reverse=True)
-                        top_category = sorted_categories[0][0]
-                        # 使用有效分类列表中的原始大小写形式
-                        original_case = next(c for c in sidebar.find_all('a', href=True) 
-                                          if c.text.strip().lower() == top_category)
-                        final_categories.append(original_case.text.strip())
-                        logger.info(f"Found category from text frequency: {original_case.text.strip()} (count: {sorted_categories[0][1]})")
-                
-                # 3.3 如果前两种方法都没找到分类，检查分类链接
-                if not final_categories:
-                    for link in soup.find_all('a', href=True):
-                        href = link.get('href', '').lower()
-                        if '/t/' in href:
-                            # 从URL中提取分类名
-                            category = href.split('/t/')[-1].strip('/').replace('-', ' ')
-                            if category and category != '2-player' and category in valid_categories:
-                                # 使用有效分类列表中的原始大小写形式
-                                original_case = next(c for c in sidebar.find_all('a', href=True) 
-                                                  if c.text.strip().lower() == category)
-                                category_name = original_case.text.strip()
-                                if category_name not in final_categories:
-                                    final_categories.append(category_name)
-                                    logger.info(f"Found category from links: {category_name}")
-                                    break  # 找到一个匹配的分类就停止
-                
-                game_data['categories'] = final_categories
-                logger.info(f"Final categories: {final_categories}")
-
-                # 5. 获取游戏标签（从post__tags-share区域）
-                tags = []
-                tags_div = soup.find('div', class_='post__tags-share')
-                if tags_div:
-                    tag_list = tags_div.find('ul', class_='post__tag')
-                    if tag_list:
-                        for tag_item in tag_list.find_all('li'):
-                            tag_link = tag_item.find('a')
-                            if tag_link:
-                                tag_text = tag_link.text.strip()
-                                if tag_text:
-                                    tags.append(tag_text)
-                
-                # 如果游戏支持2个玩家，将"2-player"添加到标签中
-                if '2-player' not in tags:
-                    two_player_found = False
-                    # 检查面包屑
-                    if breadcrumb and '2-player' in [li.text.strip() for li in breadcrumb.find_all('li')]:
-                        two_player_found = True
-                    # 检查描述中的链接
-                    if not two_player_found:
-                        for link in soup.find_all('a', href=True):
-                            if '2-player' in link.text.strip():
-                                two_player_found = True
-                                break
-                    if two_player_found:
-                        tags.append('2-player')
-                
-                game_data['tags'] = tags
-                logger.info(f"Found tags: {tags}")
-
-            except Exception as e:
-                logger.error(f"Error getting categories and tags: {str(e)}")
+            # 保存原始页面，修改解析规则后可用 scripts/reprocess_archive.py 重新生成数据
+            self.archive.write(url, html)
+            record_head_stats(self.head_stats, 'onlinegames', extract_head(html))
             
+            game_data = parse_onlinegames(url, html)
             logger.info(f"Successfully scraped game: {game_data['title']}")
             return game_data
         except Exception as e:
@@ -435,18 +213,10 @@ class GameScraper:
             return
             
         try:
-            # 创建输出目录
+            # 以稳定键保存（重复抓取时更新同一文件）
             output_dir = os.path.join(PROJECT_ROOT, 'scraped_data')
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 保存游戏数据
-            filename = f"game_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            filepath = os.path.join(output_dir, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(game_data, f, ensure_ascii=False, indent=2)
-                
-            logger.info(f"Saved game data to {filepath}")
+            filepath, status = upsert_game(output_dir, 'onlinegames', game_data)
+            logger.info(f"Saved game data to {filepath} ({status})")
         except Exception as e:
             logger.error(f"Error saving game data: {str(e)}")
 
@@ -531,6 +301,7 @@ def main():
         
         # 抓取每个游戏的详细信息
         for link in game_links:
+            set_page(link)
             try:
                 game_data = scraper.scrape_game_details(link)
                 if game_data and game_data['iframe_url']:  # 只保存有 iframe URL 的游戏
@@ -540,9 +311,12 @@ def main():
             except Exception as e:
                 logger.error(f"Error processing game {link}: {str(e)}")
                 continue
+        
+        logger.info(format_head_stats(scraper.head_stats, 'onlinegames'))
             
     except Exception as e:
         logger.error(f"Main process error: {str(e)}")
         
 if __name__ == "__main__":
+    setup_logging()
     main() 
\ No newline at end of file
@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.facets import load_index
+
+# 查询组合：按分类、来源、标签、关键词，带分页和字段投影
+FIELD_SETS = ('', 'id,source,title,thumbnail', 'id,title')
+
+
+def build_queries(count, seed=0):
+    """根据现有索引生成有代表性的查询"""
+    index = load_index()
+    rng = random.Random(seed)
+    categories = list(index.facet_counts('category'))
+    tags = list(index.facet_counts('tag'))
+    sources = sorted({game['source'] for game in index.games})
+    words = [w for game in index.games for w in game['title'].lower().split() if len(w) > 2]
+    queries = []
+    for _ in range(count):
+        params = {}
+        kind = rng.random()
+        if kind < 0.5 and categories:
+            params['category'] = rng.choice(categories)
+        elif kind < 0.65 and sources:
+            params['source'] = rng.choice(sources)
+        elif kind < 0.8 and tags:
+            params['tag'] = rng.choice(tags)
+        elif words:
+            params['q'] = rng.choice(words)[:rng.randint(3, 6)]
+        params['page'] = rng.choice((1, 1, 1, 2, 3))
+        fields = rng.choice(FIELD_SETS)
+        if fields:
+            params['fields'] = fields
+        queries.append('/games?' + urlencode(params))
+    return queries
+
+
+async def worker(host, port, queries, deadline, latencies, etags, conditional):
+    """一个 keep-alive 连接，循环发送请求直到截止时间"""
+    reader, writer = await asyncio.open_connection(host, port)
+    errors = 0
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            target = queries[i % len(queries)]
+            i += 1
+            request = f"GET {target} HTTP/1.1\r\nHost: {host}\r\n"
+            if conditional and target in etags:
+                request += f"If-None-Match: {etags[target]}\r\n"
+            start = time.perf_counter()
+            writer.write((request + "\r\n").encode('latin-1'))
+            head = await reader.readuntil(b'\r\n\r\n')
+            headers = {}
+            for line in head.decode('latin-1').split('\r\n')[1:]:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            await reader.readexactly(int(headers.get('content-length', 0)))
+            latencies.append(time.perf_counter() - start)
+            status = int(head.split(b' ', 2)[1])
+            if status == 200 and 'etag' in headers:
+                etags[target] = headers['etag']
+            elif status not in (200, 304):
+                errors += 1
+    finally:
+        writer.close()
+    return errors
+
+
+async def run(args):
+    queries = build_queries(args.queries)
+    deadline = time.perf_counter() + args.duration
+    latencies, etags = [], {}
+    started = time.perf_counter()
+    errors = await asyncio.gather(*(
+        worker(args.host, args.port, queries[n::args.connections] or queries, deadline, latencies, etags, args.conditional)
+        for n in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+    print(f"{len(latencies)} requests in {elapsed:.1f}s over {args.connections} connections: "
+          f"{len(latencies) / elapsed:.0f} req/s, {sum(errors)} errors")
+    print(f"latency p50 {percentile(0.5):.2f} ms, p95 {percentile(0.95):.2f} ms, p99 {percentile(0.99):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对目录查询服务（scripts/catalog_service.py）做压力测试')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--connections', type=int, default=32, help='并发的 keep-alive 连接数')
+    parser.add_argument('--duration', type=float, default=10.0, help='测试时长（秒）')
+    parser.add_argument('--queries', type=int, default=500, help='生成的不同查询数')
+    parser.add_argument('--conditional', action='store_true', help='重复的查询带上 If-None-Match（模拟有缓存的客户端）')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import json
+import argparse
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.keys import game_key
+from gamecollect.paths import SCRAPED_DATA_DIR, source_for_dir
+from gamecollect.storage import write_json_atomic
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def load_records(directory):
+    """读取目录下（不递归）的所有JSON记录"""
+    records = []
+    for filename in sorted(os.listdir(directory)):
+        filepath = os.path.join(directory, filename)
+        if not filename.endswith('.json') or not os.path.isfile(filepath):
+            continue
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                records.append((filepath, json.load(f)))
+        except Exception as e:
+            logger.error(f"Error reading {filepath}: {str(e)}")
+    return records
+
+
+def merge_duplicates(group):
+    """同一键的多个历史文件合并为一条：保留最新抓取的内容，记录最早发现时间"""
+    group = sorted(group, key=lambda item: item[1].get('scraped_at') or '')
+    record = dict(group[-1][1])
+    seen_times = [data.get('first_seen_at') or data.get('scraped_at') for _, data in group]
+    seen_times = [t for t in seen_times if t]
+    if seen_times:
+        record['first_seen_at'] = min(seen_times)
+    return record
+
+
+def migrate_directory(directory, source, dry_run):
+    """把一个目录中的时间戳文件名迁移为稳定键文件名，并合并重复记录"""
+    # 按键的哈希部分分组：标题变化过的同一游戏（slug 不同）也合并为一条，文件名取最新抓取的标题
+    groups = {}
+    for filepath, data in load_records(directory):
+        groups.setdefault(game_key(source, data).rsplit('-', 1)[1], []).append((filepath, data))
+
+    stats = {'files': 0, 'records': len(groups), 'removed': 0}
+    for group in groups.values():
+        stats['files'] += len(group)
+        record = merge_duplicates(group)
+        key = game_key(source, record)
+        target = os.path.join(directory, f"{key}.json")
+        record['id'] = key
+        stale = [path for path, _ in group if os.path.abspath(path) != os.path.abspath(target)]
+        if len(group) > 1:
+            logger.info(f"{os.path.relpath(target, SCRAPED_DATA_DIR)} <- {len(group)} file(s)")
+        if dry_run:
+            stats['removed'] += len(stale)
+            continue
+        write_json_atomic(target, record)
+        for path in stale:
+            os.remove(path)
+            stats['removed'] += 1
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='迁移 scraped_data 到稳定键文件名并合并重复记录')
+    parser.add_argument('--dry-run', action='store_true', help='只打印迁移计划，不修改文件')
+    args = parser.parse_args()
+
+    totals = {'files': 0, 'records': 0, 'removed': 0}
+    for directory, _, filenames in os.walk(SCRAPED_DATA_DIR):
+        if not any(name.endswith('.json') for name in filenames):
+            continue
+        source = source_for_dir(os.path.relpath(directory, SCRAPED_DATA_DIR))
+        stats = migrate_directory(directory, source, args.dry_run)
+        for name in totals:
+            totals[name] += stats[name]
+
+    action = 'Would remove' if args.dry_run else 'Removed'
+    logger.info(f"Scanned {totals['files']} files, {totals['records']} unique records. {action} {totals['removed']} stale/duplicate files.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import os
+import sys
+import argparse
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.corpus import map_records
+from gamecollect.storage import write_json_atomic
+from gamecollect.taxonomy import apply_taxonomy
+
+
+def normalize_file(corpus_file, record, dry_run=False):
+    """对单个记录文件应用分类体系，内容有变化时写回（在进程池中执行）"""
+    before = (record.get('categories'), record.get('category_ids'), record.get('category_icons'))
+    apply_taxonomy(record)
+    if before == (record['categories'], record['category_ids'], record['category_icons']):
+        return False
+    if not dry_run:
+        write_json_atomic(corpus_file.path, record)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按 data/taxonomy.json 重新规范化已保存记录的分类')
+    parser.add_argument('--dry-run', action='store_true', help='只统计需要更新的文件数')
+    parser.add_argument('--workers', type=int, default=None, help='并行进程数')
+    args = parser.parse_args()
+
+    results = list(map_records(partial(normalize_file, dry_run=args.dry_run), workers=args.workers))
+    changed = sum(1 for result in results if result)
+    action = 'Would update' if args.dry_run else 'Updated'
+    print(f"{action} {changed} of {len(results)} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import os
-import json
-import shutil
-from datetime import datetime
 import logging
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.corpus import iter_files, map_records
+from gamecollect.storage import upsert_game
+from gamecollect.taxonomy import category_dir_name
 
 # 设置日志
 logging.basicConfig(
@@ -15,19 +19,61 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def organize_file(corpus_file, game_data):
+    """把一个未分类的文件复制到各个分类目录后删除原文件（在进程池中执行）"""
+    json_file = os.path.basename(corpus_file.path)
+    html5games_dir = os.path.dirname(corpus_file.path)
+    try:
+        # 获取分类列表
+        categories = game_data.get('categories', [])
+        if not categories:
+            logger.warning(f"文件 {json_file} 没有categories信息，跳过")
+            return 0
+        
+        # 如果categories不是列表，转换为列表
+        if isinstance(categories, str):
+            categories = [categories]
+        
+        # 为每个分类创建副本
+        copies = 0
+        for category in categories:
+            try:
+                # 创建分类目录
+                category_dir = os.path.join(
+                    html5games_dir, 
+                    category_dir_name(category)
+                )
+                
+                # 更新游戏数据中的category字段
+                game_data_copy = game_data.copy()
+                game_data_copy['category'] = category
+                
+                # 以稳定键保存到新位置（重复整理不会产生新文件）
+                upsert_game(category_dir, 'html5games', game_data_copy)
+                logger.info(f"已复制 {json_file} 到分类 {category}")
+                copies += 1
+                
+            except Exception as e:
+                logger.error(f"处理文件 {json_file} 的分类 {category} 时出错: {str(e)}")
+                continue
+        
+        # 所有分类副本都保存成功后才删除原始文件
+        if copies < len(categories):
+            logger.warning(f"文件 {json_file} 只生成了 {copies}/{len(categories)} 个分类副本，保留原始文件")
+            return copies
+        os.remove(corpus_file.path)
+        logger.info(f"已删除原始文件 {json_file}")
+        return copies
+        
+    except Exception as e:
+        logger.error(f"处理文件 {json_file} 时出错: {str(e)}")
+        return 0
+
+
 def organize_games():
-    # 获取项目根目录
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    html5games_dir = os.path.join(project_root, 'scraped_data', 'html5games')
-    
-    # 确保html5games目录存在
-    if not os.path.exists(html5games_dir):
-        logger.error(f"目录不存在: {html5games_dir}")
-        return
-    
-    # 获取所有json文件
-    json_files = [f for f in os.listdir(html5games_dir) 
-                 if f.endswith('.json') and os.path.isfile(os.path.join(html5games_dir, f))]
+    # 只整理直接放在 html5games 目录下（尚未分类）的json文件
+    json_files = [f for f in iter_files(sources=['html5games']) if f.rel_dir == 'html5games']
     
     if not json_files:
         logger.info("没有找到需要整理的JSON文件")
@@ -35,63 +81,10 @@ def organize_games():
     
     logger.info(f"找到 {len(json_files)} 个JSON文件需要整理")
     
-    # 处理每个文件
-    for json_file in json_files:
-        try:
-            file_path = os.path.join(html5games_dir, json_file)
-            
-            # 读取JSON文件
-            with open(file_path, 'r', encoding='utf-8') as f:
-                game_data = json.load(f)
-            
-            # 获取分类列表
-            categories = game_data.get('categories', [])
-            if not categories:
-                logger.warning(f"文件 {json_file} 没有categories信息，跳过")
-                continue
-            
-            # 如果categories不是列表，转换为列表
-            if isinstance(categories, str):
-                categories = [categories]
-            
-            # 为每个分类创建副本
-            for category in categories:
-                try:
-                    # 创建分类目录
-                    category_dir = os.path.join(
-                        html5games_dir, 
-                        category.lower().replace(' & ', '_').replace(' ', '_')
-                    )
-                    os.makedirs(category_dir, exist_ok=True)
-                    
-                    # 生成新的文件名
-                    title = game_data.get('title', 'untitled')
-                    safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
-                    new_filename = f"game_{safe_title}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                    new_file_path = os.path.join(category_dir, new_filename)
-                    
-                    # 更新游戏数据中的category字段
-                    game_data_copy = game_data.copy()
-                    game_data_copy['category'] = category
-                    
-                    # 保存到新位置
-                    with open(new_file_path, 'w', encoding='utf-8') as f:
-                        json.dump(game_data_copy, f, ensure_ascii=False, indent=2)
-                    logger.info(f"已复制 {json_file} 到分类 {category}")
-                    
-                except Exception as e:
-                    logger.error(f"处理文件 {json_file} 的分类 {category} 时出错: {str(e)}")
-                    continue
-            
-            # 删除原始文件
-            os.remove(file_path)
-            logger.info(f"已删除原始文件 {json_file}")
-            
-        except Exception as e:
-            logger.error(f"处理文件 {json_file} 时出错: {str(e)}")
-            continue
+    # 并行处理每个文件
+    copies = sum(count or 0 for count in map_records(organize_file, files=json_files))
     
-    logger.info("文件整理完成")
+    logger.info(f"文件整理完成，共生成 {copies} 个分类副本")
 
 if __name__ == '__main__':
-    organize_games() 
\ No newline at end of file
+    organize_games() 
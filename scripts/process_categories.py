@@ -1,37 +1,26 @@
 import os
-import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from gamecollect.corpus import map_records
+from gamecollect.taxonomy import canonical_categories, load_taxonomy
+
+
+def record_categories(corpus_file, data):
+    """提取单条记录的规范分类名称（在进程池中执行）"""
+    return canonical_categories(data)[1]
+
+
 def get_all_categories():
-    # 获取项目根目录
-    project_root = Path(__file__).parent.parent
-    scraped_data_dir = project_root / 'scraped_data'
-    
     # 存储所有分类
     categories = set()
     
-    # 遍历所有json文件
-    for subdir in ['1000webgames', 'jopi']:
-        dir_path = scraped_data_dir / subdir
-        if dir_path.exists():
-            for file in dir_path.glob('*.json'):
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if 'categories' in data:
-                            categories.update(data['categories'])
-                except Exception as e:
-                    print(f"Error reading {file}: {e}")
-    
-    # 检查根目录下的json文件
-    for file in scraped_data_dir.glob('*.json'):
-        try:
-            with open(file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if 'categories' in data:
-                    categories.update(data['categories'])
-        except Exception as e:
-            print(f"Error reading {file}: {e}")
+    # 并行遍历所有来源的json文件
+    for file_categories in map_records(record_categories):
+        if file_categories:
+            categories.update(file_categories)
     
     # 转换为列表并排序
     categories_list = sorted(list(categories), key=lambda x: (not x[0].isdigit(), x.lower()))
@@ -46,41 +35,8 @@ def get_category_icon(category):
     根据分类名获取对应的图标
     返回Lucide图标名称（参考：https://lucide.dev/icons/）
     """
-    # 分类名到图标的映射
-    icon_mapping = {
-        # 数字开头的分类
-        "2-player": "users",
-        "3d": "cube",
-        # 字母开头的分类
-        "action": "swords",
-        "adventure": "map",
-        "arcade": "gamepad-2",
-        "board": "layout-grid",
-        "card": "cards",
-        "casual": "dices",
-        "drawing": "pencil",
-        "dress up": "shirt",
-        "fighting": "sword",
-        "fps": "crosshair",
-        "hidden objects": "search",
-        "horror": "skull",
-        "io games": "globe",
-        "logic": "brain",
-        "mahjong": "grid-2x2",
-        "matching": "puzzle",
-        "multiplayer": "users",
-        "puzzle": "puzzle",
-        "racing": "car",
-        "shooting": "target",
-        "simulation": "monitor",
-        "sports": "trophy",
-        "strategy": "chess-knight",
-        "tower defense": "castle",
-        "word": "text",
-    }
-    
-    # 返回对应的图标，如果没有映射则返回默认图标
-    return icon_mapping.get(category.lower(), "gamepad")
+    # 图标统一由 data/taxonomy.json 维护，别名（如 Sport/Sports）解析为同一分类
+    return load_taxonomy().icon(category)
 
 if __name__ == "__main__":
     # 获取所有分类及其序号
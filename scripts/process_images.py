@@ -0,0 +1,60 @@
+import os
+import sys
+import asyncio
+import argparse
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.corpus import iter_records
+from gamecollect.images import ImagePipeline
+from gamecollect.storage import write_json_atomic
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def needs_processing(record, force=False):
+    """预览图未处理过，或原图地址已变化时需要重新处理"""
+    url = record.get('preview_image')
+    if not url or not url.startswith(('http://', 'https://')):
+        return False
+    preview = record.get('preview') or {}
+    return force or preview.get('source_url') != url
+
+
+def main():
+    parser = argparse.ArgumentParser(description='镜像预览图并生成 WebP/AVIF 缩略图和 BlurHash 占位')
+    parser.add_argument('--concurrency', type=int, default=16, help='同时下载的图片数')
+    parser.add_argument('--force', action='store_true', help='重新处理所有预览图')
+    args = parser.parse_args()
+
+    pending = [(f, record) for f, record in iter_records() if needs_processing(record, args.force)]
+    if not pending:
+        logger.info("No preview images need processing")
+        return
+    logger.info(f"Processing preview images for {len(pending)} records")
+
+    pipeline = ImagePipeline(concurrency=args.concurrency)
+    try:
+        previews = asyncio.run(pipeline.run([record['preview_image'] for _, record in pending]))
+    finally:
+        pipeline.close()
+
+    updated = 0
+    for corpus_file, record in pending:
+        preview = previews.get(record['preview_image'])
+        if preview:
+            record['preview'] = preview
+            write_json_atomic(corpus_file.path, record)
+            updated += 1
+    logger.info(f"Updated {updated} records, stats: {pipeline.stats}")
+
+
+if __name__ == "__main__":
+    main()
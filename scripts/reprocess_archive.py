@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.archive import ARCHIVE_DIR, archive_files, read_archive
+from gamecollect.extractors import extract, output_dir_for
+from gamecollect.head_meta import extract_head, record_head_stats
+from gamecollect.keys import game_key
+from gamecollect.specs import default_extractor, merge_stats, save_stats
+from gamecollect.storage import upsert_game
+
+# 设置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+logger = logging.getLogger(__name__)
+
+
+def extract_record(extractor, record, results):
+    """解析一条存档记录，结果追加到 results；解析失败时返回 False"""
+    try:
+        # 统计头部结构化数据对已存档页面的覆盖率
+        if record.kind in ('game', 'head'):
+            record_head_stats(extractor.stats, record.source, extract_head(record.body))
+        for game_data in extract(record):
+            # 使用存档时间，保证同一份存档每次生成的数据完全相同
+            game_data['scraped_at'] = record.fetched_at
+            results.append((record.source, record.fetched_at, game_data))
+        return True
+    except Exception as e:
+        logger.error(f"Error extracting {record.url}: {str(e)}")
+        return False
+
+
+def extract_file(path):
+    """
+    解析一个存档文件中的所有页面（在进程池中执行），同时返回本文件的规则命中统计
+    工作进程崩溃时留下的截断存档只报告错误，已读出的记录照常使用
+    """
+    extractor = default_extractor()
+    extractor.stats = {}
+    results, errors, damaged = [], 0, False
+    try:
+        for record in read_archive(path):
+            if not extract_record(extractor, record, results):
+                errors += 1
+    except Exception as e:
+        damaged = True
+        logger.error(f"Archive {path} is truncated or malformed, keeping the records read so far: {str(e)}")
+    return results, errors, extractor.stats, damaged
+
+
+def main():
+    parser = argparse.ArgumentParser(description='从原始页面存档离线重新生成 scraped_data（不访问网络）')
+    parser.add_argument('--archive', default=ARCHIVE_DIR, help='存档目录')
+    parser.add_argument('--sources', nargs='+', help='只处理这些来源')
+    parser.add_argument('--workers', type=int, default=None, help='解析进程数（默认CPU核数）')
+    parser.add_argument('--dry-run', action='store_true', help='只解析和统计，不写入文件')
+    args = parser.parse_args()
+
+    paths = archive_files(args.archive, args.sources)
+    if not paths:
+        logger.error(f"No archive files found in {args.archive}")
+        return
+
+    start = time.perf_counter()
+    latest = {}
+    stats = {}
+    pages = errors = damaged = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for results, file_errors, file_stats, file_damaged in executor.map(extract_file, paths):
+            errors += file_errors
+            damaged += file_damaged
+            merge_stats(stats, file_stats)
+            for source, fetched_at, game_data in results:
+                pages += 1
+                # 同一游戏被抓取多次时只保留最新的一次（按键的哈希部分，标题变化过的也算同一游戏）
+                key = (source, game_key(source, game_data).rsplit('-', 1)[1])
+                if key not in latest or latest[key][0] <= fetched_at:
+                    latest[key] = (fetched_at, game_data)
+    logger.info(f"Extracted {pages} records ({len(latest)} unique games) from {len(paths)} files "
+                f"in {time.perf_counter() - start:.1f}s, {errors} errors, {damaged} damaged archive files")
+    # 本次全量重跑的规则命中统计，供 scripts/extraction_report.py 查看
+    save_stats(stats)
+
+    if args.dry_run:
+        return
+
+    counts = {}
+    for (source, _), (_, game_data) in sorted(latest.items()):
+        if not game_data.get('title') and not game_data.get('name'):
+            continue
+        _, status = upsert_game(output_dir_for(source, game_data), source, game_data)
+        counts[status] = counts.get(status, 0) + 1
+    logger.info(f"Rebuilt catalog in {time.perf_counter() - start:.1f}s: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gamecollect.changes import CHANGES_DB, ChangeLog
+from gamecollect.corpus import map_records
+from gamecollect.paths import route_source
+
+
+def change_record(corpus_file, record):
+    """语料中一条记录在变更日志中的键（在进程池中执行）"""
+    game_id = record.get('id') or os.path.basename(corpus_file.path)[:-len('.json')]
+    record = dict(record, id=game_id)
+    return f"{route_source(corpus_file.rel_dir)}/{game_id}", record
+
+
+def main():
+    parser = argparse.ArgumentParser(description='维护目录变更日志：与语料对齐、查询增量、压缩为快照')
+    parser.add_argument('--since', type=int, help='输出该版本之后的变更（JSON），不修改日志')
+    parser.add_argument('--limit', type=int, default=1000, help='--since 每次最多返回的变更数')
+    parser.add_argument('--compact', type=int, metavar='KEEP', help='把除最近 KEEP 条以外的变更合并进基础快照')
+    parser.add_argument('--workers', type=int, default=None, help='读取语料的并行进程数')
+    args = parser.parse_args()
+
+    log = ChangeLog()
+    try:
+        if args.since is not None:
+            print(json.dumps(log.changes_since(args.since, args.limit), ensure_ascii=False, indent=2))
+            return
+        if args.compact is not None:
+            base = log.compact(args.compact)
+            print(f"Compacted change log, base snapshot is now at version {base}")
+            return
+
+        # 同一游戏的多个副本（html5games 各分类目录）取第一个
+        records = {}
+        for item in map_records(change_record, workers=args.workers):
+            if item and item[0] not in records:
+                records[item[0]] = item[1]
+        stats = log.reconcile(records)
+        print(f"Change log at version {log.version()} (base {log.base_version()}): {stats}")
+        print(f"Change log: {CHANGES_DB}")
+    finally:
+        log.close()
+
+
+if __name__ == "__main__":
+    main()